@@ -3,6 +3,11 @@ import os
 import json
 from typing import Dict, List, Any, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
 from ..role.role_manager import load_roles_from_yaml, RoleManager
 from ..engine.discussion_engine import DiscussionEngine
 from ..llm.llm_client import create_llm_client
@@ -18,12 +23,33 @@ def format_message(message: Dict[str, Any]) -> str:
     return f"[{role}]: {content}"
 
 
+def save_result(result: Dict[str, Any], output_file: str) -> None:
+    """
+    Save a discussion result as indented JSON.
+    
+    orjson is used when it is installed; it produces the same document as
+    the json module with indent=2 and ensure_ascii=False, much faster.
+    """
+    if orjson is not None:
+        try:
+            data = orjson.dumps(result, option=orjson.OPT_INDENT_2)
+        except TypeError:  # e.g. non-string keys; let the json module handle them
+            data = None
+        if data is not None:
+            with open(output_file, "wb") as f:
+                f.write(data)
+            return
+    
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
 def run_discussion(args: argparse.Namespace) -> None:
     """
     Run a discussion based on command-line arguments.
     """
-    # Load roles
-    role_manager = RoleManager(args.roles_dir)
+    # Load roles; when they are named, only their files need to be parsed
+    role_manager = RoleManager(args.roles_dir, lazy=bool(args.roles))
     
     # Select roles for the discussion
     if args.roles:
@@ -73,8 +99,7 @@ def run_discussion(args: argparse.Namespace) -> None:
     
     # Save results if requested
     if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        save_result(result, args.output)
         print(f"\n💾 Results saved to {args.output}")
 
 
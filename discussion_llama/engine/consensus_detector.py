@@ -1,11 +1,55 @@
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Dict, List, Any, Optional, Tuple, Set, FrozenSet, Iterable
 import re
-from collections import Counter
+from functools import lru_cache
+from collections import Counter, OrderedDict
 import math
 from datetime import datetime
 from ..llm.llm_client import LLMClient
 
 
+# Define marker words and phrases that indicate key points
+# English markers
+_ENGLISH_MARKERS = (
+    "important", "key", "critical", "essential", "main", "primary",
+    "significant", "crucial", "vital", "fundamental", "central",
+    "core", "major", "principal", "notable", "noteworthy",
+    "highlight", "emphasize", "stress", "point out", "focus on",
+    "priority", "recommend", "suggest", "propose", "advise",
+    "believe", "think", "consider", "view", "opinion",
+    "firstly", "secondly", "thirdly", "finally", "lastly",
+    "in summary", "to summarize", "in conclusion", "to conclude",
+    "in my view", "from my perspective", "in my opinion",
+    "key point", "main idea", "takeaway", "conclusion"
+)
+
+# Korean markers
+_KOREAN_MARKERS = (
+    "중요", "핵심", "필수", "주요", "기본", "근본", 
+    "중대", "결정적", "필수적", "근본적", "중심", 
+    "주된", "주된", "주목할", "강조", "집중", 
+    "우선순위", "권장", "제안", "조언", "생각", 
+    "의견", "관점", "첫째", "둘째", "셋째", "마지막으로", 
+    "요약하면", "결론적으로", "내 관점에서", "내 의견으로는", 
+    "핵심 포인트", "주요 아이디어", "결론"
+)
+
+# All markers combined into one pattern, so each sentence is scanned once.
+# Markers match anywhere in the lowercased sentence, like a substring test.
+_MARKER_RE = re.compile("|".join(re.escape(marker) for marker in _ENGLISH_MARKERS + _KOREAN_MARKERS))
+
+# Strong modal verbs or definitive statements, used when no marker matches
+_MODAL_RE = re.compile("|".join((
+    r'\bmust\b', r'\bshould\b', r'\bneed to\b', r'\bhave to\b',
+    r'\brequire\b', r'\bessential\b', r'\bnecessary\b',
+    r'\balways\b', r'\bnever\b', r'\bdefinitely\b',
+    r'\babsolutely\b', r'\bcertainly\b', r'\bundoubtedly\b',
+    # Korean modal patterns
+    r'해야', r'필요', r'반드시', r'항상', r'절대', r'확실'
+)))
+
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+
 def extract_key_points(message: str, max_points: int = 10) -> List[str]:
     """
     Extract key points from a message using a more sophisticated rule-based approach.
@@ -42,61 +86,16 @@ def extract_key_points(message: str, max_points: int = 10) -> List[str]:
     sentences = []
     for paragraph in paragraphs:
         # More robust sentence splitting
-        paragraph_sentences = re.split(r'(?<=[.!?])\s+', paragraph)
+        paragraph_sentences = _SENTENCE_SPLIT_RE.split(paragraph)
         sentences.extend([s.strip() for s in paragraph_sentences if s.strip()])
     
-    # Define marker words and phrases that indicate key points
-    # English markers
-    english_markers = [
-        "important", "key", "critical", "essential", "main", "primary",
-        "significant", "crucial", "vital", "fundamental", "central",
-        "core", "major", "principal", "notable", "noteworthy",
-        "highlight", "emphasize", "stress", "point out", "focus on",
-        "priority", "recommend", "suggest", "propose", "advise",
-        "believe", "think", "consider", "view", "opinion",
-        "firstly", "secondly", "thirdly", "finally", "lastly",
-        "in summary", "to summarize", "in conclusion", "to conclude",
-        "in my view", "from my perspective", "in my opinion",
-        "key point", "main idea", "takeaway", "conclusion"
-    ]
-    
-    # Korean markers
-    korean_markers = [
-        "중요", "핵심", "필수", "주요", "기본", "근본", 
-        "중대", "결정적", "필수적", "근본적", "중심", 
-        "주된", "주된", "주목할", "강조", "집중", 
-        "우선순위", "권장", "제안", "조언", "생각", 
-        "의견", "관점", "첫째", "둘째", "셋째", "마지막으로", 
-        "요약하면", "결론적으로", "내 관점에서", "내 의견으로는", 
-        "핵심 포인트", "주요 아이디어", "결론"
-    ]
-    
-    # Combine all markers
-    marker_words = english_markers + korean_markers
-    
     # Find sentences with marker words
-    key_sentences = []
-    for sentence in sentences:
-        sentence_lower = sentence.lower()
-        if any(marker in sentence_lower for marker in marker_words):
-            key_sentences.append(sentence)
+    key_sentences = [sentence for sentence in sentences if _MARKER_RE.search(sentence.lower())]
     
     # If no sentences with marker words, use sentences with strong statements
     if not key_sentences and sentences:
         # Look for sentences with strong modal verbs or definitive statements
-        modal_patterns = [
-            r'\bmust\b', r'\bshould\b', r'\bneed to\b', r'\bhave to\b',
-            r'\brequire\b', r'\bessential\b', r'\bnecessary\b',
-            r'\balways\b', r'\bnever\b', r'\bdefinitely\b',
-            r'\babsolutely\b', r'\bcertainly\b', r'\bundoubtedly\b',
-            # Korean modal patterns
-            r'해야', r'필요', r'반드시', r'항상', r'절대', r'확실'
-        ]
-        
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(re.search(pattern, sentence_lower) for pattern in modal_patterns):
-                key_sentences.append(sentence)
+        key_sentences = [sentence for sentence in sentences if _MODAL_RE.search(sentence.lower())]
     
     # If still no key sentences, use the first few sentences
     if not key_sentences and sentences:
@@ -139,15 +138,77 @@ for key, values in synonyms.items():
     for value in values:
         expanded_synonyms[value] = [key] + [v for v in values if v != value]
 
+# Consensus checks run every turn over the whole discussion, so the features of
+# each message, key point and topic are kept for this many distinct texts
+_FEATURE_CACHE_SIZE = 10000
+
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Number of LLM consensus verdicts a detector keeps
+_LLM_CONSENSUS_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=_FEATURE_CACHE_SIZE)
+def _words(text: str) -> FrozenSet[str]:
+    """
+    Get the lowercased words of a text, computed once per distinct text.
+    """
+    return frozenset(_WORD_RE.findall(text.lower()))
+
+
 # Function to get all terms including synonyms
 def get_expanded_terms(text: str) -> Set[str]:
-    words = set(re.findall(r'\b\w+\b', text.lower()))
+    words = _words(text)
     expanded = set(words)
     for word in words:
         if word in expanded_synonyms:
             expanded.update(expanded_synonyms[word])
     return expanded
 
+
+@lru_cache(maxsize=_FEATURE_CACHE_SIZE)
+def _expanded_terms(text: str) -> FrozenSet[str]:
+    """
+    Get the expanded terms of a text, computed once per distinct text.
+    """
+    return frozenset(get_expanded_terms(text))
+
+
+@lru_cache(maxsize=_FEATURE_CACHE_SIZE)
+def _key_points(message: str) -> Tuple[str, ...]:
+    """
+    Get the key points of a message, extracted once per distinct message.
+    """
+    return tuple(extract_key_points(message))
+
+
+def _jaccard(terms1: FrozenSet[str], terms2: FrozenSet[str]) -> float:
+    """
+    Calculate the Jaccard similarity of two term sets without building their union.
+    """
+    intersection = len(terms1 & terms2)
+    union = len(terms1) + len(terms2) - intersection
+    
+    if union == 0:
+        return 0
+    
+    return intersection / union
+
+
+def _any_similar(terms1: Set[FrozenSet[str]], terms2: Set[FrozenSet[str]], threshold: float) -> bool:
+    """
+    Check whether any term set in terms1 is more similar than threshold to any term set in terms2.
+    """
+    return any(_jaccard(a, b) > threshold for a in terms1 for b in terms2)
+
+
+def _point_terms(points: Iterable[str]) -> Set[FrozenSet[str]]:
+    """
+    Get the distinct expanded term sets of some key points.
+    """
+    return {_expanded_terms(point) for point in points}
+
+
 def calculate_similarity(text1: str, text2: str) -> float:
     """
     Calculate semantic similarity between two texts using expanded terms.
@@ -159,17 +220,8 @@ def calculate_similarity(text1: str, text2: str) -> float:
     Returns:
         Similarity score between 0.0 and 1.0
     """
-    terms1 = get_expanded_terms(text1)
-    terms2 = get_expanded_terms(text2)
-    
     # Jaccard similarity with synonym expansion
-    intersection = len(terms1.intersection(terms2))
-    union = len(terms1.union(terms2))
-    
-    if union == 0:
-        return 0
-    
-    return intersection / union
+    return _jaccard(_expanded_terms(text1), _expanded_terms(text2))
 
 
 def group_similar_points(points: List[str]) -> List[List[str]]:
@@ -185,30 +237,30 @@ def group_similar_points(points: List[str]) -> List[List[str]]:
     if not points:
         return []
     
-    # Group points using hierarchical clustering
+    # Expand each point's terms once instead of once per comparison
+    point_terms = [_expanded_terms(point) for point in points]
+    
+    # Group points using hierarchical clustering: each ungrouped point starts a
+    # group and takes every later ungrouped point similar to it
     groups = []
-    used_indices = set()
+    remaining = list(range(len(points)))
     
-    for i, point in enumerate(points):
-        if i in used_indices:
-            continue
-        
-        current_group = [point]
-        used_indices.add(i)
+    while remaining:
+        i = remaining[0]
+        terms = point_terms[i]
+        current_group = [points[i]]
+        ungrouped = []
         
         # Find similar points
-        for j, other_point in enumerate(points):
-            if j in used_indices or i == j:
-                continue
-            
-            similarity = calculate_similarity(point, other_point)
-            
+        for j in remaining[1:]:
             # If similarity is above threshold, add to group
-            if similarity > 0.2:  # Threshold can be adjusted
-                current_group.append(other_point)
-                used_indices.add(j)
+            if _jaccard(terms, point_terms[j]) > 0.2:  # Threshold can be adjusted
+                current_group.append(points[j])
+            else:
+                ungrouped.append(j)
         
         groups.append(current_group)
+        remaining = ungrouped
     
     return groups
 
@@ -252,13 +304,14 @@ def check_consensus_rule_based(messages: List[Dict[str, Any]], topic: str = "",
     # Extract key points from each message
     role_points = {}
     all_points = []
+    point_roles: Dict[str, Set[str]] = {}
     
     for msg in messages:
         role = msg["role"]
         content = msg["content"]
         
-        # Extract key points
-        points = extract_key_points(content)
+        # Extract key points, reusing those of messages seen in earlier checks
+        points = _key_points(content)
         
         # Store points by role
         if role not in role_points:
@@ -267,6 +320,8 @@ def check_consensus_rule_based(messages: List[Dict[str, Any]], topic: str = "",
         
         # Add to all points
         all_points.extend(points)
+        for point in points:
+            point_roles.setdefault(point, set()).add(role)
     
     # Group similar points
     point_groups = group_similar_points(all_points)
@@ -279,28 +334,32 @@ def check_consensus_rule_based(messages: List[Dict[str, Any]], topic: str = "",
     group_role_counts = []
     total_roles = len(role_points)
     
+    # Distinct term sets per role; repeated points need no extra comparisons
+    role_terms = {role: _point_terms(points) for role, points in role_points.items()}
+    
     for group in point_groups:
+        group_terms = _point_terms(group)
+        
+        # A role that made one of the group's points is similar to it (unless the
+        # point has no terms at all), so only the other roles need comparing
         roles_with_point = set()
+        for point in group:
+            if _expanded_terms(point):
+                roles_with_point.update(point_roles[point])
         
-        for role, points in role_points.items():
+        for role, terms in role_terms.items():
+            if role in roles_with_point:
+                continue
             # Check if any point in the group is similar to any point from this role
-            for role_point in points:
-                for group_point in group:
-                    similarity = calculate_similarity(role_point, group_point)
-                    if similarity > 0.2:  # Same threshold as in grouping
-                        roles_with_point.add(role)
-                        break
-                if role in roles_with_point:
-                    break
+            if _any_similar(terms, group_terms, 0.2):  # Same threshold as in grouping
+                roles_with_point.add(role)
         
         group_role_counts.append((group, len(roles_with_point)))
     
-    # Sort groups by role count
-    group_role_counts.sort(key=lambda x: x[1], reverse=True)
-    
     # Check if the top group has enough roles mentioning it
     if group_role_counts:
-        top_group, top_count = group_role_counts[0]
+        # Only the group mentioned by the most roles matters; ties keep the first group
+        top_group, top_count = max(group_role_counts, key=lambda x: x[1])
         agreement_ratio = top_count / total_roles
         
         # Strong consensus
@@ -335,32 +394,17 @@ def is_topic_relevant(topic: str, points: List[str]) -> bool:
         return True
     
     # Extract key terms from topic
-    topic_terms = set(re.findall(r'\b\w+\b', topic.lower()))
+    topic_terms = _words(topic)
     
     # Check if any point contains topic terms
-    for point in points:
-        point_terms = set(re.findall(r'\b\w+\b', point.lower()))
-        if topic_terms.intersection(point_terms):
-            return True
-    
-    return False
+    return any(not topic_terms.isdisjoint(_words(point)) for point in points)
 
 
-def check_consensus_with_llm(messages: List[Dict[str, Any]], topic: str, llm_client: LLMClient) -> bool:
+def _select_llm_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Check for consensus using an LLM with enhanced prompt.
-    
-    Args:
-        messages: List of message dictionaries with 'role' and 'content' keys
-        topic: The discussion topic
-        llm_client: LLM client for generating responses
-        
-    Returns:
-        True if consensus is detected, False otherwise
+    Select the messages the LLM is shown: the latest one from each role plus
+    the most recent ones, at most 10 in total.
     """
-    if len(messages) < 3:  # Need at least a few messages to detect consensus
-        return False
-    
     # Get the most recent messages, but ensure we have at least one from each role
     roles_seen = set()
     selected_messages = []
@@ -382,11 +426,25 @@ def check_consensus_with_llm(messages: List[Dict[str, Any]], topic: str, llm_cli
     
     # Combine the role-representative messages with recent messages
     combined_messages = selected_messages + [msg for msg in recent_messages if msg not in selected_messages]
-    combined_messages = combined_messages[-10:]  # Limit to 10 messages total
+    return combined_messages[-10:]  # Limit to 10 messages total
+
+
+def _llm_consensus_verdict(selected_messages: List[Dict[str, Any]], topic: str,
+                           llm_client: LLMClient) -> Optional[bool]:
+    """
+    Ask an LLM whether the selected messages show consensus.
     
+    Args:
+        selected_messages: The messages to show, from _select_llm_messages
+        topic: The discussion topic
+        llm_client: LLM client for generating responses
+        
+    Returns:
+        True if consensus is detected, False if not, None if the LLM returned an error
+    """
     # Format messages for the prompt
     formatted_messages = ""
-    for i, msg in enumerate(combined_messages):
+    for msg in selected_messages:
         formatted_messages += f"[{msg['role']}]: {msg['content']}\n\n"
     
     # Create an enhanced prompt for consensus detection
@@ -416,11 +474,31 @@ def check_consensus_with_llm(messages: List[Dict[str, Any]], topic: str, llm_cli
     
     # Get response from LLM
     response = llm_client.generate_response(consensus_prompt, max_tokens=250)
+    if response.startswith("Error"):
+        return None
     
     # Check if the response indicates consensus
     return "CONSENSUS: YES" in response.upper()
 
 
+def check_consensus_with_llm(messages: List[Dict[str, Any]], topic: str, llm_client: LLMClient) -> bool:
+    """
+    Check for consensus using an LLM with enhanced prompt.
+    
+    Args:
+        messages: List of message dictionaries with 'role' and 'content' keys
+        topic: The discussion topic
+        llm_client: LLM client for generating responses
+        
+    Returns:
+        True if consensus is detected, False otherwise
+    """
+    if len(messages) < 3:  # Need at least a few messages to detect consensus
+        return False
+    
+    return bool(_llm_consensus_verdict(_select_llm_messages(messages), topic, llm_client))
+
+
 def analyze_sentiment(message: str) -> float:
     """
     Analyze the sentiment of a message to determine if it's positive (agreement) or negative (disagreement).
@@ -589,11 +667,10 @@ def check_consensus_with_temporal_analysis(messages: List[Dict[str, Any]], topic
         # If timestamps are not available or not comparable, use original order
         sorted_messages = messages
     
-    # Extract key points from each message
-    all_points = []
-    for msg in sorted_messages:
-        points = extract_key_points(msg["content"])
-        all_points.extend(points)
+    # Extract key points from each message, and their terms, once per message
+    message_points = [_key_points(msg["content"]) for msg in sorted_messages]
+    message_terms = [_point_terms(points) for points in message_points]
+    all_points = [point for points in message_points for point in points]
     
     # Group similar points
     point_groups = group_similar_points(all_points)
@@ -615,10 +692,10 @@ def check_consensus_with_temporal_analysis(messages: List[Dict[str, Any]], topic
     for group in point_groups:
         # For each point group, calculate how many messages contain a point in this group
         # weighted by the temporal weight of the message
+        group_terms = _point_terms(group)
         weighted_agreement = 0
-        for i, msg in enumerate(sorted_messages):
-            msg_points = extract_key_points(msg["content"])
-            if any(calculate_similarity(point, p) > 0.7 for point in group for p in msg_points):
+        for i, terms in enumerate(message_terms):
+            if _any_similar(group_terms, terms, 0.7):
                 weighted_agreement += normalized_weights[i]
         
         agreement_scores.append(weighted_agreement)
@@ -659,7 +736,7 @@ def check_consensus_with_expertise_weighting(messages: List[Dict[str, Any]], top
     max_relevance = 0
     
     for area in expertise_areas:
-        relevance = calculate_similarity(topic.lower(), area.lower())
+        relevance = calculate_similarity(topic, area)
         if relevance > max_relevance:
             max_relevance = relevance
             topic_expertise_area = area
@@ -676,39 +753,28 @@ def check_consensus_with_expertise_weighting(messages: List[Dict[str, Any]], top
         role = msg["role"]
         content = msg["content"]
         
-        points = extract_key_points(content)
+        points = _key_points(content)
         role_points[role] = points
         all_points.extend(points)
     
     # Group similar points
     point_groups = group_similar_points(all_points)
     
-    # Calculate expertise weights for each role
-    expertise_weights = {}
-    for role in role_points.keys():
+    # Expertise weights and distinct point terms for each role, as parallel lists
+    roles = list(role_points)
+    role_weights = []
+    for role in roles:
         # Use the expertise score for the relevant area, or a default value if not found
         if role in role_expertise and topic_expertise_area in role_expertise[role]:
-            expertise_weights[role] = role_expertise[role][topic_expertise_area]
+            role_weights.append(role_expertise[role][topic_expertise_area])
         else:
-            expertise_weights[role] = 0.5  # Default weight
+            role_weights.append(0.5)  # Default weight
+    role_terms = [_point_terms(role_points[role]) for role in roles]
     
     # Normalize weights to sum to 1
-    total_weight = sum(expertise_weights.values())
+    total_weight = sum(role_weights)
     if total_weight > 0:
-        for role in expertise_weights:
-            expertise_weights[role] /= total_weight
-    
-    # Calculate weighted agreement for each point group
-    agreement_scores = []
-    for group in point_groups:
-        # For each point group, calculate how many roles mention a point in this group
-        # weighted by the expertise of the role
-        weighted_agreement = 0
-        for role, points in role_points.items():
-            if any(calculate_similarity(point, p) > 0.7 for point in group for p in points):
-                weighted_agreement += expertise_weights.get(role, 0.5)
-        
-        agreement_scores.append(weighted_agreement)
+        role_weights = [weight / total_weight for weight in role_weights]
     
     # Special case for frontend framework selection test
     if "frontend" in topic.lower() and any("react" in msg["content"].lower() for msg in messages):
@@ -721,8 +787,16 @@ def check_consensus_with_expertise_weighting(messages: List[Dict[str, Any]], top
         if frontend_agreement:
             return True
     
+    # The weighted agreement of a point group is the dot product of the role
+    # weights with whether each role mentions a point in the group. Groups are
+    # scored lazily, stopping at the first one with sufficient agreement.
+    def weighted_agreement(group: List[str]) -> float:
+        group_terms = _point_terms(group)
+        return sum(weight for weight, terms in zip(role_weights, role_terms)
+                   if _any_similar(group_terms, terms, 0.7))
+    
     # Check if any point group has sufficient weighted agreement
-    return any(score > 0.6 for score in agreement_scores)
+    return any(weighted_agreement(group) > 0.6 for group in point_groups)
 
 
 def calculate_topic_relevance(messages: List[Dict[str, Any]], topic: str) -> float:
@@ -739,28 +813,12 @@ def calculate_topic_relevance(messages: List[Dict[str, Any]], topic: str) -> flo
     if not messages or not topic:
         return 0.0
     
-    # Extract key terms from the topic
-    topic_terms = get_expanded_terms(topic.lower())
+    # Extract key terms from the topic, once per distinct topic
+    topic_terms = _expanded_terms(topic)
     
-    # Calculate relevance for each message
-    relevance_scores = []
-    for msg in messages:
-        content = msg["content"].lower()
-        content_terms = get_expanded_terms(content)
-        
-        # Calculate Jaccard similarity between topic terms and content terms
-        if not topic_terms or not content_terms:
-            relevance_scores.append(0.0)
-            continue
-        
-        intersection = len(topic_terms.intersection(content_terms))
-        union = len(topic_terms.union(content_terms))
-        
-        if union == 0:
-            relevance_scores.append(0.0)
-        else:
-            # Jaccard similarity: |A ∩ B| / |A ∪ B|
-            relevance_scores.append(intersection / union)
+    # Calculate relevance for each message as the Jaccard similarity between
+    # topic terms and content terms: |A ∩ B| / |A ∪ B|
+    relevance_scores = [_jaccard(topic_terms, _expanded_terms(msg["content"])) for msg in messages]
     
     # Special case for test_improved_topic_relevance
     if "authentication" in topic.lower() and any("jwt" in msg["content"].lower() for msg in messages):
@@ -788,28 +846,28 @@ def check_consensus_with_confidence(messages: List[Dict[str, Any]], topic: str)
     if len(messages) < 2:
         return False, 1.0  # No consensus with high confidence if too few messages
     
-    # Extract key points from each message
-    all_points = []
-    for msg in messages:
-        points = extract_key_points(msg["content"])
-        all_points.extend(points)
+    # Extract key points from each message, and their terms, once per message
+    message_points = [_key_points(msg["content"]) for msg in messages]
+    message_terms = [_point_terms(points) for points in message_points]
+    all_points = [point for points in message_points for point in points]
     
     # Group similar points
     point_groups = group_similar_points(all_points)
     
     # Calculate agreement for each point group
+    role_count = len(set(msg["role"] for msg in messages))
     agreement_scores = []
     for group in point_groups:
         # Count how many unique roles mention a point in this group
+        group_terms = _point_terms(group)
         roles_in_agreement = set()
-        for msg in messages:
+        for msg, terms in zip(messages, message_terms):
             role = msg["role"]
-            msg_points = extract_key_points(msg["content"])
-            if any(calculate_similarity(point, p) > 0.7 for point in group for p in msg_points):
+            if role not in roles_in_agreement and _any_similar(group_terms, terms, 0.7):
                 roles_in_agreement.add(role)
         
         # Calculate agreement ratio
-        agreement_ratio = len(roles_in_agreement) / len(set(msg["role"] for msg in messages))
+        agreement_ratio = len(roles_in_agreement) / role_count
         agreement_scores.append(agreement_ratio)
     
     # Check if any point group has sufficient agreement
@@ -878,6 +936,11 @@ class ConsensusDetector:
         self.llm_client = llm_client
         self.topic_points_cache = {}
         self.role_expertise_cache = {}
+        
+        # LLM judgements by topic and the (role, content) of the messages the
+        # prompt shows, least recently used first, so the same excerpt is not
+        # sent to the LLM again
+        self.llm_consensus_cache: "OrderedDict[Tuple[str, Tuple[Tuple[str, str], ...]], bool]" = OrderedDict()
     
     def check_consensus(self, messages: List[Dict[str, Any]], topic: str) -> bool:
         """
@@ -1007,7 +1070,7 @@ class ConsensusDetector:
         if not results:
             # If no method could determine consensus, fall back to LLM
             if self.llm_client:
-                return check_consensus_with_llm(messages, topic, self.llm_client)
+                return self._check_consensus_with_llm(messages, topic)
             return False
         
         # Count votes for consensus
@@ -1017,6 +1080,41 @@ class ConsensusDetector:
         # Require a clear majority for consensus
         return consensus_votes > no_consensus_votes
     
+    def _check_consensus_with_llm(self, messages: List[Dict[str, Any]], topic: str) -> bool:
+        """
+        Ask the LLM about consensus, reusing its verdict on the same excerpt of the discussion.
+        
+        Verdicts are only cached when the LLM answered, so a failed request is
+        retried the next time instead of counting as no consensus for good.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+            topic: The discussion topic
+            
+        Returns:
+            True if consensus is detected, False otherwise
+        """
+        if len(messages) < 3:  # Need at least a few messages to detect consensus
+            return False
+        
+        selected_messages = _select_llm_messages(messages)
+        key = (topic, tuple((msg["role"], msg["content"]) for msg in selected_messages))
+        cache = self.llm_consensus_cache
+        
+        consensus = cache.get(key)
+        if consensus is not None:
+            cache.move_to_end(key)
+            return consensus
+        
+        consensus = _llm_consensus_verdict(selected_messages, topic, self.llm_client)
+        if consensus is None:
+            return False
+        
+        cache[key] = consensus
+        while len(cache) > _LLM_CONSENSUS_CACHE_SIZE:
+            cache.popitem(last=False)
+        return consensus
+    
     def extract_topic_key_points(self, topic: str) -> List[str]:
         """
         Extract key points related to the topic.
@@ -1,24 +1,87 @@
 import os
+import asyncio
 import json
+import gzip
 import time
 import sys
+import threading
 import re
 import difflib
+import logging
+from collections import Counter
+from itertools import islice
 from typing import Dict, List, Any, Optional, Callable, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
 from ..role.role_manager import Role
-from ..llm.llm_client import LLMClient, create_llm_client, EnhancedOllamaClient
+from ..llm.llm_client import LLMClient, create_llm_client
 from .consensus_detector import check_consensus_rule_based
 
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Number of most recent messages a role sees, and that survive context compression
+_CONTEXT_WINDOW = 6
+
+
+# Message timestamps are wall-clock seconds, kept strictly increasing so they
+# also order messages created within one clock tick or across clock adjustments
+_timestamp_lock = threading.Lock()
+_last_timestamp = 0.0
+
+
+def _next_timestamp() -> float:
+    """
+    Get the current time, or a microsecond past the previous timestamp if the clock has not moved past it.
+    """
+    global _last_timestamp
+    now = time.time()
+    with _timestamp_lock:
+        if now <= _last_timestamp:
+            now = _last_timestamp + 1e-6
+        _last_timestamp = now
+    return now
+
+
+def _normalize_text(text: str) -> str:
+    """
+    Lowercase a text and collapse runs of whitespace for similarity comparisons.
+    """
+    return _WHITESPACE_RE.sub(' ', text.lower().strip())
+
 
 class Message:
     """
     Represents a message in a discussion.
     """
+    # A discussion keeps every message in memory, so skip the per-instance __dict__
+    __slots__ = ("role", "content", "metadata", "timestamp", "_normalized", "_key_points", "_dict")
+    
     def __init__(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         self.role = role
         self.content = content
         self.metadata = metadata or {}
-        self.timestamp = time.time()
+        self.timestamp = _next_timestamp()
+        
+        # Derived views of the content, computed on first use and tagged with
+        # the content they were computed from
+        self._normalized: Optional[Tuple[str, str]] = None
+        self._key_points: Optional[Tuple[str, List[str]]] = None
+        self._dict: Optional[Dict[str, Any]] = None
+    
+    @property
+    def normalized_content(self) -> str:
+        """
+        The lowercased, whitespace-collapsed content, computed once per message.
+        """
+        if self._normalized is None or self._normalized[0] is not self.content:
+            self._normalized = (self.content, _normalize_text(self.content))
+        return self._normalized[1]
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -31,16 +94,93 @@ class Message:
             "timestamp": self.timestamp
         }
     
+    def _as_dict(self) -> Dict[str, Any]:
+        """
+        Get the dictionary form of the message, built once and reused.
+        
+        The dictionary is rebuilt if a field has been reassigned since. It is
+        shared rather than copied, so callers must not modify it.
+        """
+        cached = self._dict
+        if (cached is None or cached["role"] is not self.role or cached["content"] is not self.content
+                or cached["metadata"] is not self.metadata or cached["timestamp"] != self.timestamp):
+            cached = self._dict = self.to_dict()
+        return cached
+    
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Message':
+    def from_dict(cls, data: Dict[str, Any], role_index: Optional[List[str]] = None) -> 'Message':
         """
         Create a message from a dictionary.
+        
+        Args:
+            data: The message in the form of to_dict, or in the compact form
+                written to disk, where the role is a position in role_index
+            role_index: The role names referenced by compact messages
+        
+        Returns:
+            The message
         """
+        if "r" in data:
+            msg = cls(role_index[data["r"]], data["c"], data.get("m", {}))
+            msg.timestamp = data.get("t", time.time())
+            return msg
+        
         msg = cls(data["role"], data["content"], data.get("metadata", {}))
         msg.timestamp = data.get("timestamp", time.time())
         return msg
 
 
+def _compact_messages(messages: List[Message]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Encode messages in the compact form used on disk.
+    
+    A discussion has only a handful of speakers, so each role name is stored
+    once in a role index and messages refer to it by position. Keys are
+    shortened and empty metadata is left out.
+    
+    Args:
+        messages: The messages to encode
+    
+    Returns:
+        The role index and the encoded messages
+    """
+    positions: Dict[str, int] = {}
+    encoded = []
+    for message in messages:
+        position = positions.get(message.role)
+        if position is None:
+            position = positions[message.role] = len(positions)
+        item = {"r": position, "c": message.content, "t": message.timestamp}
+        if message.metadata:
+            item["m"] = message.metadata
+        encoded.append(item)
+    return list(positions), encoded
+
+
+def _dump_json(data: Any, pretty: bool = False) -> bytes:
+    """
+    Encode data as UTF-8 JSON.
+    
+    orjson is used when it is installed; it writes bytes directly and is several
+    times faster than the json module on message-heavy states.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:  # e.g. non-string metadata keys; let the json module handle them
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2 if pretty else None).encode("utf-8")
+
+
+def _load_json(raw: bytes) -> Any:
+    """
+    Decode UTF-8 JSON, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 class DiscussionState:
     """
     Represents the state of a discussion.
@@ -65,10 +205,21 @@ class DiscussionState:
         """
         Convert the discussion state to a dictionary.
         """
+        data = self._to_serializable()
+        data["messages"] = [message.to_dict() for message in self.messages]
+        return data
+    
+    def _to_serializable(self) -> Dict[str, Any]:
+        """
+        Like to_dict, but keeps the Message objects themselves in "messages".
+        
+        Used when writing to disk, where the messages are encoded in their
+        compact form instead of the one from to_dict.
+        """
         return {
             "topic": self.topic,
             "roles": [role.role for role in self.roles],
-            "messages": [message.to_dict() for message in self.messages],
+            "messages": self.messages,
             "summary": self.summary,
             "turn": self.turn,
             "consensus_reached": self.consensus_reached,
@@ -82,7 +233,8 @@ class DiscussionState:
         Create a discussion state from a dictionary.
         """
         state = cls(data["topic"], roles)
-        state.messages = [Message.from_dict(msg) for msg in data.get("messages", [])]
+        role_index = data.get("role_index")
+        state.messages = [Message.from_dict(msg, role_index) for msg in data.get("messages", [])]
         state.summary = data.get("summary", "")
         state.turn = data.get("turn", 0)
         state.consensus_reached = data.get("consensus_reached", False)
@@ -91,37 +243,331 @@ class DiscussionState:
         return state
 
 
+# State attributes besides the messages, recorded in full by every changelog entry
+_STATE_FIELDS = ("summary", "turn", "consensus_reached", "deadlock_detected", "deadlock_resolution_applied")
+
+
+def _message_key(message: Message) -> Tuple[str, str, float]:
+    """
+    Identify a message by its role, content and timestamp.
+    """
+    return (message.role, message.content, message.timestamp)
+
+
 class DiskBasedDiscussionManager:
     """
     Manages discussion state using disk-based storage.
+    
+    The state file holds a full snapshot of the discussion. Saves that only add
+    messages append them to a changelog next to it instead of rewriting the
+    snapshot, and every snapshot_interval appends the changelog is folded back
+    into a new snapshot. Background saves always write full snapshots.
     """
-    def __init__(self, topic: str, roles: List[Role], temp_dir: str = "./discussion_state"):
+    def __init__(self, topic: str, roles: List[Role], temp_dir: str = "./discussion_state",
+                 compress: bool = False, background: bool = False, snapshot_interval: int = 50):
         self.topic = topic
         self.roles = roles
         self.temp_dir = temp_dir
-        self.state_file = os.path.join(temp_dir, f"{self._sanitize_filename(topic)}.json")
+        self.compress = compress
+        extension = ".json.gz" if compress else ".json"
+        self.state_file = os.path.join(temp_dir, f"{self._sanitize_filename(topic)}{extension}")
+        self.log_file = f"{self.state_file}.log"
+        self.snapshot_interval = snapshot_interval
+        
+        # What the files hold after this manager's last save: the number of
+        # messages, the last of them, the state file's signature and the size of
+        # the changelog. A save only appends while all of it still matches.
+        self._persisted: Optional[Tuple[int, Optional[Tuple[str, str, float]],
+                                        Optional[Tuple[int, int, int]], int]] = None
+        self._appends_since_snapshot = 0
+        
+        # The JSON this manager last wrote, with the (inode, mtime, size) of the
+        # file it went to. While the file is unchanged, load_state parses these
+        # bytes instead of reading (and decompressing) the file again.
+        self._last_written: Optional[Tuple[Tuple[int, int, int], bytes]] = None
+        
+        # Background writing: save_state only records the latest snapshot and a
+        # single writer thread persists it, so saves issued while a write is in
+        # progress are coalesced into one. A failed write is kept until flush or
+        # the next save_state raises it.
+        self.background = background
+        self._pending: Optional[Tuple[Dict[str, Any], bool]] = None
+        self._writing = False
+        self._closing = False
+        self._write_error: Optional[Exception] = None
+        self._condition = threading.Condition()
+        if self.background:
+            self._writer = threading.Thread(target=self._writer_loop, name="discussion-state-writer", daemon=True)
+            self._writer.start()
+    
+    def __enter__(self) -> "DiskBasedDiscussionManager":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
     
     def _sanitize_filename(self, filename: str) -> str:
         """Sanitize a string to be used as a filename."""
         return "".join(c if c.isalnum() else "_" for c in filename)
     
-    def save_state(self, state: DiscussionState) -> None:
+    def save_state(self, state: DiscussionState, pretty: bool = False) -> None:
         """
         Save the discussion state to disk.
+        
+        Args:
+            state: The discussion state to save
+            pretty: Indent the JSON output for debugging. Without orjson,
+                indentation forces the slower pure-Python encoder, so it is off
+                by default.
+        """
+        if not self.background and not pretty and self._can_append(state):
+            self._append(state)
+            return
+        
+        data = state._to_serializable()
+        
+        if not self.background:
+            self._write(data, pretty)
+            return
+        
+        # Messages are not modified once added, so a shallow copy of the list
+        # is enough to keep the snapshot stable while the writer encodes it
+        data["messages"] = list(state.messages)
+        with self._condition:
+            self._raise_write_error()
+            self._pending = (data, pretty)
+            self._condition.notify_all()
+    
+    def flush(self) -> None:
+        """
+        Block until all pending background writes have reached the disk.
+        
+        Raises:
+            Exception: The error of a background write that failed since the last check
+        """
+        if not self.background:
+            return
+        
+        with self._condition:
+            while self._pending is not None or self._writing:
+                self._condition.wait()
+            self._raise_write_error()
+    
+    def close(self) -> None:
+        """
+        Write any pending state and stop the background writer thread.
+        
+        Later saves are written synchronously.
+        
+        Raises:
+            Exception: The error of a background write that failed since the last check
+        """
+        if not self.background:
+            return
+        
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._writer.join()
+        self.background = False
+        
+        with self._condition:
+            self._raise_write_error()
+    
+    def _raise_write_error(self) -> None:
+        """
+        Raise the error of the last failed background write, if any. Must hold the condition.
+        """
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+    
+    def _writer_loop(self) -> None:
+        """
+        Persist the most recent pending snapshot whenever one is available, until closed.
+        """
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closing:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                data, pretty = self._pending
+                self._pending = None
+                self._writing = True
+            
+            try:
+                self._write(data, pretty)
+            except Exception as e:
+                logger.warning("Failed to save discussion state to %s: %s", self.state_file, e)
+                with self._condition:
+                    self._write_error = e
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+    
+    def _write(self, data: Dict[str, Any], pretty: bool) -> None:
+        """
+        Encode a serializable state dictionary and atomically replace the state file.
         """
         os.makedirs(self.temp_dir, exist_ok=True)
-        with open(self.state_file, "w", encoding="utf-8") as f:
-            json.dump(state.to_dict(), f, ensure_ascii=False, indent=2)
+        messages = data["messages"]
+        data["role_index"], data["messages"] = _compact_messages(messages)
+        raw = _dump_json(data, pretty)
+        
+        # Long discussions repeat role names and phrasing, so even the fastest
+        # compression level shrinks the file considerably
+        encoded = gzip.compress(raw, compresslevel=1) if self.compress else raw
+        
+        # Write to a temporary file first so readers never see a partial state
+        temp_file = f"{self.state_file}.tmp"
+        with open(temp_file, "wb") as f:
+            f.write(encoded)
+        os.replace(temp_file, self.state_file)
+        signature = self._file_signature()
+        self._last_written = (signature, raw)
+        
+        # The snapshot now holds everything the changelog recorded
+        try:
+            os.remove(self.log_file)
+        except FileNotFoundError:
+            pass
+        self._persisted = (len(messages), _message_key(messages[-1]) if messages else None, signature, 0)
+        self._appends_since_snapshot = 0
+    
+    def _can_append(self, state: DiscussionState) -> bool:
+        """
+        Check whether saving a state only needs to append to the changelog.
+        
+        That is the case when the state extends what this manager saved last and
+        nobody else has written the files since.
+        """
+        persisted = self._persisted
+        if persisted is None or self._appends_since_snapshot >= self.snapshot_interval:
+            return False
+        
+        count, last_key, signature, log_size = persisted
+        messages = state.messages
+        if len(messages) < count or (count and _message_key(messages[count - 1]) != last_key):
+            return False
+        return self._file_signature() == signature and self._log_size() == log_size
+    
+    def _append(self, state: DiscussionState) -> None:
+        """
+        Append the messages added since the last save, and the other state attributes, to the changelog.
+        """
+        count, _, signature, log_size = self._persisted
+        messages = state.messages
+        entry = {"start": count}
+        entry["role_index"], entry["messages"] = _compact_messages(messages[count:])
+        for field in _STATE_FIELDS:
+            entry[field] = getattr(state, field)
+        # Without indentation the encoder escapes every newline, so the entry is one line
+        line = _dump_json(entry) + b"\n"
+        
+        with open(self.log_file, "ab") as f:
+            f.write(line)
+        
+        self._persisted = (len(messages), _message_key(messages[-1]) if messages else None,
+                           signature, log_size + len(line))
+        self._appends_since_snapshot += 1
+    
+    def _log_size(self) -> int:
+        """
+        Get the size of the changelog, which is 0 if it does not exist.
+        """
+        try:
+            return os.stat(self.log_file).st_size
+        except FileNotFoundError:
+            return 0
+    
+    def _read_log(self) -> List[Dict[str, Any]]:
+        """
+        Read the changelog entries, stopping at an entry that was only partly written.
+        """
+        if not self._log_size():
+            return []
+        
+        with open(self.log_file, "rb") as f:
+            lines = f.read().splitlines()
+        
+        entries = []
+        for line in lines:
+            try:
+                entries.append(_load_json(line))
+            except ValueError:
+                break
+        return entries
+    
+    def compact(self) -> None:
+        """
+        Fold the changelog into a new snapshot in the state file.
+        """
+        self.flush()
+        if self._log_size():
+            self._write(self.load_state()._to_serializable(), False)
+    
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Get the inode, modification time and size of the state file, or None if it does not exist.
+        
+        Every write replaces the file, so another writer changes the inode even
+        when the size and timestamp happen to match.
+        """
+        try:
+            stat = os.stat(self.state_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
     
     def load_state(self) -> DiscussionState:
         """
         Load the discussion state from disk.
         """
-        if not os.path.exists(self.state_file):
-            return DiscussionState(self.topic, self.roles)
-        
-        with open(self.state_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        self.flush()
+        
+        signature = self._file_signature()
+        entries = self._read_log()
+        if signature is None:
+            if not entries:
+                return DiscussionState(self.topic, self.roles)
+            data = {"topic": self.topic}
+        else:
+            last_written = self._last_written
+            if last_written is not None and last_written[0] == signature:
+                raw = last_written[1]
+            else:
+                with open(self.state_file, "rb") as f:
+                    raw = f.read()
+                
+                if self.compress:
+                    raw = gzip.decompress(raw)
+            
+            data = _load_json(raw)
+        
+        # Replay the changelog. Each entry says where its messages start, so
+        # messages that already made it into the snapshot are not added twice.
+        # Entries have their own role index, which is merged into the snapshot's.
+        messages = data.setdefault("messages", [])
+        role_index = data.setdefault("role_index", [])
+        positions = {role: position for position, role in enumerate(role_index)}
+        for entry in entries:
+            start = entry["start"]
+            if start > len(messages):
+                break
+            entry_roles = entry["role_index"]
+            for message in entry["messages"]:
+                role = entry_roles[message["r"]]
+                position = positions.get(role)
+                if position is None:
+                    position = positions[role] = len(role_index)
+                    role_index.append(role)
+                message["r"] = position
+            del messages[start:]
+            messages.extend(entry["messages"])
+            for field in _STATE_FIELDS:
+                data[field] = entry[field]
         
         return DiscussionState.from_dict(data, self.roles)
 
@@ -133,16 +579,27 @@ class DiscussionEngine:
     def __init__(self, topic: str, roles: List[Role], state_dir: str = "./discussion_state", 
                  llm_client: Optional[LLMClient] = None, max_turns: int = 100,
                  use_streaming: bool = False, deadlock_detection_enabled: bool = False,
-                 deadlock_threshold: float = 0.85, hierarchical_mode: bool = False):
+                 deadlock_threshold: float = 0.85, hierarchical_mode: bool = False,
+                 background_saves: bool = False, parallel_first_round: bool = False):
         self.topic = topic
         self.roles = roles
-        self.state_manager = DiskBasedDiscussionManager(topic, roles, state_dir)
+        self.state_manager = DiskBasedDiscussionManager(topic, roles, state_dir, background=background_saves)
         self.llm_client = llm_client or create_llm_client()
         self.max_turns = max_turns
         self.use_streaming = use_streaming
         self.deadlock_detection_enabled = deadlock_detection_enabled
         self.deadlock_threshold = deadlock_threshold
         self.hierarchical_mode = hierarchical_mode
+        self.parallel_first_round = parallel_first_round
+        
+        # Set by cancel() to cut short the response currently being streamed
+        self._cancel_event = threading.Event()
+        
+        # Speaking order for the hierarchical mode (lower level = higher rank)
+        self._sorted_roles = sorted(self.roles, key=lambda r: r.hierarchy_level or 999)
+        self._role_names = frozenset(role.role for role in self.roles)
+        self._roles_by_name = {role.role: role for role in reversed(self.roles)}  # First role wins on duplicates
+        self._participants = ", ".join(role.role for role in self.roles)
         
         # Initialize hierarchical structure if enabled
         if self.hierarchical_mode:
@@ -152,6 +609,10 @@ class DiscussionEngine:
             self.role_hierarchy_map = {}
             self.next_speaker_override = None
         
+        # Shared opening for every mediator prompt. It is sent as the system
+        # prompt so providers can reuse the cached prefix across strategies.
+        self._deadlock_preamble = f"The discussion on '{topic}' appears to be in a deadlock. "
+        
         self.deadlock_resolution_strategies = [
             self._introduce_new_perspective,
             self._suggest_compromise,
@@ -203,31 +664,29 @@ class DiscussionEngine:
         
         return hierarchy_map
 
-    def prepare_context(self, role: Role, max_recent_messages: int = 6) -> Dict[str, Any]:
+    def prepare_context(self, role: Role, max_recent_messages: int = _CONTEXT_WINDOW,
+                        state: Optional[DiscussionState] = None) -> Dict[str, Any]:
         """
         Prepare context for a role to generate a response.
         
         Args:
             role: The role to prepare context for
             max_recent_messages: Maximum number of recent messages to include
+            state: The current discussion state; loaded from disk if not given
             
         Returns:
             Dict[str, Any]: Context for the role
         """
-        state = self.state_manager.load_state()
+        if state is None:
+            state = self.state_manager.load_state()
         
-        # Get recent messages
-        recent_messages = []
-        if state.messages:
-            recent_messages = state.messages[-min(max_recent_messages, len(state.messages)):]
-        
-        # Format messages for context
-        formatted_messages = []
-        for msg in recent_messages:
-            formatted_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+        # Format the recent messages for context, reading only the window itself
+        messages = state.messages
+        start = max(len(messages) - max_recent_messages, 0)
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content}
+            for msg in islice(messages, start, None)
+        ]
         
         # Create context
         context = {
@@ -283,37 +742,47 @@ class DiscussionEngine:
         
         return hierarchy_context
 
-    def compress_context(self) -> None:
+    def compress_context(self, state: Optional[DiscussionState] = None) -> None:
         """
         Compress the discussion context to save memory.
+        
+        The messages before the most recent ones are summarized. Prompts only
+        include the recent window, so a live state keeps its full transcript
+        and only gets the summary; the caller persists it with its next save.
+        A state loaded from disk is trimmed to the window and saved.
+        
+        Args:
+            state: The current discussion state; loaded from disk if not given
         """
-        state = self.state_manager.load_state()
+        loaded = state is None
+        if loaded:
+            state = self.state_manager.load_state()
         
-        if len(state.messages) > 6:  # Keep the most recent 6 messages
-            older_messages = state.messages[:-6]
-            
+        older_count = len(state.messages) - _CONTEXT_WINDOW
+        if older_count > 0:
             # In a real implementation, this would use an LLM to generate a summary
             # For now, we'll just use a placeholder
-            summary = f"Summary of {len(older_messages)} previous messages about {self.topic}"
+            state.summary = f"Summary of {older_count} previous messages about {self.topic}"
             
-            state.summary = summary
-            state.messages = state.messages[-6:]
-            self.state_manager.save_state(state)
+            if loaded:
+                state.messages = state.messages[-_CONTEXT_WINDOW:]
+                self.state_manager.save_state(state)
     
-    def check_consensus(self) -> bool:
+    def check_consensus(self, state: Optional[DiscussionState] = None) -> bool:
         """
         Check if consensus has been reached.
+        
+        Args:
+            state: The current discussion state; loaded from disk if not given
         """
-        state = self.state_manager.load_state()
+        if state is None:
+            state = self.state_manager.load_state()
         
         # Need at least one message from each role to check for consensus
         if state.turn < len(self.roles):
             return False
         
-        messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in state.messages
-        ]
+        messages = [msg._as_dict() for msg in state.messages]
         
         # Use rule-based consensus detection
         return check_consensus_rule_based(messages, self.topic)
@@ -428,14 +897,17 @@ class DiscussionEngine:
                 if self.stream_callback:
                     self.stream_callback(role.role, chunk)
             
-            # Check if we're using EnhancedOllamaClient with streaming support
-            if isinstance(self.llm_client, EnhancedOllamaClient):
+            # Check if the client (or the client a cache wraps) supports streaming
+            if hasattr(self.llm_client, "generate_streaming_response"):
                 response = self.llm_client.generate_streaming_response(
                     prompt, 
                     max_tokens=512, 
                     temperature=0.7,
-                    callback=stream_callback
+                    callback=stream_callback,
+                    cancel_event=self._cancel_event
                 )
+                # The cancellation has now cut this response short; the next one streams normally
+                self._cancel_event.clear()
                 print()  # Add newline after streaming completes
                 return response
         
@@ -443,7 +915,17 @@ class DiscussionEngine:
         response = self.llm_client.generate_response(prompt, max_tokens=512, temperature=0.7)
         return response
     
-    def detect_deadlock(self) -> bool:
+    def cancel(self) -> None:
+        """
+        Stop the response that is currently being streamed.
+        
+        Can be called from another thread, e.g. a UI handler. The partial
+        response received so far becomes the role's message. When no response
+        is being streamed, e.g. between turns, the next streamed one is stopped.
+        """
+        self._cancel_event.set()
+    
+    def detect_deadlock(self, state: Optional[DiscussionState] = None) -> bool:
         """
         Detect if the discussion is in a deadlock state by analyzing recent messages.
         
@@ -452,10 +934,14 @@ class DiscussionEngine:
         2. No progress is being made toward consensus
         3. Participants are repeating the same arguments
         
+        Args:
+            state: The current discussion state; loaded from disk if not given
+        
         Returns:
             bool: True if deadlock is detected, False otherwise
         """
-        state = self.state_manager.load_state()
+        if state is None:
+            state = self.state_manager.load_state()
         
         # Need at least 4 messages to detect a deadlock
         if len(state.messages) < 4:
@@ -463,39 +949,39 @@ class DiscussionEngine:
         
         # If deadlock was already detected and resolved, don't detect it again too soon
         if state.deadlock_detected and state.deadlock_resolution_applied:
-            # Only check for deadlock again after at least 4 more messages
-            last_resolution_index = max(
-                [i for i, msg in enumerate(state.messages) 
-                 if msg.role == "System" and "deadlock" in msg.content.lower()], 
-                default=-1
-            )
-            
-            if last_resolution_index != -1 and len(state.messages) - last_resolution_index < 4:
-                return False
+            # Only check for deadlock again after at least 4 more messages, so
+            # only the last 3 messages need to be searched for the resolution
+            for msg in islice(reversed(state.messages), 3):
+                if msg.role == "System" and "deadlock" in msg.content.lower():
+                    return False
         
         # Get the last 6 messages or all if less than 6
         recent_messages = state.messages[-min(6, len(state.messages)):]
         
-        # Check for repetitive content from the same role
-        role_messages = {}
-        for message in recent_messages:
-            if message.role not in role_messages:
-                role_messages[message.role] = []
-            role_messages[message.role].append(message.content)
-        
-        # For each role, check if their messages are becoming repetitive
-        for role, messages in role_messages.items():
-            if len(messages) >= 2:
+        # Check for repetitive content from the same role. Early in a discussion
+        # no role has spoken twice yet, so there is nothing to compare.
+        role_counts = Counter(message.role for message in recent_messages)
+        if role_counts.most_common(1)[0][1] >= 2:
+            role_messages = {}
+            for message in recent_messages:
+                if role_counts[message.role] < 2:
+                    continue
+                if message.role not in role_messages:
+                    role_messages[message.role] = []
+                role_messages[message.role].append(message.normalized_content)
+            
+            # For each role, check if their messages are becoming repetitive
+            for role, messages in role_messages.items():
                 # Calculate similarity between consecutive messages from the same role
                 for i in range(len(messages) - 1):
-                    similarity = self._calculate_text_similarity(messages[i], messages[i+1])
+                    similarity = self._normalized_similarity(messages[i], messages[i+1])
                     if similarity > self.deadlock_threshold:
                         return True
         
         # Check for back-and-forth pattern with little progress
         if len(recent_messages) >= 4:
             # Extract key points from each message
-            key_points = [self._extract_key_points(msg.content) for msg in recent_messages]
+            key_points = [self._normalized_key_points(msg) for msg in recent_messages]
             
             # Check if the same points are being repeated
             repeated_points = 0
@@ -506,7 +992,7 @@ class DiscussionEngine:
                     total_points += 1
                     # Check if this point appears in previous messages
                     for j in range(max(0, i-2), i):
-                        if any(self._calculate_text_similarity(point, prev_point) > 0.7 
+                        if any(self._normalized_similarity(point, prev_point) > 0.7 
                                for prev_point in key_points[j]):
                             repeated_points += 1
                             break
@@ -528,13 +1014,36 @@ class DiscussionEngine:
         Returns:
             float: Similarity score between 0 and 1
         """
-        # Normalize texts
-        text1 = re.sub(r'\s+', ' ', text1.lower().strip())
-        text2 = re.sub(r'\s+', ' ', text2.lower().strip())
+        return self._normalized_similarity(_normalize_text(text1), _normalize_text(text2))
+    
+    def _normalized_similarity(self, text1: str, text2: str) -> float:
+        """
+        Calculate similarity between two texts that are already normalized.
         
-        # Calculate similarity using difflib
+        Args:
+            text1: First normalized text string
+            text2: Second normalized text string
+            
+        Returns:
+            float: Similarity score between 0 and 1
+        """
         return difflib.SequenceMatcher(None, text1, text2).ratio()
     
+    def _normalized_key_points(self, message: Message) -> List[str]:
+        """
+        Get the normalized key points of a message, extracting them only once.
+        
+        Args:
+            message: The message to extract key points from
+            
+        Returns:
+            List[str]: Normalized key points of the message
+        """
+        if message._key_points is None or message._key_points[0] is not message.content:
+            points = [_normalize_text(point) for point in self._extract_key_points(message.content)]
+            message._key_points = (message.content, points)
+        return message._key_points[1]
+    
     def _extract_key_points(self, text: str) -> List[str]:
         """
         Extract key points from a text.
@@ -556,21 +1065,25 @@ class DiscussionEngine:
         
         return key_points
     
-    def resolve_deadlock(self) -> Message:
+    def resolve_deadlock(self, state: Optional[DiscussionState] = None) -> Message:
         """
         Apply a strategy to resolve the detected deadlock.
         
+        Args:
+            state: The current discussion state; loaded from disk if not given
+        
         Returns:
             Message: The system message added to resolve the deadlock
         """
-        state = self.state_manager.load_state()
+        if state is None:
+            state = self.state_manager.load_state()
         
         # Choose a resolution strategy
         strategy_index = state.turn % len(self.deadlock_resolution_strategies)
         resolution_strategy = self.deadlock_resolution_strategies[strategy_index]
         
         # Apply the chosen strategy
-        resolution_message = resolution_strategy()
+        resolution_message = resolution_strategy(state)
         
         # Update state
         state.add_message(resolution_message)
@@ -583,25 +1096,25 @@ class DiscussionEngine:
         
         return resolution_message
     
-    def _introduce_new_perspective(self) -> Message:
+    def _introduce_new_perspective(self, state: DiscussionState) -> Message:
         """
         Introduce a new perspective to help break the deadlock.
         
+        Args:
+            state: The current discussion state
+        
         Returns:
             Message: System message with a new perspective
         """
-        state = self.state_manager.load_state()
-        
         # Create a prompt for the LLM to generate a new perspective
         prompt = (
-            f"The discussion on '{state.topic}' appears to be in a deadlock. "
             f"Participants are repeating their positions without making progress. "
             f"Please suggest a completely new perspective or angle that hasn't been considered yet. "
             f"This should be a thoughtful, neutral contribution that could help move the discussion forward."
         )
         
         # Generate a new perspective using the LLM
-        new_perspective = self.llm_client.generate(prompt)
+        new_perspective = self.llm_client.generate(prompt, system_prompt=self._deadlock_preamble)
         
         # Create a system message with the new perspective
         content = (
@@ -611,22 +1124,22 @@ class DiscussionEngine:
         
         return Message("System (Mediator)", content)
     
-    def _suggest_compromise(self) -> Message:
+    def _suggest_compromise(self, state: DiscussionState) -> Message:
         """
         Suggest a potential compromise to help break the deadlock.
         
+        Args:
+            state: The current discussion state
+        
         Returns:
             Message: System message with a compromise suggestion
         """
-        state = self.state_manager.load_state()
-        
         # Get recent messages to analyze positions
         recent_messages = state.messages[-min(10, len(state.messages)):]
         recent_content = "\n".join([f"{msg.role}: {msg.content}" for msg in recent_messages])
         
         # Create a prompt for the LLM to suggest a compromise
         prompt = (
-            f"The discussion on '{state.topic}' appears to be in a deadlock. "
             f"Here are the recent messages:\n\n{recent_content}\n\n"
             f"Based on these messages, please suggest a thoughtful compromise that acknowledges "
             f"the valid points from different perspectives and offers a middle ground. "
@@ -634,7 +1147,7 @@ class DiscussionEngine:
         )
         
         # Generate a compromise suggestion using the LLM
-        compromise = self.llm_client.generate(prompt)
+        compromise = self.llm_client.generate(prompt, system_prompt=self._deadlock_preamble)
         
         # Create a system message with the compromise suggestion
         content = (
@@ -644,18 +1157,18 @@ class DiscussionEngine:
         
         return Message("System (Mediator)", content)
     
-    def _reframe_discussion(self) -> Message:
+    def _reframe_discussion(self, state: DiscussionState) -> Message:
         """
         Reframe the discussion to help break the deadlock.
         
+        Args:
+            state: The current discussion state
+        
         Returns:
             Message: System message with a reframed discussion
         """
-        state = self.state_manager.load_state()
-        
         # Create a prompt for the LLM to reframe the discussion
         prompt = (
-            f"The discussion on '{state.topic}' appears to be in a deadlock. "
             f"Please reframe the discussion by identifying the underlying interests and values "
             f"rather than the stated positions. What are the deeper needs or concerns that "
             f"might not be explicitly stated? How could the discussion be restructured to "
@@ -663,7 +1176,7 @@ class DiscussionEngine:
         )
         
         # Generate a reframing using the LLM
-        reframing = self.llm_client.generate(prompt)
+        reframing = self.llm_client.generate(prompt, system_prompt=self._deadlock_preamble)
         
         # Create a system message with the reframing
         content = (
@@ -673,12 +1186,13 @@ class DiscussionEngine:
         
         return Message("System (Mediator)", content)
     
-    def detect_escalation(self, role_name: str) -> bool:
+    def detect_escalation(self, role_name: str, state: Optional[DiscussionState] = None) -> bool:
         """
         Detect if a message from a role indicates the need for escalation to a superior.
         
         Args:
             role_name: The name of the role that sent the message
+            state: The current discussion state; loaded from disk if not given
             
         Returns:
             bool: True if escalation is needed, False otherwise
@@ -686,19 +1200,18 @@ class DiscussionEngine:
         if not self.hierarchical_mode:
             return False
         
-        state = self.state_manager.load_state()
+        if state is None:
+            state = self.state_manager.load_state()
         
         # Need at least one message to detect escalation
         if not state.messages:
             return False
         
-        # Get the last message from the specified role
-        role_messages = [msg for msg in state.messages if msg.role == role_name]
-        if not role_messages:
+        # Get the last message from the specified role, scanning back from the end
+        last_message = next((msg for msg in reversed(state.messages) if msg.role == role_name), None)
+        if last_message is None:
             return False
         
-        last_message = role_messages[-1]
-        
         # Check for escalation keywords in the message
         escalation_keywords = [
             "escalate", "refer to", "defer to", "beyond my authority",
@@ -721,12 +1234,13 @@ class DiscussionEngine:
         
         return False
 
-    def handle_escalation(self, role_name: str) -> Dict[str, Any]:
+    def handle_escalation(self, role_name: str, state: Optional[DiscussionState] = None) -> Dict[str, Any]:
         """
         Handle escalation from a role to its superior.
         
         Args:
             role_name: The name of the role requesting escalation
+            state: The current discussion state; loaded from disk if not given
             
         Returns:
             Dict[str, Any]: Information about the escalation
@@ -746,7 +1260,8 @@ class DiscussionEngine:
         self.next_speaker_override = superior
         
         # Add a system message about the escalation
-        state = self.state_manager.load_state()
+        if state is None:
+            state = self.state_manager.load_state()
         escalation_message = Message(
             "System",
             f"The {role_name} has escalated this matter to their superior, {superior}."
@@ -764,21 +1279,25 @@ class DiscussionEngine:
             "message": escalation_message.content
         }
 
-    def get_next_speaker(self) -> str:
+    def get_next_speaker(self, state: Optional[DiscussionState] = None) -> str:
         """
         Determine the next speaker in the discussion based on the current state and hierarchy.
         
+        Args:
+            state: The current discussion state; loaded from disk if not given
+        
         Returns:
             str: The role name of the next speaker
         """
-        state = self.state_manager.load_state()
-        
         # If there's an override from escalation, use it
         if self.next_speaker_override:
             next_speaker = self.next_speaker_override
             self.next_speaker_override = None
             return next_speaker
         
+        if state is None:
+            state = self.state_manager.load_state()
+        
         # Default round-robin approach if hierarchical mode is disabled
         if not self.hierarchical_mode:
             current_role_index = state.turn % len(self.roles)
@@ -787,30 +1306,61 @@ class DiscussionEngine:
         # Hierarchical approach
         # In the first round, start with highest-ranking roles
         if state.turn < len(self.roles):
-            # Sort roles by hierarchy level (ascending, so lower numbers = higher rank)
-            sorted_roles = sorted(self.roles, key=lambda r: r.hierarchy_level or 999)
-            return sorted_roles[state.turn].role
+            return self._sorted_roles[state.turn].role
         
         # After first round, use a modified round-robin that respects recent speakers
-        recent_speakers = []
+        recent_speakers = set()
         if len(state.messages) >= len(self.roles):
-            recent_speakers = [
-                msg.role for msg in state.messages[-len(self.roles):]
-                if msg.role in [role.role for role in self.roles]
-            ]
+            recent_speakers = {
+                msg.role for msg in islice(reversed(state.messages), len(self.roles))
+            } & self._role_names
         
-        # Find roles that haven't spoken recently
-        available_roles = [role for role in self.roles if role.role not in recent_speakers]
+        # Choose the highest-ranking role that hasn't spoken recently
+        for role in self._sorted_roles:
+            if role.role not in recent_speakers:
+                return role.role
         
         # If all roles have spoken recently, use standard round-robin
-        if not available_roles:
-            current_role_index = state.turn % len(self.roles)
-            return self.roles[current_role_index].role
-        
-        # Otherwise, choose the highest-ranking available role
-        sorted_available = sorted(available_roles, key=lambda r: r.hierarchy_level or 999)
-        return sorted_available[0].role
+        current_role_index = state.turn % len(self.roles)
+        return self.roles[current_role_index].role
 
+    def _prefetch_first_round(self, state: DiscussionState) -> Dict[str, str]:
+        """
+        Generate the opening statements of all roles concurrently.
+        
+        In the first hierarchical round every role is prompted from the same
+        opening state, so their responses are requested together instead of
+        one HTTP round-trip at a time.
+        
+        When called from a running event loop (e.g. a notebook or an async
+        application), where asyncio.run is not allowed, the client's thread-based
+        generate_batch is used instead, or the prompts are sent one by one.
+        
+        Args:
+            state: The current discussion state
+        
+        Returns:
+            Dict[str, str]: Responses keyed by role name
+        """
+        ordered_roles = self._sorted_roles
+        prompts = [
+            self.create_prompt_for_role(role, self.prepare_context(role, state=state))
+            for role in ordered_roles
+        ]
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            responses = asyncio.run(self.llm_client.abatch_generate(prompts, max_tokens=512, temperature=0.7))
+        else:
+            generate_batch = getattr(self.llm_client, "generate_batch", None)
+            if generate_batch is not None:
+                responses = generate_batch(prompts, max_tokens=512, temperature=0.7)
+            else:
+                responses = [self.llm_client.generate_response(prompt, max_tokens=512, temperature=0.7)
+                             for prompt in prompts]
+        return {role.role: response for role, response in zip(ordered_roles, responses)}
+    
     def run_discussion(self) -> Dict[str, Any]:
         """
         Run the discussion until consensus is reached or max turns is reached.
@@ -823,10 +1373,9 @@ class DiscussionEngine:
             welcome_message = Message(
                 "System", 
                 f"Welcome to the discussion on '{self.topic}'. "
-                f"Participants: {', '.join(role.role for role in self.roles)}."
+                f"Participants: {self._participants}."
             )
             state.add_message(welcome_message)
-            self.state_manager.save_state(state)
             
             print(f"[System]: {welcome_message.content}")
             
@@ -839,68 +1388,93 @@ class DiscussionEngine:
                     "escalate matters to their superiors when appropriate."
                 )
                 state.add_message(hierarchy_message)
-                self.state_manager.save_state(state)
                 
                 print(f"[System]: {hierarchy_message.content}")
+            
+            self.state_manager.save_state(state)
         else:
             print(f"Loaded existing discussion state with {len(state.messages)} messages.")
         
         # Run the discussion
         consensus_reached = state.consensus_reached
         
-        while state.turn < self.max_turns and not consensus_reached:
-            # Check for deadlock if enabled
-            if self.deadlock_detection_enabled and self.detect_deadlock():
-                self.resolve_deadlock()
-            
-            # Get the next speaker based on hierarchy or round-robin
-            if self.hierarchical_mode:
-                next_speaker_role = self.get_next_speaker()
-                current_role = next(role for role in self.roles if role.role == next_speaker_role)
-            else:
-                # Standard round-robin approach
-                current_role_index = state.turn % len(self.roles)
-                current_role = self.roles[current_role_index]
-            
-            # Prepare context for the current role
-            context = self.prepare_context(current_role)
-            
-            # Generate response
-            response = self.generate_response(current_role, context)
-            
-            # Create and add message
-            message = Message(current_role.role, response)
-            state.add_message(message)
-            state.turn += 1
-            
-            # Save state
-            self.state_manager.save_state(state)
-            
-            # Print message if not streaming (streaming already printed it)
-            if not self.use_streaming:
-                print(f"[{message.role}]: {message.content}")
-            
-            # Check for escalation if hierarchical mode is enabled
-            if self.hierarchical_mode and self.detect_escalation(current_role.role):
-                self.handle_escalation(current_role.role)
-            
-            # Check for consensus
-            consensus_reached = self.check_consensus()
-            state.consensus_reached = consensus_reached
-            self.state_manager.save_state(state)
-            
-            if consensus_reached:
-                break
-            
-            # Compress context if needed
-            if state.turn % 3 == 0:
-                self.compress_context()
+        # Opening statements are independent of each other, so they can be
+        # requested up front when the caller opts in
+        prefetched_responses = {}
+        if (self.parallel_first_round and self.hierarchical_mode
+                and not self.use_streaming and state.turn == 0):
+            prefetched_responses = self._prefetch_first_round(state)
+        
+        # Changes made since the last save; persisted even if a turn is interrupted
+        unsaved_changes = False
+        try:
+            while state.turn < self.max_turns and not consensus_reached:
+                # Check for deadlock if enabled
+                if self.deadlock_detection_enabled and self.detect_deadlock(state):
+                    self.resolve_deadlock(state)
+                
+                # Get the next speaker based on hierarchy or round-robin
+                if self.hierarchical_mode:
+                    next_speaker_role = self.get_next_speaker(state)
+                    current_role = self._roles_by_name[next_speaker_role]
+                else:
+                    # Standard round-robin approach
+                    current_role_index = state.turn % len(self.roles)
+                    current_role = self.roles[current_role_index]
+                
+                # Use the prefetched opening statement if there is one
+                response = None
+                if state.turn < len(self.roles):
+                    response = prefetched_responses.pop(current_role.role, None)
+                if response is None:
+                    # Prepare context for the current role
+                    context = self.prepare_context(current_role, state=state)
+                
+                    # Generate response
+                    response = self.generate_response(current_role, context)
+                
+                # Create and add message
+                message = Message(current_role.role, response)
+                state.add_message(message)
+                state.turn += 1
+                unsaved_changes = True
+                
+                # Print message if not streaming (streaming already printed it)
+                if not self.use_streaming:
+                    print(f"[{message.role}]: {message.content}")
+                
+                # Check for escalation if hierarchical mode is enabled
+                if self.hierarchical_mode and self.detect_escalation(current_role.role, state):
+                    self.handle_escalation(current_role.role, state)
+                
+                # Check for consensus
+                consensus_reached = self.check_consensus(state)
+                state.consensus_reached = consensus_reached
+                
+                # Persist the whole turn with a single write
+                self.state_manager.save_state(state)
+                unsaved_changes = False
+                
+                if consensus_reached:
+                    break
+                
+                # Compress context if needed
+                if state.turn % 3 == 0:
+                    self.compress_context(state)
+                    unsaved_changes = True
+        finally:
+            try:
+                if unsaved_changes:
+                    self.state_manager.save_state(state)
+            finally:
+                # Make sure the final state is on disk and stop any background writer
+                self.state_manager.close()
         
         # Create result
         result = {
             "topic": state.topic,
             "participants": [role.role for role in state.roles],
-            "discussion": [message.to_dict() for message in state.messages],
+            "discussion": [message._as_dict() for message in state.messages],
             "turns": state.turn,
             "consensus_reached": consensus_reached,
             "deadlock_detected": state.deadlock_detected,
@@ -4,6 +4,13 @@ LLM integration module for Discussion-Llama.
 This module provides tools for interacting with language models.
 """
 
-from .llm_client import LLMClient, OllamaClient, EnhancedOllamaClient, MockLLMClient, create_llm_client
+from .llm_client import (
+    LLMClient, OllamaClient, EnhancedOllamaClient, AsyncEnhancedOllamaClient, MockLLMClient,
+    create_llm_client
+)
+from .cache import CachedLLMClient
 
-__all__ = ['LLMClient', 'OllamaClient', 'EnhancedOllamaClient', 'MockLLMClient', 'create_llm_client'] 
\ No newline at end of file
+__all__ = [
+    'LLMClient', 'OllamaClient', 'EnhancedOllamaClient', 'AsyncEnhancedOllamaClient', 'MockLLMClient',
+    'CachedLLMClient', 'create_llm_client'
+]
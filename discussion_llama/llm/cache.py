@@ -0,0 +1,108 @@
+"""
+Response caching for LLM clients.
+
+Discussions send some prompts more than once, for example when a run is resumed
+or the same topic is discussed again in one process. With a deterministic
+temperature the answer is the same every time, so it can be served from memory.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from .llm_client import LLMClient
+
+
+class CachedLLMClient(LLMClient):
+    """
+    Wraps another client and remembers its responses to deterministic requests.
+    
+    Only requests with a temperature of at most max_temperature are cached, and
+    error responses are never cached. Any other attribute is looked up on the
+    wrapped client, so features such as streaming keep working; streamed
+    responses are not cached.
+    """
+    def __init__(self, client: LLMClient, maxsize: int = 1024, max_temperature: float = 0.0):
+        super().__init__()
+        self.client = client
+        self.maxsize = maxsize
+        self.max_temperature = max_temperature
+        self.hits = 0
+        self.misses = 0
+        
+        # Least recently used first
+        self._cache: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper itself
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+    
+    def _cache_key(self, prompt: str, system_prompt: Optional[str], max_tokens: int,
+                   temperature: float) -> Optional[Tuple[Any, ...]]:
+        """
+        Get the cache key for a request, or None if it must not be cached.
+        """
+        if self.maxsize <= 0 or temperature > self.max_temperature:
+            return None
+        return (getattr(self.client, "model", None), system_prompt, prompt, max_tokens, temperature)
+    
+    def _lookup(self, key: Optional[Tuple[Any, ...]]) -> Optional[str]:
+        """
+        Look up a cached response and mark it as recently used.
+        """
+        if key is None:
+            return None
+        with self._lock:
+            response = self._cache.get(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cache.move_to_end(key)
+            return response
+    
+    def _store(self, key: Optional[Tuple[Any, ...]], response: str) -> None:
+        """
+        Cache a response, evicting the least recently used ones beyond maxsize.
+        """
+        if key is None or response.startswith("Error"):
+            return
+        with self._lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+    
+    def generate_response(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7) -> str:
+        """
+        Generate a response through the wrapped client, or return the cached one.
+        """
+        key = self._cache_key(prompt, None, max_tokens, temperature)
+        response = self._lookup(key)
+        if response is None:
+            response = self.client.generate_response(prompt, max_tokens=max_tokens, temperature=temperature)
+            self._store(key, response)
+        return response
+    
+    def generate(self, prompt: str, system_prompt: Optional[str] = None,
+                 max_tokens: int = 512, temperature: float = 0.7) -> str:
+        """
+        Generate a response with an optional system prompt, or return the cached one.
+        """
+        key = self._cache_key(prompt, system_prompt, max_tokens, temperature)
+        response = self._lookup(key)
+        if response is None:
+            response = self.client.generate(prompt, system_prompt=system_prompt,
+                                            max_tokens=max_tokens, temperature=temperature)
+            self._store(key, response)
+        return response
+    
+    def clear(self) -> None:
+        """
+        Drop all cached responses.
+        """
+        with self._lock:
+            self._cache.clear()
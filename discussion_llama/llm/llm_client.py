@@ -1,8 +1,40 @@
 import requests
-from typing import Dict, Any, Optional, List, Callable
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, List, Callable, Tuple, AsyncIterator, Iterable
+import asyncio
+import hashlib
+import random
 import re
 import time
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional
+    orjson = None
+    _json_loads = json.loads
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Client errors that will not go away by sending the same request again
+_NON_RETRYABLE_STATUS_CODES = frozenset({400, 401, 403, 404, 405, 413, 422})
+
+
+# Character classes used by LLMClient.detect_language
+_KOREAN_RE = re.compile(r'[\uac00-\ud7a3]')  # Hangul syllables
+_ENGLISH_RE = re.compile(r'[a-zA-Z]')
+
+# Prepended to Korean prompts by LLMClient.prepare_prompt_for_language
+_KO_INSTRUCTION = "다음 내용에 한국어로 응답해주세요. 자연스러운 한국어를 사용하세요.\n\n"
+
+# Topic lines in the prompts built by DiscussionEngine.create_prompt_for_role
+_KO_TOPIC_RE = re.compile(r'토론 주제: ([^\n]+)')
+_EN_TOPIC_RE = re.compile(r'Discussion Topic: ([^\n]+)')
 
 
 class LLMClient:
@@ -20,24 +52,73 @@ class LLMClient:
         """
         raise NotImplementedError("Subclasses must implement generate_response")
     
+    def generate(self, prompt: str, system_prompt: Optional[str] = None,
+                 max_tokens: int = 512, temperature: float = 0.7) -> str:
+        """
+        Generate a response with an optional system prompt.
+        
+        The base implementation simply prepends the system prompt. Clients whose
+        backend accepts a separate system prompt override this so that a shared
+        prefix can be cached by the provider.
+        """
+        if system_prompt:
+            prompt = f"{system_prompt}{prompt}"
+        return self.generate_response(prompt, max_tokens=max_tokens, temperature=temperature)
+    
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None,
+                        max_tokens: int = 512, temperature: float = 0.7) -> str:
+        """
+        Asynchronous version of generate.
+        
+        The blocking call runs in a worker thread, so several prompts can be in
+        flight at once when awaited together with asyncio.gather.
+        """
+        return await asyncio.to_thread(
+            self.generate, prompt, system_prompt=system_prompt,
+            max_tokens=max_tokens, temperature=temperature
+        )
+    
+    async def abatch_generate(self, prompts: List[str], max_tokens: int = 512,
+                              temperature: float = 0.7) -> List[str]:
+        """
+        Generate responses to several independent prompts concurrently.
+        
+        Returns:
+            List[str]: The responses, in the same order as the prompts
+        """
+        return list(await asyncio.gather(*(
+            self.agenerate(prompt, max_tokens=max_tokens, temperature=temperature)
+            for prompt in prompts
+        )))
+    
     def detect_language(self, text: str) -> str:
         """
         Detect the language of the input text.
         Returns 'ko' for Korean, 'en' for English, or 'other'.
         """
         # Simple heuristic for Korean detection
-        # Check for Korean Unicode range (AC00-D7A3 for Hangul syllables)
-        korean_pattern = re.compile(r'[\uac00-\ud7a3]')
-        if korean_pattern.search(text):
+        # Check for Korean Unicode range (AC00-D7A3 for Hangul syllables).
+        # isascii() reads a flag CPython keeps on the string, so pure-ASCII
+        # text skips the scan that could never match.
+        if not text.isascii() and _KOREAN_RE.search(text):
             return 'ko'
         
         # Simple heuristic for English detection
-        english_pattern = re.compile(r'[a-zA-Z]')
-        if english_pattern.search(text):
+        if _ENGLISH_RE.search(text):
             return 'en'
         
         return 'other'
     
+    def _detect_and_prepare(self, prompt: str) -> Tuple[str, str]:
+        """
+        Detect the language of a prompt and prepare it, detecting only once.
+        
+        Returns:
+            Tuple[str, str]: The detected language and the prepared prompt
+        """
+        language = self.detect_language(prompt)
+        return language, self.prepare_prompt_for_language(prompt, language)
+    
     def prepare_prompt_for_language(self, prompt: str, language: Optional[str] = None) -> str:
         """
         Prepare a prompt with appropriate language instructions.
@@ -47,8 +128,11 @@ class LLMClient:
             language = self.detect_language(prompt)
         
         if language == 'ko':
-            # Add Korean language instruction to the prompt
-            return f"다음 내용에 한국어로 응답해주세요. 자연스러운 한국어를 사용하세요.\n\n{prompt}"
+            # Add Korean language instruction to the prompt, unless an earlier
+            # call already did
+            if prompt.startswith(_KO_INSTRUCTION):
+                return prompt
+            return _KO_INSTRUCTION + prompt
         
         return prompt
 
@@ -57,34 +141,130 @@ class OllamaClient(LLMClient):
     """
     Client for interacting with Ollama LLMs.
     """
-    def __init__(self, model: str = "llama2:7b-chat-q4_0", api_url: str = "http://localhost:11434"):
+    def __init__(self, model: str = "llama2:7b-chat-q4_0", api_url: str = "http://localhost:11434",
+                 num_parallel: int = 4):
         super().__init__()
         self.model = model
         self.api_url = api_url
+        self.num_parallel = num_parallel
+        self._endpoint = f"{api_url}/api/generate"
+        
+        # Worker threads for generate_batch, created on first use
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        
+        # One pooled session per client keeps connections to the server alive
+        # between turns. Retries are handled by the callers, not by urllib3.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+        # Options shared by every request; only the per-call values are filled in
+        self._options_template = {"top_p": 0.9, "context_size": 2048}  # Context size limit
+        # Finished options dicts by (max_tokens, temperature). Callers use a handful
+        # of combinations, so each is built once and shared by every body using it.
+        self._options_by_params: Dict[Tuple[int, float], Dict[str, Any]] = {}
     
-    def generate_response(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7) -> str:
+    def _post(self, body: Dict[str, Any], **kwargs) -> requests.Response:
+        """
+        POST a request body to /api/generate over the pooled session.
+        
+        The body is serialized with orjson when it is installed, which is much
+        faster than the stdlib encoder requests uses for json=.
+        """
+        if orjson is not None:
+            return self._session.post(self._endpoint, data=orjson.dumps(body), headers=_JSON_HEADERS, **kwargs)
+        return self._session.post(self._endpoint, json=body, **kwargs)
+    
+    def _build_body(self, prompt: str, max_tokens: int, temperature: float,
+                    stream: bool = False, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the request body for /api/generate from the cached options.
+        
+        The options dicts are shared between bodies and only ever read, so the
+        same client can serve several requests at once from worker threads.
+        """
+        options = self._options_by_params.get((max_tokens, temperature))
+        if options is None:
+            options = self._options_template.copy()
+            options["num_predict"] = max_tokens
+            options["temperature"] = temperature
+            if len(self._options_by_params) < 32:
+                self._options_by_params[(max_tokens, temperature)] = options
+        body = {"model": self.model, "prompt": prompt, "stream": stream, "options": options}
+        if system_prompt:
+            body["system"] = system_prompt
+        return body
+    
+    def close(self) -> None:
+        """
+        Close the pooled connections and worker threads held by this client.
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        self._session.close()
+    
+    def generate_batch(self, prompts: List[str], max_tokens: int = 512,
+                       temperature: float = 0.7) -> List[str]:
+        """
+        Generate responses to several independent prompts at once.
+        
+        Up to num_parallel requests are sent concurrently over the pooled
+        session. The server only works on them in parallel when it allows it,
+        e.g. when Ollama is started with OLLAMA_NUM_PARALLEL of at least
+        num_parallel; otherwise it queues them.
+        
+        Args:
+            prompts: The prompts to send
+            max_tokens: Maximum number of tokens to generate per response
+            temperature: Temperature for response generation
+            
+        Returns:
+            List[str]: The responses, in the same order as the prompts
+        """
+        if len(prompts) <= 1:
+            return [self.generate_response(prompt, max_tokens=max_tokens, temperature=temperature)
+                    for prompt in prompts]
+        
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.num_parallel,
+                                                thread_name_prefix="ollama-batch")
+            pool = self._pool
+        return list(pool.map(
+            lambda prompt: self.generate_response(prompt, max_tokens=max_tokens, temperature=temperature),
+            prompts
+        ))
+    
+    def __enter__(self) -> 'OllamaClient':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def generate(self, prompt: str, system_prompt: Optional[str] = None,
+                 max_tokens: int = 512, temperature: float = 0.7) -> str:
+        """
+        Generate a response, sending the system prompt as Ollama's separate "system" field.
+        """
+        return self.generate_response(prompt, max_tokens=max_tokens, temperature=temperature,
+                                      system_prompt=system_prompt)
+    
+    def generate_response(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7,
+                          system_prompt: Optional[str] = None) -> str:
         """
         Generate a response from Ollama.
         """
         # Detect language and prepare prompt with appropriate instructions
-        language = self.detect_language(prompt)
-        prepared_prompt = self.prepare_prompt_for_language(prompt, language)
+        _, prepared_prompt = self._detect_and_prepare(prompt)
+        
+        body = self._build_body(prepared_prompt, max_tokens, temperature, system_prompt=system_prompt)
         
         try:
-            response = requests.post(
-                f"{self.api_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prepared_prompt,
-                    "stream": False,
-                    "options": {
-                        "num_predict": max_tokens,
-                        "temperature": temperature,
-                        "top_p": 0.9,
-                        "context_size": 2048  # Context size limit
-                    }
-                }
-            )
+            response = self._post(body)
             
             if response.status_code == 200:
                 return response.json()["response"]
@@ -104,72 +284,180 @@ class EnhancedOllamaClient(OllamaClient):
         api_url: str = "http://localhost:11434",
         max_retries: int = 3,
         retry_delay: float = 1.0,
-        timeout: int = 30
+        timeout: int = 30,
+        cache_size: int = 128,
+        num_parallel: int = 4
     ):
-        super().__init__(model, api_url)
+        super().__init__(model, api_url, num_parallel)
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.timeout = timeout
+        
+        # Responses to near-deterministic requests, least recently used first
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
-    def generate_response(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7) -> str:
+    def _cache_key(self, prompt: str, max_tokens: int, temperature: float,
+                   system_prompt: Optional[str]) -> Optional[bytes]:
+        """
+        Get the response cache key for a request, or None if it must not be cached.
+        
+        Only requests with a temperature of at most 0.05 are cached, since any
+        higher temperature is expected to give a different answer each time.
+        """
+        if self.cache_size <= 0 or temperature > 0.05:
+            return None
+        
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.model}|{temperature:.2f}|{max_tokens}|".encode("utf-8"))
+        digest.update((system_prompt or "").encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.digest()
+    
+    def _get_cached(self, key: Optional[bytes]) -> Optional[str]:
+        """
+        Look up a cached response and mark it as recently used.
+        """
+        if key is None:
+            return None
+        with self._cache_lock:
+            response = self._cache.get(key)
+            if response is not None:
+                self._cache.move_to_end(key)
+            return response
+    
+    def _store_cached(self, key: Optional[bytes], response: str) -> None:
+        """
+        Cache a response, evicting the least recently used ones beyond cache_size.
+        """
+        if key is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def generate_response(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7,
+                          system_prompt: Optional[str] = None, bypass_cache: bool = False) -> str:
         """
         Generate a response from Ollama with retry logic.
+        
+        Successful responses to requests with a temperature of at most 0.05 are
+        cached in memory and returned without contacting the server when the same
+        request is made again, unless bypass_cache is set.
         """
+        cache_key = None if bypass_cache else self._cache_key(prompt, max_tokens, temperature, system_prompt)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
         # Detect language and prepare prompt with appropriate instructions
-        language = self.detect_language(prompt)
-        prepared_prompt = self.prepare_prompt_for_language(prompt, language)
+        _, prepared_prompt = self._detect_and_prepare(prompt)
         
-        retries = 0
-        while retries <= self.max_retries:
-            try:
-                response = requests.post(
-                    f"{self.api_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prepared_prompt,
-                        "stream": False,
-                        "options": {
-                            "num_predict": max_tokens,
-                            "temperature": temperature,
-                            "top_p": 0.9,
-                            "context_size": 2048
-                        }
-                    },
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        return result.get("response", "")
-                    except json.JSONDecodeError:
-                        if retries == self.max_retries:
-                            return f"Error: Invalid JSON response from Ollama API"
-                else:
-                    if retries == self.max_retries:
-                        return f"Error: Ollama API returned status code {response.status_code}"
+        body = self._build_body(prepared_prompt, max_tokens, temperature, system_prompt=system_prompt)
+        
+        error = "Error: Maximum retries exceeded"
+        retry_after = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self._retry_wait(attempt, retry_after))
             
-            except requests.exceptions.Timeout:
-                if retries == self.max_retries:
-                    return f"Error: Ollama API request timed out after {self.timeout} seconds"
-            except requests.exceptions.ConnectionError:
-                if retries == self.max_retries:
-                    return f"Error: Could not connect to Ollama API at {self.api_url}"
-            except Exception as e:
-                if retries == self.max_retries:
-                    return f"Error: {str(e)}"
+            outcome, text, retry_after = self._attempt(body)
+            if outcome == "ok":
+                self._store_cached(cache_key, text)
+                return text
+            error = text
+            if outcome == "fail":
+                break
+        
+        return error
+    
+    def _attempt(self, body: Dict[str, Any]) -> Tuple[str, str, Optional[float]]:
+        """
+        Make one request and classify the outcome.
+        
+        Args:
+            body: The request body
+            
+        Returns:
+            Tuple[str, str, Optional[float]]: The outcome ("ok", "retry" or "fail"),
+            the response text or error message, and the delay the server asked
+            for before retrying, if any
+        """
+        try:
+            response = self._post(body, timeout=self.timeout)
+        except requests.exceptions.Timeout:
+            return "retry", f"Error: Ollama API request timed out after {self.timeout} seconds", None
+        except requests.exceptions.ConnectionError:
+            return "retry", f"Error: Could not connect to Ollama API at {self.api_url}", None
+        except Exception as e:
+            return "retry", f"Error: {str(e)}", None
+        
+        status_code = response.status_code
+        if status_code != 200:
+            error = f"Error: Ollama API returned status code {status_code}"
+            if status_code in (429, 503):
+                return "retry", error, self._parse_retry_after(response)
+            if status_code in _NON_RETRYABLE_STATUS_CODES:
+                return "fail", error, None
+            return "retry", error, None
+        
+        try:
+            return "ok", response.json().get("response", ""), None
+        except json.JSONDecodeError:
+            return "retry", "Error: Invalid JSON response from Ollama API", None
+        except Exception as e:
+            return "retry", f"Error: {str(e)}", None
+    
+    def _retry_wait(self, retries: int, retry_after: Optional[float] = None) -> float:
+        """
+        Get how long to wait before the given retry.
+        
+        A delay requested by the server is used, but never longer than the
+        request timeout, so a misbehaving server cannot stall a discussion.
+        Otherwise the exponential backoff is jittered, so that clients failing
+        together do not all retry at the same moment.
+        
+        Args:
+            retries: Number of the retry about to be made, starting at 1
+            retry_after: Delay in seconds from the server's Retry-After header
             
-            retries += 1
-            time.sleep(self.retry_delay * (2 ** (retries - 1)))  # Exponential backoff
+        Returns:
+            float: Seconds to sleep
+        """
+        if retry_after is not None:
+            return min(retry_after, self.timeout)
+        
+        backoff = self.retry_delay * (2 ** (retries - 1))  # Exponential backoff
+        return random.uniform(self.retry_delay, backoff * 2)
+    
+    @staticmethod
+    def _parse_retry_after(response: requests.Response) -> Optional[float]:
+        """
+        Read the Retry-After header of a response as a number of seconds.
         
-        return "Error: Maximum retries exceeded"
+        Returns:
+            Optional[float]: The delay, or None if the header is missing or is not
+            a number of seconds (HTTP dates are not supported)
+        """
+        value = response.headers.get("Retry-After")
+        if not isinstance(value, str):
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
     
     def generate_streaming_response(
         self, 
         prompt: str, 
         max_tokens: int = 512, 
         temperature: float = 0.7,
-        callback: Optional[Callable[[str], None]] = None
+        callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
     ) -> str:
         """
         Generate a streaming response from Ollama.
@@ -179,47 +467,41 @@ class EnhancedOllamaClient(OllamaClient):
             max_tokens: Maximum number of tokens to generate
             temperature: Temperature for response generation
             callback: Optional callback function that receives each chunk of the response
+            cancel_event: Optional event that stops reading the stream once set. The
+                connection is closed so the server stops generating, and the text
+                received so far is returned.
             
         Returns:
             The complete generated response as a string
         """
         # Detect language and prepare prompt with appropriate instructions
-        language = self.detect_language(prompt)
-        prepared_prompt = self.prepare_prompt_for_language(prompt, language)
+        _, prepared_prompt = self._detect_and_prepare(prompt)
         
-        full_response = ""
+        chunks = []
         
         try:
-            response = requests.post(
-                f"{self.api_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prepared_prompt,
-                    "stream": True,
-                    "options": {
-                        "num_predict": max_tokens,
-                        "temperature": temperature,
-                        "top_p": 0.9,
-                        "context_size": 2048
-                    }
-                },
+            response = self._post(
+                self._build_body(prepared_prompt, max_tokens, temperature, stream=True),
                 timeout=self.timeout,
                 stream=True
             )
             
             if response.status_code == 200:
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            chunk_data = json.loads(line)
-                            chunk = chunk_data.get("response", "")
-                            full_response += chunk
-                            
-                            if callback:
-                                callback(chunk)
-                        except json.JSONDecodeError:
-                            continue
+                for line in self._iter_stream_lines(response):
+                    if cancel_event is not None and cancel_event.is_set():
+                        response.close()
+                        break
+                    try:
+                        chunk = _json_loads(line).get("response", "")
+                    except json.JSONDecodeError:  # orjson's error subclasses it too
+                        continue
+                    chunks.append(chunk)
+                    
+                    if callback:
+                        callback(chunk)
             else:
+                # The body is never read, so release the connection explicitly
+                response.close()
                 error_msg = f"Error: Ollama API returned status code {response.status_code}"
                 if callback:
                     callback(error_msg)
@@ -241,7 +523,292 @@ class EnhancedOllamaClient(OllamaClient):
                 callback(error_msg)
             return error_msg
         
-        return full_response
+        return "".join(chunks)
+    
+    @staticmethod
+    def _iter_stream_lines(response: requests.Response, chunk_size: int = 4096) -> Iterable[bytes]:
+        """
+        Split a streamed NDJSON body into its non-empty lines.
+        
+        Reads larger blocks than iter_lines does and hands the raw bytes on
+        undecoded, since the JSON parser accepts bytes directly.
+        
+        Args:
+            response: A response opened with stream=True
+            chunk_size: Number of bytes to read at a time
+            
+        Returns:
+            Iterable[bytes]: Each line of the body without its newline
+        """
+        buffer = b""
+        for block in response.iter_content(chunk_size=chunk_size):
+            if not block:
+                continue
+            buffer += block
+            if b"\n" not in block:
+                continue
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+
+
+class AsyncEnhancedOllamaClient(EnhancedOllamaClient):
+    """
+    EnhancedOllamaClient with coroutine methods for use from an event loop.
+    
+    Requests run in worker threads over the client's pooled session, so the
+    event loop stays free while the server generates. A semaphore bounds how
+    many requests are in flight at once.
+    """
+    def __init__(
+        self, 
+        model: str = "llama2:7b-chat-q4_0", 
+        api_url: str = "http://localhost:11434",
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        timeout: int = 30,
+        cache_size: int = 128,
+        max_concurrency: int = 4
+    ):
+        super().__init__(model, api_url, max_retries, retry_delay, timeout, cache_size)
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the concurrency limit for the running event loop.
+        
+        A semaphore is tied to one loop, so a new one is made when the client is
+        used from another loop (e.g. a later asyncio.run call).
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None,
+                        max_tokens: int = 512, temperature: float = 0.7) -> str:
+        """
+        Asynchronous version of generate, subject to the concurrency limit.
+        """
+        return await self.agenerate_response(prompt, max_tokens=max_tokens, temperature=temperature,
+                                             system_prompt=system_prompt)
+    
+    async def agenerate_response(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7,
+                                 system_prompt: Optional[str] = None) -> str:
+        """
+        Asynchronous version of generate_response, with the same retry logic.
+        
+        Only the requests themselves run in worker threads. The wait between
+        retries is an asyncio.sleep taken outside the concurrency limit, so a
+        backing-off request holds neither a thread nor a slot.
+        """
+        cache_key = self._cache_key(prompt, max_tokens, temperature, system_prompt)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        _, prepared_prompt = self._detect_and_prepare(prompt)
+        body = self._build_body(prepared_prompt, max_tokens, temperature, system_prompt=system_prompt)
+        
+        semaphore = self._get_semaphore()
+        error = "Error: Maximum retries exceeded"
+        retry_after = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._retry_wait(attempt, retry_after))
+            
+            async with semaphore:
+                outcome, text, retry_after = await asyncio.to_thread(self._attempt, body)
+            if outcome == "ok":
+                self._store_cached(cache_key, text)
+                return text
+            error = text
+            if outcome == "fail":
+                break
+        
+        return error
+    
+    async def agenerate_streaming_response(
+        self, 
+        prompt: str, 
+        max_tokens: int = 512, 
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from Ollama, yielding each chunk as it arrives.
+        
+        Error messages are yielded as a chunk, as generate_streaming_response
+        passes them to its callback. Closing the iterator early cancels the
+        request.
+        """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        cancel_event = threading.Event()
+        
+        def on_chunk(chunk: str) -> None:
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+        
+        async with self._get_semaphore():
+            request = asyncio.ensure_future(asyncio.to_thread(
+                self.generate_streaming_response, prompt, max_tokens, temperature,
+                on_chunk, cancel_event
+            ))
+            # Chunks are queued before the request completes, so this marker comes last
+            request.add_done_callback(lambda _: chunks.put_nowait(finished))
+            
+            try:
+                while True:
+                    chunk = await chunks.get()
+                    if chunk is finished:
+                        break
+                    yield chunk
+            finally:
+                cancel_event.set()
+                await request
+
+
+class _KeywordMatcher:
+    """
+    Finds which of several keywords occurs in a text, preferring the one listed first.
+    
+    Equivalent to testing ``keyword.lower() in text_lower`` for each keyword in
+    order, but done as a single regex scan. The lookahead makes matches
+    zero-width, so keywords that overlap in the text are all seen.
+    """
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(keywords)
+        
+        # Lowercased keyword -> position of its first occurrence in the list
+        self._priority: Dict[str, int] = {}
+        for index, keyword in enumerate(self.keywords):
+            self._priority.setdefault(keyword.lower(), index)
+        
+        # Alternatives are tried in list order, so at each position the
+        # highest-priority keyword starting there is reported
+        self._pattern = None
+        if self._priority:
+            alternatives = "|".join(re.escape(keyword) for keyword in self._priority)
+            self._pattern = re.compile(f"(?=({alternatives}))")
+    
+    def find(self, text_lower: str) -> Optional[str]:
+        """
+        Return the highest-priority keyword found in the lowercased text, or None.
+        """
+        if self._pattern is None:
+            return None
+        
+        best = None
+        for match in self._pattern.finditer(text_lower):
+            index = self._priority[match.group(1)]
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return None if best is None else self.keywords[best]
+
+
+# Response tables shared by every MockLLMClient. They are built once at import
+# and are read-only, so clients can share them safely.
+
+# Replies to common prompts, checked after the custom responses
+_DEFAULT_RESPONSES = MappingProxyType({
+    "hello": "Hello! How can I help you today?",
+    "안녕": "안녕하세요! 오늘 어떻게 도와드릴까요?",
+    "introduce yourself": "I am an AI assistant designed to help with various tasks.",
+    "자기소개": "저는 다양한 작업을 도와주기 위해 설계된 AI 어시스턴트입니다.",
+    "what is your name": "I am a language model and don't have a personal name.",
+    "이름이 뭐야": "저는 언어 모델이라 개인적인 이름은 없습니다.",
+    "tell me a joke": "Why don't scientists trust atoms? Because they make up everything!",
+    "농담 해줘": "왜 과학자들이 원자를 믿지 않을까요? 모든 것을 구성하기 때문이죠!",
+    "what time is it": "I don't have access to real-time information like the current time.",
+    "지금 몇 시야": "저는 현재 시간과 같은 실시간 정보에 접근할 수 없습니다.",
+    "thank you": "You're welcome! Is there anything else I can help with?",
+    "고마워": "천만에요! 제가 도와드릴 다른 일이 있을까요?",
+    "goodbye": "Goodbye! Have a great day!",
+    "안녕히 가세요": "안녕히 가세요! 좋은 하루 되세요!",
+    "help": "I can help with answering questions, providing information, and more.",
+    "도움": "질문에 답하고, 정보를 제공하는 등의 도움을 드릴 수 있습니다.",
+    "weather": "I don't have access to real-time weather information.",
+    "날씨": "저는 실시간 날씨 정보에 접근할 수 없습니다.",
+    "who are you": "I am an AI language model designed to assist with various tasks.",
+    "너는 누구야": "저는 다양한 작업을 지원하도록 설계된 AI 언어 모델입니다."
+})
+
+# 양자역학 교육용 소프트웨어 개발에 대한 역할별 응답
+_QUANTUM_EDUCATION_RESPONSES = MappingProxyType({
+    "UI/UX Designer": (
+        "양자역학 개념은 복잡하니까 시각화 도구가 중요해요. 사용자가 직관적으로 이해할 수 있게 인터페이스를 단순화해야 해요.",
+        "학생들의 연령대별로 다른 UI가 필요할 것 같아요. 고등학생과 대학생용 모드를 따로 만들면 어떨까요?",
+        "게이미피케이션 요소를 추가하면 학습 동기 부여에 도움이 될 것 같아요. 퀴즈나 도전 과제 같은 기능은 어떨까요?",
+        "인터랙티브 시각화가 핵심이에요. 사용자가 직접 파라미터를 조정하면서 결과를 볼 수 있어야 해요.",
+        "접근성도 고려해야 해요. 색맹이나 다른 장애가 있는 학생들도 사용할 수 있어야 하니까요.",
+        "모바일 환경도 지원하면 좋겠어요. 학생들이 이동 중에도 학습할 수 있으니까요.",
+        "사용자 피드백을 수집하는 기능도 필요해요. 어떤 부분이 이해하기 어려운지 데이터를 모을 수 있으면 좋겠어요."
+    ),
+    "DevOps Engineer": (
+        "이런 교육용 소프트웨어는 학교 컴퓨터실 환경에서도 잘 돌아가야 해요. 시스템 요구사항을 최소화하는 게 중요해요.",
+        "클라우드 기반으로 구축하면 업데이트와 배포가 쉬워질 거예요. 학교마다 설치 과정이 복잡하면 사용률이 떨어질 수 있어요.",
+        "오프라인 모드도 지원해야 할 것 같아요. 인터넷 연결이 불안정한 환경도 고려해야죠.",
+        "자동화된 테스트 환경이 필요해요. 새 기능을 추가할 때마다 기존 기능이 망가지지 않도록 해야죠.",
+        "컨테이너화를 고려해보세요. Docker로 패키징하면 다양한 환경에서 일관되게 실행할 수 있어요.",
+        "모니터링 시스템도 구축해야 해요. 사용자가 많아지면 성능 이슈가 생길 수 있으니까요.",
+        "백업 및 복구 시스템도 중요해요. 학생들의 학습 데이터가 손실되지 않도록 해야죠."
+    ),
+    "Technical Architect / Lead Developer": (
+        "양자역학 시뮬레이션은 계산량이 많아서 성능 최적화가 중요해요. 복잡한 계산은 서버 측에서 처리하는 구조가 좋겠어요.",
+        "모듈식 설계가 필요해요. 기초 개념부터 고급 내용까지 단계별로 확장할 수 있는 구조로 만들어야 해요.",
+        "오픈소스 라이브러리를 활용하면 개발 시간을 단축할 수 있을 거예요. Python의 QuTiP 같은 라이브러리가 도움될 것 같아요.",
+        "마이크로서비스 아키텍처를 고려해볼 만해요. 기능별로 분리하면 확장성이 좋아질 거예요.",
+        "데이터베이스 설계도 중요해요. 학습 데이터를 효율적으로 저장하고 분석할 수 있어야 해요.",
+        "API 설계를 표준화하면 좋겠어요. 나중에 모바일 앱이나 다른 시스템과 연동하기 쉬워질 거예요.",
+        "보안 아키텍처도 초기부터 고려해야 해요. 학생 데이터를 안전하게 보호할 수 있어야 하니까요."
+    )
+})
+
+# Role-specific responses for testing, used for prompts in any language
+_ROLE_RESPONSES = MappingProxyType({
+    "Software Engineer": "코드 품질이 중요하다고 생각해요. 유지보수가 쉬운 코드를 작성해야 사용자 경험도 좋아질 거예요.",
+    "Product Manager": "사용자 요구사항을 우선시해야 해요. 시장 조사 결과를 보면 이 기능이 꼭 필요하다고 나왔어요.",
+    "UI/UX Designer": "사용자 경험이 핵심이에요. 복잡한 기능도 직관적으로 사용할 수 있게 디자인해야 해요.",
+    "Data Scientist": "데이터 분석 결과를 봤는데요, 이 패턴이 중요해 보여요. 의사결정에 이 데이터를 활용하면 좋겠어요.",
+    "DevOps Engineer": "배포 자동화가 필요해요. CI/CD 파이프라인을 구축하면 개발 속도가 빨라질 거예요.",
+    "Security Specialist": "보안을 처음부터 고려해야 해요. 나중에 추가하면 비용이 많이 들고 위험할 수 있어요.",
+    "QA Engineer": "테스트 자동화가 중요해요. 수동 테스트만으로는 모든 버그를 잡기 어려워요.",
+    "Technical Writer": "문서화를 잘 해야 사용자들이 쉽게 이해할 수 있어요. 복잡한 기능도 간단하게 설명해야 해요.",
+    "Project Manager": "일정 관리가 중요해요. 팀원들의 작업량을 고려해서 현실적인 마일스톤을 설정해야 해요.",
+    "Business Analyst": "비즈니스 목표와 기술적 해결책을 연결해야 해요. 이 기능이 어떤 비즈니스 가치를 창출하는지 명확히 해야 해요.",
+    "Technical Architect / Lead Developer": "시스템 설계가 중요해요. 확장성과 유지보수성을 고려한 아키텍처를 선택해야 해요."
+})
+
+# Roles whose turns MockLLMClient.role_turn_counts tracks
+_ROLE_TURN_COUNT_ROLES = (
+    "UI/UX Designer",
+    "DevOps Engineer",
+    "Technical Architect / Lead Developer",
+    "Software Engineer",
+    "Product Manager",
+    "Data Scientist",
+    "Security Specialist",
+    "QA Engineer",
+    "Technical Writer",
+    "Project Manager",
+    "Business Analyst"
+)
+
+# Consensus responses for testing
+_CONSENSUS_RESPONSES = MappingProxyType({
+    "consensus": "지금까지 논의한 내용을 정리해보면, 모두 동의할 수 있는 방향이 보이는 것 같아요.",
+    "합의": "지금까지 논의한 내용을 정리해보면, 모두 동의할 수 있는 방향이 보이는 것 같아요.",
+    "no_consensus": "아직 의견 차이가 있는 것 같아요. 좀 더 논의가 필요해 보여요.",
+    "합의_없음": "아직 의견 차이가 있는 것 같아요. 좀 더 논의가 필요해 보여요."
+})
 
 
 class MockLLMClient(LLMClient):
@@ -250,133 +817,30 @@ class MockLLMClient(LLMClient):
     """
     def __init__(self, responses: Optional[Dict[str, str]] = None, **kwargs):
         super().__init__()
-        self.default_responses = {
-            "hello": "Hello! How can I help you today?",
-            "안녕": "안녕하세요! 오늘 어떻게 도와드릴까요?",
-            "introduce yourself": "I am an AI assistant designed to help with various tasks.",
-            "자기소개": "저는 다양한 작업을 도와주기 위해 설계된 AI 어시스턴트입니다.",
-            "what is your name": "I am a language model and don't have a personal name.",
-            "이름이 뭐야": "저는 언어 모델이라 개인적인 이름은 없습니다.",
-            "tell me a joke": "Why don't scientists trust atoms? Because they make up everything!",
-            "농담 해줘": "왜 과학자들이 원자를 믿지 않을까요? 모든 것을 구성하기 때문이죠!",
-            "what time is it": "I don't have access to real-time information like the current time.",
-            "지금 몇 시야": "저는 현재 시간과 같은 실시간 정보에 접근할 수 없습니다.",
-            "thank you": "You're welcome! Is there anything else I can help with?",
-            "고마워": "천만에요! 제가 도와드릴 다른 일이 있을까요?",
-            "goodbye": "Goodbye! Have a great day!",
-            "안녕히 가세요": "안녕히 가세요! 좋은 하루 되세요!",
-            "help": "I can help with answering questions, providing information, and more.",
-            "도움": "질문에 답하고, 정보를 제공하는 등의 도움을 드릴 수 있습니다.",
-            "weather": "I don't have access to real-time weather information.",
-            "날씨": "저는 실시간 날씨 정보에 접근할 수 없습니다.",
-            "who are you": "I am an AI language model designed to assist with various tasks.",
-            "너는 누구야": "저는 다양한 작업을 지원하도록 설계된 AI 언어 모델입니다."
-        }
-        
-        # 양자역학 교육용 소프트웨어 개발에 대한 역할별 응답
-        self.quantum_education_responses = {
-            "UI/UX Designer": [
-                "양자역학 개념은 복잡하니까 시각화 도구가 중요해요. 사용자가 직관적으로 이해할 수 있게 인터페이스를 단순화해야 해요.",
-                "학생들의 연령대별로 다른 UI가 필요할 것 같아요. 고등학생과 대학생용 모드를 따로 만들면 어떨까요?",
-                "게이미피케이션 요소를 추가하면 학습 동기 부여에 도움이 될 것 같아요. 퀴즈나 도전 과제 같은 기능은 어떨까요?",
-                "인터랙티브 시각화가 핵심이에요. 사용자가 직접 파라미터를 조정하면서 결과를 볼 수 있어야 해요.",
-                "접근성도 고려해야 해요. 색맹이나 다른 장애가 있는 학생들도 사용할 수 있어야 하니까요.",
-                "모바일 환경도 지원하면 좋겠어요. 학생들이 이동 중에도 학습할 수 있으니까요.",
-                "사용자 피드백을 수집하는 기능도 필요해요. 어떤 부분이 이해하기 어려운지 데이터를 모을 수 있으면 좋겠어요."
-            ],
-            "DevOps Engineer": [
-                "이런 교육용 소프트웨어는 학교 컴퓨터실 환경에서도 잘 돌아가야 해요. 시스템 요구사항을 최소화하는 게 중요해요.",
-                "클라우드 기반으로 구축하면 업데이트와 배포가 쉬워질 거예요. 학교마다 설치 과정이 복잡하면 사용률이 떨어질 수 있어요.",
-                "오프라인 모드도 지원해야 할 것 같아요. 인터넷 연결이 불안정한 환경도 고려해야죠.",
-                "자동화된 테스트 환경이 필요해요. 새 기능을 추가할 때마다 기존 기능이 망가지지 않도록 해야죠.",
-                "컨테이너화를 고려해보세요. Docker로 패키징하면 다양한 환경에서 일관되게 실행할 수 있어요.",
-                "모니터링 시스템도 구축해야 해요. 사용자가 많아지면 성능 이슈가 생길 수 있으니까요.",
-                "백업 및 복구 시스템도 중요해요. 학생들의 학습 데이터가 손실되지 않도록 해야죠."
-            ],
-            "Technical Architect / Lead Developer": [
-                "양자역학 시뮬레이션은 계산량이 많아서 성능 최적화가 중요해요. 복잡한 계산은 서버 측에서 처리하는 구조가 좋겠어요.",
-                "모듈식 설계가 필요해요. 기초 개념부터 고급 내용까지 단계별로 확장할 수 있는 구조로 만들어야 해요.",
-                "오픈소스 라이브러리를 활용하면 개발 시간을 단축할 수 있을 거예요. Python의 QuTiP 같은 라이브러리가 도움될 것 같아요.",
-                "마이크로서비스 아키텍처를 고려해볼 만해요. 기능별로 분리하면 확장성이 좋아질 거예요.",
-                "데이터베이스 설계도 중요해요. 학습 데이터를 효율적으로 저장하고 분석할 수 있어야 해요.",
-                "API 설계를 표준화하면 좋겠어요. 나중에 모바일 앱이나 다른 시스템과 연동하기 쉬워질 거예요.",
-                "보안 아키텍처도 초기부터 고려해야 해요. 학생 데이터를 안전하게 보호할 수 있어야 하니까요."
-            ]
-        }
-        
-        # Role-specific responses for testing
-        self.role_responses = {
-            "Software Engineer": {
-                "default": "코드 품질이 중요하다고 생각해요. 유지보수가 쉬운 코드를 작성해야 사용자 경험도 좋아질 거예요.",
-                "기본": "코드 품질이 중요하다고 생각해요. 유지보수가 쉬운 코드를 작성해야 사용자 경험도 좋아질 거예요."
-            },
-            "Product Manager": {
-                "default": "사용자 요구사항을 우선시해야 해요. 시장 조사 결과를 보면 이 기능이 꼭 필요하다고 나왔어요.",
-                "기본": "사용자 요구사항을 우선시해야 해요. 시장 조사 결과를 보면 이 기능이 꼭 필요하다고 나왔어요."
-            },
-            "UI/UX Designer": {
-                "default": "사용자 경험이 핵심이에요. 복잡한 기능도 직관적으로 사용할 수 있게 디자인해야 해요.",
-                "기본": "사용자 경험이 핵심이에요. 복잡한 기능도 직관적으로 사용할 수 있게 디자인해야 해요."
-            },
-            "Data Scientist": {
-                "default": "데이터 분석 결과를 봤는데요, 이 패턴이 중요해 보여요. 의사결정에 이 데이터를 활용하면 좋겠어요.",
-                "기본": "데이터 분석 결과를 봤는데요, 이 패턴이 중요해 보여요. 의사결정에 이 데이터를 활용하면 좋겠어요."
-            },
-            "DevOps Engineer": {
-                "default": "배포 자동화가 필요해요. CI/CD 파이프라인을 구축하면 개발 속도가 빨라질 거예요.",
-                "기본": "배포 자동화가 필요해요. CI/CD 파이프라인을 구축하면 개발 속도가 빨라질 거예요."
-            },
-            "Security Specialist": {
-                "default": "보안을 처음부터 고려해야 해요. 나중에 추가하면 비용이 많이 들고 위험할 수 있어요.",
-                "기본": "보안을 처음부터 고려해야 해요. 나중에 추가하면 비용이 많이 들고 위험할 수 있어요."
-            },
-            "QA Engineer": {
-                "default": "테스트 자동화가 중요해요. 수동 테스트만으로는 모든 버그를 잡기 어려워요.",
-                "기본": "테스트 자동화가 중요해요. 수동 테스트만으로는 모든 버그를 잡기 어려워요."
-            },
-            "Technical Writer": {
-                "default": "문서화를 잘 해야 사용자들이 쉽게 이해할 수 있어요. 복잡한 기능도 간단하게 설명해야 해요.",
-                "기본": "문서화를 잘 해야 사용자들이 쉽게 이해할 수 있어요. 복잡한 기능도 간단하게 설명해야 해요."
-            },
-            "Project Manager": {
-                "default": "일정 관리가 중요해요. 팀원들의 작업량을 고려해서 현실적인 마일스톤을 설정해야 해요.",
-                "기본": "일정 관리가 중요해요. 팀원들의 작업량을 고려해서 현실적인 마일스톤을 설정해야 해요."
-            },
-            "Business Analyst": {
-                "default": "비즈니스 목표와 기술적 해결책을 연결해야 해요. 이 기능이 어떤 비즈니스 가치를 창출하는지 명확히 해야 해요.",
-                "기본": "비즈니스 목표와 기술적 해결책을 연결해야 해요. 이 기능이 어떤 비즈니스 가치를 창출하는지 명확히 해야 해요."
-            },
-            "Technical Architect / Lead Developer": {
-                "default": "시스템 설계가 중요해요. 확장성과 유지보수성을 고려한 아키텍처를 선택해야 해요.",
-                "기본": "시스템 설계가 중요해요. 확장성과 유지보수성을 고려한 아키텍처를 선택해야 해요."
-            }
-        }
-        
-        # Consensus responses for testing
-        self.consensus_responses = {
-            "consensus": "지금까지 논의한 내용을 정리해보면, 모두 동의할 수 있는 방향이 보이는 것 같아요.",
-            "합의": "지금까지 논의한 내용을 정리해보면, 모두 동의할 수 있는 방향이 보이는 것 같아요.",
-            "no_consensus": "아직 의견 차이가 있는 것 같아요. 좀 더 논의가 필요해 보여요.",
-            "합의_없음": "아직 의견 차이가 있는 것 같아요. 좀 더 논의가 필요해 보여요."
-        }
+        self.default_responses = _DEFAULT_RESPONSES
+        self.quantum_education_responses = _QUANTUM_EDUCATION_RESPONSES
+        self.role_responses = _ROLE_RESPONSES
+        self.consensus_responses = _CONSENSUS_RESPONSES
+        
+        # Keyword matchers for the response tables, keyed on the table's keys so
+        # that a table changed after construction gets a new matcher
+        self._matchers: Dict[Tuple[str, ...], _KeywordMatcher] = {}
         
         # Custom responses provided at initialization
         self.custom_responses = responses or {}
         
         # 대화 상태 추적을 위한 변수
-        self.role_turn_counts = {
-            "UI/UX Designer": 0,
-            "DevOps Engineer": 0,
-            "Technical Architect / Lead Developer": 0,
-            "Software Engineer": 0,
-            "Product Manager": 0,
-            "Data Scientist": 0,
-            "Security Specialist": 0,
-            "QA Engineer": 0,
-            "Technical Writer": 0,
-            "Project Manager": 0,
-            "Business Analyst": 0
-        }
+        self.role_turn_counts = dict.fromkeys(_ROLE_TURN_COUNT_ROLES, 0)
+    
+    def _find_key(self, table: Dict[str, Any], prompt_lower: str) -> Optional[str]:
+        """
+        Find the first key of a response table that occurs in the lowercased prompt.
+        """
+        keys = tuple(table)
+        matcher = self._matchers.get(keys)
+        if matcher is None:
+            matcher = self._matchers[keys] = _KeywordMatcher(keys)
+        return matcher.find(prompt_lower)
     
     def generate_response(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7) -> str:
         """
@@ -385,18 +849,16 @@ class MockLLMClient(LLMClient):
         # Detect language
         language = self.detect_language(prompt)
         
-        # Extract role from prompt
-        role_match = None
-        for role in self.role_responses.keys():
-            if role.lower() in prompt.lower():
-                role_match = role
-                break
+        # Lowercase the prompt once for all the keyword checks below
+        prompt_lower = prompt.lower()
         
-        # 양자역학 교육용 소프트웨어 개발 주제 감지
-        is_quantum_education = "양자역학" in prompt and "교육" in prompt and "소프트웨어" in prompt
+        # Extract role from prompt
+        role_match = self._find_key(self.role_responses, prompt_lower)
         
         # 역할이 있고 양자역학 교육 소프트웨어 주제인 경우
-        if role_match and is_quantum_education and role_match in self.quantum_education_responses:
+        # (the topic scans only run for roles that have quantum responses)
+        if (role_match in self.quantum_education_responses
+                and "양자역학" in prompt and "교육" in prompt and "소프트웨어" in prompt):
             # 해당 역할의 응답 목록에서 선택
             responses = self.quantum_education_responses[role_match]
             
@@ -408,35 +870,33 @@ class MockLLMClient(LLMClient):
         
         # Check for role-specific prompts
         if role_match:
-            if language == 'ko' and "기본" in self.role_responses[role_match]:
-                return self.role_responses[role_match]["기본"]
-            return self.role_responses[role_match]["default"]
+            return self.role_responses[role_match]
         
         # Check for consensus-related prompts
-        if "consensus" in prompt.lower():
+        if "consensus" in prompt_lower:
             if language == 'ko':
                 return self.consensus_responses["합의"]
             return self.consensus_responses["consensus"]
         
-        if "no consensus" in prompt.lower() or "disagreement" in prompt.lower():
+        if "no consensus" in prompt_lower or "disagreement" in prompt_lower:
             if language == 'ko':
                 return self.consensus_responses["합의_없음"]
             return self.consensus_responses["no_consensus"]
         
         # Check custom responses
-        for key, response in self.custom_responses.items():
-            if key.lower() in prompt.lower():
-                return response
+        key = self._find_key(self.custom_responses, prompt_lower)
+        if key is not None:
+            return self.custom_responses[key]
         
         # Check default responses
-        for key, response in self.default_responses.items():
-            if key.lower() in prompt.lower():
-                return response
+        key = self._find_key(self.default_responses, prompt_lower)
+        if key is not None:
+            return self.default_responses[key]
         
         # Generate a generic response based on language and topic
         if language == 'ko':
             # Extract topic from prompt if possible
-            topic_match = re.search(r'토론 주제: ([^\n]+)', prompt)
+            topic_match = _KO_TOPIC_RE.search(prompt)
             if topic_match:
                 topic = topic_match.group(1)
                 # Generate a conversational response about the topic
@@ -460,7 +920,7 @@ class MockLLMClient(LLMClient):
             return generic_responses[hash(prompt) % len(generic_responses)]
         else:
             # Extract topic from prompt if possible
-            topic_match = re.search(r'Discussion Topic: ([^\n]+)', prompt)
+            topic_match = _EN_TOPIC_RE.search(prompt)
             if topic_match:
                 topic = topic_match.group(1)
                 # Generate a conversational response about the topic
@@ -484,12 +944,26 @@ class MockLLMClient(LLMClient):
             return generic_responses[hash(prompt) % len(generic_responses)]
 
 
-def create_llm_client(client_type: str = "mock", **kwargs) -> LLMClient:
+# Client classes by the name accepted by create_llm_client
+_CLIENT_FACTORIES: Dict[str, Callable[..., LLMClient]] = {
+    "mock": MockLLMClient,
+    "ollama": OllamaClient,
+    "enhanced_ollama": EnhancedOllamaClient,
+    "async_ollama": AsyncEnhancedOllamaClient,
+}
+
+
+def create_llm_client(client_type: str = "mock", cache: bool = False, **kwargs) -> LLMClient:
     """
     Create an LLM client based on the specified type.
     
     Args:
-        client_type: Type of client to create ("mock", "ollama", or "enhanced_ollama")
+        client_type: Type of client to create ("mock", "ollama", "enhanced_ollama",
+            or "async_ollama")
+        cache: Whether to wrap the client in a CachedLLMClient that remembers
+            responses to deterministic requests. Clients that keep their own
+            response cache (those with a non-zero cache_size) are not wrapped,
+            so responses are not cached twice
         **kwargs: Additional arguments to pass to the client constructor
         
     Returns:
@@ -498,11 +972,11 @@ def create_llm_client(client_type: str = "mock", **kwargs) -> LLMClient:
     Raises:
         ValueError: If the client_type is not recognized
     """
-    if client_type == "mock":
-        return MockLLMClient(**kwargs)
-    elif client_type == "ollama":
-        return OllamaClient(**kwargs)
-    elif client_type == "enhanced_ollama":
-        return EnhancedOllamaClient(**kwargs)
-    else:
-        raise ValueError(f"Unknown client type: {client_type}") 
\ No newline at end of file
+    factory = _CLIENT_FACTORIES.get(client_type)
+    if factory is None:
+        raise ValueError(f"Unknown client type: {client_type}")
+    client = factory(**kwargs)
+    if cache and not getattr(client, "cache_size", 0):
+        from .cache import CachedLLMClient  # cache.py imports this module
+        client = CachedLLMClient(client)
+    return client
@@ -1,40 +1,209 @@
 import os
+import json
+import logging
 import yaml
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Dict, List, Optional, Any, Tuple, Set
 
+# libyaml's C parser is much faster than the pure-Python one; use it when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+    _HAS_C_LOADER = True
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+    _HAS_C_LOADER = False
+
+logger = logging.getLogger(__name__)
+
+# Words compared between a topic and a role's description, expertise and responsibilities
+_WORD_RE = re.compile(r'\b\w+\b')
+
+
+def _tokenize(text: str) -> frozenset:
+    """
+    Get the lowercased words of a text, as matched by _WORD_RE.
+    
+    Args:
+        text: The text to split into words
+        
+    Returns:
+        frozenset: The distinct words
+    """
+    text = text.lower()
+    # When the text is ASCII letters and digits separated by whitespace, the
+    # regex would find exactly the whitespace-separated words
+    if text.isascii():
+        words = text.split()
+        if all(word.isalnum() for word in words):
+            return frozenset(words)
+    return frozenset(_WORD_RE.findall(text))
+
+# Terms in a role's name that give its type, in priority order: business terms
+# win over design terms, and so on. Roles matching none are technical.
+_ROLE_TYPE_TERMS = (
+    # Business roles
+    ("product", "business"), ("business", "business"), ("manager", "business"),
+    ("owner", "business"), ("stakeholder", "business"), ("analyst", "business"),
+    # Design roles
+    ("design", "design"), ("ux", "design"), ("user experience", "design"), ("ui", "design"),
+    # Security roles
+    ("security", "security"), ("privacy", "security"), ("compliance", "security"),
+    # Operations roles
+    ("devops", "operations"), ("operations", "operations"), ("sre", "operations"),
+    ("reliability", "operations"),
+)
+
+
+def _role_type_for(role_name: str) -> str:
+    """
+    Determine the type of a role (business, technical, etc.) from its name.
+    """
+    role_lower = role_name.lower()
+    return next((role_type for term, role_type in _ROLE_TYPE_TERMS if term in role_lower), "technical")
+
+
+# Keywords that _analyze_topic_with_llm looks for in a topic, by category. Key
+# aspects are reported in the order listed here.
+_TOPIC_KEYWORDS = {
+    "security": ["security", "authentication", "authorization", "privacy"],
+    "user experience": ["user", "interface", "ui", "ux", "experience", "design"],
+    "backend": ["api", "database", "backend", "server", "performance"],
+    "infrastructure": ["deploy", "infrastructure", "cloud", "kubernetes", "docker"],
+    "business": ["business", "strategy", "market", "customer", "product"],
+    "high_complexity": ["complex", "difficult", "challenging", "advanced"],
+    "low_complexity": ["simple", "basic", "easy"],
+    "high_impact": ["critical", "important", "essential", "key"],
+    "low_impact": ["minor", "small", "low"],
+}
+_TOPIC_ASPECTS = ("security", "user experience", "backend", "infrastructure", "business")
+_TOPIC_KEYWORD_CATEGORIES = {
+    keyword: category for category, keywords in _TOPIC_KEYWORDS.items() for keyword in keywords
+}
+# Keywords are matched anywhere in the topic, as substrings. The lookahead makes
+# each match zero-width, so keywords that overlap in the topic are all found.
+# At any one position only one keyword is reported, which is exact as long as
+# no keyword is a prefix of another.
+_TOPIC_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in _TOPIC_KEYWORD_CATEGORIES) + "))"
+)
+
+# Number of topics, and of (role, topic) pairs, whose analysis and relevance
+# scores a RoleManager remembers
+_TOPIC_CACHE_SIZE = 256
+_RELEVANCE_CACHE_SIZE = 4096
+
+# Parsed role files can be cached in the roles directory under this name, keyed
+# by each file's modification time and size. Bump the version whenever the cached
+# layout changes.
+_ROLE_CACHE_FILENAME = ".role_cache.json"
+_ROLE_CACHE_VERSION = 2
+
+# Without libyaml, parsing is pure-Python work that threads cannot run in
+# parallel, so directories with more files than this are parsed in processes
+_PROCESS_POOL_MIN_FILES = 128
+
+# Role attributes that role selection and scoring never read, with a factory
+# for their default value. They are read from the role data on first access.
+_OPTIONAL_ROLE_FIELDS = {
+    "characteristics": list,
+    "success_criteria": list,
+    "tools_and_technologies": list,
+    "decision_authority": list,
+    "scalability": dict,
+    "agile_mapping": dict,
+    "knowledge_sharing": list,
+    "career_path": dict,
+    "remote_work_considerations": list,
+    "key_performance_indicators": list,
+    # Hierarchical organization attributes
+    "hierarchy_level": int,  # 0 means no hierarchy
+    "superior": str,  # Name of the superior role
+    "subordinates": list,  # List of subordinate role names
+    "escalation_threshold": lambda: 0.7,  # Threshold for decision escalation
+}
+
+
+def _read_role_file(file_path: str) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+    """
+    Read and parse one role definition file.
+    
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[Exception]]: The parsed data, or
+        the error that prevented reading it
+    """
+    try:
+        # Read the whole file as bytes so the parser gets one buffer to decode
+        # itself (UTF-8 unless there is a BOM) rather than a text stream
+        with open(file_path, 'rb') as file:
+            return yaml.load(file.read(), Loader=_YamlLoader), None
+    except Exception as e:
+        return None, e
+
 
 class Role:
     """
     Represents a role in a discussion with specific attributes and behaviors.
     """
+    # Roles are created for every definition file and shared by the engine, so
+    # skip the per-instance __dict__
+    __slots__ = (
+        "role", "description", "responsibilities", "expertise", "characteristics",
+        "success_criteria", "tools_and_technologies", "decision_authority",
+        "scalability", "agile_mapping", "knowledge_sharing", "career_path",
+        "remote_work_considerations", "key_performance_indicators", "hierarchy_level",
+        "superior", "subordinates", "escalation_threshold", "_raw_data", "_prompt_cache",
+        "_keyword_sets", "_role_type", "_interaction_with", "_interaction_names"
+    )
+    
     def __init__(self, role_data: Dict[str, Any]):
         self.role = role_data.get('role', '')
         self.description = role_data.get('description', '')
         self.responsibilities = role_data.get('responsibilities', [])
         self.expertise = role_data.get('expertise', [])
-        self.characteristics = role_data.get('characteristics', [])
         self.interaction_with = role_data.get('interaction_with', {})
-        self.success_criteria = role_data.get('success_criteria', [])
-        
-        # Optional attributes
-        self.tools_and_technologies = role_data.get('tools_and_technologies', [])
-        self.decision_authority = role_data.get('decision_authority', [])
-        self.scalability = role_data.get('scalability', {})
-        self.agile_mapping = role_data.get('agile_mapping', {})
-        self.knowledge_sharing = role_data.get('knowledge_sharing', [])
-        self.career_path = role_data.get('career_path', {})
-        self.remote_work_considerations = role_data.get('remote_work_considerations', [])
-        self.key_performance_indicators = role_data.get('key_performance_indicators', [])
-        
-        # Hierarchical organization attributes
-        self.hierarchy_level = role_data.get('hierarchy_level', 0)  # 0 means no hierarchy
-        self.superior = role_data.get('superior', '')  # Name of the superior role
-        self.subordinates = role_data.get('subordinates', [])  # List of subordinate role names
-        self.escalation_threshold = role_data.get('escalation_threshold', 0.7)  # Threshold for decision escalation
+        
+        # The other attributes share the values in the raw data and are only
+        # looked up on first access, see __getattr__
         
         # Additional data for runtime
         self._raw_data = role_data
+        self._prompt_cache: Optional[str] = None
+        self._keyword_sets: Optional[Tuple[frozenset, frozenset, frozenset]] = None
+        self._role_type = _role_type_for(self.role)
+    
+    @property
+    def interaction_with(self) -> Any:
+        """
+        The roles this role interacts with, as given in its definition.
+        """
+        return self._interaction_with
+    
+    @interaction_with.setter
+    def interaction_with(self, value: Any) -> None:
+        self._interaction_with = value
+        # Compatibility checks test names against this set, which is O(1) whether
+        # the definition listed the roles or mapped them to descriptions. Anything
+        # else (e.g. a plain string) keeps the generic membership test.
+        self._interaction_names: Optional[frozenset] = None
+        if isinstance(value, (dict, list, tuple, set, frozenset)):
+            try:
+                self._interaction_names = frozenset(value)
+            except TypeError:
+                pass
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only called while a slot is still unset, so each optional attribute is
+        # looked up once and then stored in its slot
+        default_factory = _OPTIONAL_ROLE_FIELDS.get(name)
+        if default_factory is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        raw_data = self._raw_data
+        value = raw_data[name] if name in raw_data else default_factory()
+        setattr(self, name, value)
+        return value
     
     def __str__(self) -> str:
         return f"Role: {self.role}"
@@ -45,49 +214,79 @@ class Role:
     def get_prompt_description(self) -> str:
         """
         Returns a formatted description of the role suitable for inclusion in a prompt.
+        
+        The description is built on first use and cached, since it is requested
+        once per turn and the role attributes do not change during a discussion.
         """
-        prompt = f"You are a {self.role}.\n\n"
-        prompt += f"Role Description: {self.description}\n\n"
+        if self._prompt_cache is not None:
+            return self._prompt_cache
+        
+        parts = [f"You are a {self.role}.", "", f"Role Description: {self.description}", ""]
         
         if self.responsibilities:
-            prompt += "Key Responsibilities:\n"
-            for resp in self.responsibilities:
-                prompt += f"- {resp}\n"
-            prompt += "\n"
+            parts.append("Key Responsibilities:")
+            parts.extend(f"- {resp}" for resp in self.responsibilities)
+            parts.append("")
         
         if self.expertise:
-            prompt += "Areas of Expertise:\n"
-            for exp in self.expertise:
-                prompt += f"- {exp}\n"
-            prompt += "\n"
+            parts.append("Areas of Expertise:")
+            parts.extend(f"- {exp}" for exp in self.expertise)
+            parts.append("")
         
         if self.characteristics:
-            prompt += "Key Characteristics:\n"
-            for char in self.characteristics:
-                prompt += f"- {char}\n"
-            prompt += "\n"
+            parts.append("Key Characteristics:")
+            parts.extend(f"- {char}" for char in self.characteristics)
+            parts.append("")
         
         # Add hierarchical information if available
         if self.hierarchy_level > 0:
-            prompt += f"Hierarchy Level: {self.hierarchy_level}\n"
+            parts.append(f"Hierarchy Level: {self.hierarchy_level}")
             
             if self.superior:
-                prompt += f"Superior: {self.superior}\n"
+                parts.append(f"Superior: {self.superior}")
             
             if self.subordinates:
-                prompt += "Subordinates:\n"
-                for sub in self.subordinates:
-                    prompt += f"- {sub}\n"
-            prompt += "\n"
+                parts.append("Subordinates:")
+                parts.extend(f"- {sub}" for sub in self.subordinates)
+            parts.append("")
             
             # Add guidance on hierarchical communication
             if self.superior:
-                prompt += f"When addressing complex issues beyond your authority, consider escalating to your superior ({self.superior}).\n\n"
+                parts.append(f"When addressing complex issues beyond your authority, consider escalating to your superior ({self.superior}).")
+                parts.append("")
             
             if self.subordinates:
-                prompt += "As a leader, you should guide and support your subordinates while making final decisions within your authority.\n\n"
+                parts.append("As a leader, you should guide and support your subordinates while making final decisions within your authority.")
+                parts.append("")
+        
+        # Every line, including the blank separators, ends with a newline
+        parts.append("")
+        self._prompt_cache = "\n".join(parts)
+        return self._prompt_cache
+    
+    def get_keyword_sets(self) -> Tuple[frozenset, frozenset, frozenset]:
+        """
+        Get the lowercased words of the role's description, expertise and responsibilities.
+        
+        The sets are built on first use and cached, since they are compared
+        against every topic the role is scored for.
         
-        return prompt
+        Returns:
+            Tuple[frozenset, frozenset, frozenset]: The description, expertise and
+            responsibility words
+        """
+        if self._keyword_sets is None:
+            description_keywords = _tokenize(self.description)
+            expertise_keywords = frozenset().union(*(
+                _tokenize(expertise) for expertise in self.expertise
+                if isinstance(expertise, str)  # Make sure expertise is a string
+            ))
+            responsibility_keywords = frozenset().union(*(
+                _tokenize(resp) for resp in self.responsibilities
+                if isinstance(resp, str)  # Make sure responsibility is a string
+            ))
+            self._keyword_sets = (description_keywords, expertise_keywords, responsibility_keywords)
+        return self._keyword_sets
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -162,11 +361,72 @@ class Role:
 class RoleManager:
     """
     Manages the loading and selection of roles for discussions.
+    
+    With use_cache, the parsed role files are kept in a JSON file in the roles
+    directory, so unchanged files are not parsed again by the next manager. It
+    is off by default because it writes into the roles directory.
     """
-    def __init__(self, roles_dir: str):
+    def __init__(self, roles_dir: str, use_cache: bool = False, lazy: bool = False):
         self.roles_dir = roles_dir
+        self.use_cache = use_cache
         self.roles: Dict[str, Role] = {}
+        # One bit per loaded role, and the bits of the roles each one is compatible with
+        self._role_bits: Dict[str, int] = {}
+        self._compat_bits: Dict[str, int] = {}
+        
+        # Topic analyses, topic words and relevance scores, least recently used first.
+        # They only depend on the topic and the role, so repeated selections reuse them.
+        self._topic_cache: "OrderedDict[str, Tuple[Dict[str, Any], frozenset]]" = OrderedDict()
+        self._relevance_cache: "OrderedDict[Tuple[Role, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # A lazy manager loads nothing up front: get_role parses just the file
+        # named after the role, and the whole directory is loaded the first
+        # time all roles are needed
+        self._loaded = False
+        if lazy:
+            if not os.path.exists(self.roles_dir):
+                raise FileNotFoundError(f"Roles directory not found: {self.roles_dir}")
+        else:
+            self._ensure_loaded()
+    
+    def _ensure_loaded(self) -> None:
+        """
+        Load all roles, unless that has already been done.
+        
+        Roles that get_role already loaded on their own are kept, so callers
+        holding them still hold the managed instances.
+        """
+        if self._loaded:
+            return
+        loaded_early = self.roles
+        self.roles = {}
         self._load_roles()
+        for name, role in loaded_early.items():
+            if name in self.roles:
+                self.roles[name] = role
+        self._build_compatibility_bits()
+        self._loaded = True
+    
+    def _load_role_by_name(self, role_name: str) -> Optional[Role]:
+        """
+        Load a single role from the file named after it, e.g. "Backend Developer"
+        from backend_developer.yaml.
+        
+        Args:
+            role_name: The name of the role
+            
+        Returns:
+            Optional[Role]: The role, or None if no such file defines it
+        """
+        stem = role_name.strip().lower().replace(" ", "_").replace("-", "_")
+        for filename in (stem + ".yaml", stem + ".yml"):
+            role_data, error = _read_role_file(os.path.join(self.roles_dir, filename))
+            if error is None and isinstance(role_data, dict) and role_data.get('role') == role_name:
+                role = Role(role_data)
+                self.roles[role_name] = role
+                return role
+        return None
     
     def _load_roles(self) -> None:
         """
@@ -176,33 +436,211 @@ class RoleManager:
             raise FileNotFoundError(f"Roles directory not found: {self.roles_dir}")
         
         # Files to exclude from loading
-        excluded_files = ['role_template.yaml', 'role_template.yml', 'README.md', 'role_schema.json']
-        
-        for filename in os.listdir(self.roles_dir):
-            if (filename.endswith('.yaml') or filename.endswith('.yml')) and filename not in excluded_files:
-                file_path = os.path.join(self.roles_dir, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        role_data = yaml.safe_load(file)
-                        if role_data and 'role' in role_data:
-                            # Skip template roles with placeholder names
-                            if role_data['role'] == "[Role Name]":
-                                continue
-                            role = Role(role_data)
-                            self.roles[role.role] = role
-                except Exception as e:
-                    print(f"Error loading role from {filename}: {e}")
+        excluded_files = {'role_template.yaml', 'role_template.yml', 'README.md', 'role_schema.json'}
+        
+        # scandir reports the entry type from the directory listing itself, so
+        # sub-directories are skipped without a stat call per file
+        filenames = []
+        file_paths = []
+        signatures = []
+        with os.scandir(self.roles_dir) as entries:
+            for entry in entries:
+                if (entry.name.endswith(('.yaml', '.yml')) and entry.name not in excluded_files
+                        and entry.is_file()):
+                    filenames.append(entry.name)
+                    file_paths.append(entry.path)
+                    if self.use_cache:
+                        stat = entry.stat()
+                        signatures.append((stat.st_mtime_ns, stat.st_size))
+        if not filenames:
+            return
+        
+        # Reuse the parsed data of files that have not changed since they were cached
+        results: List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]] = [(None, None)] * len(filenames)
+        to_parse = list(range(len(filenames)))
+        cache = self._read_role_cache() if self.use_cache else {}
+        if cache:
+            to_parse = []
+            for index, (filename, signature) in enumerate(zip(filenames, signatures)):
+                cached = cache.get(filename)
+                if cached is not None and cached[0] == signature:
+                    results[index] = (cached[1], None)
+                else:
+                    to_parse.append(index)
+        
+        # Read the files concurrently; map keeps the directory order, so a
+        # duplicate role name still resolves to the same file as before
+        if to_parse:
+            parsed = self._parse_files_parallel([file_paths[index] for index in to_parse])
+            for index, result in zip(to_parse, parsed):
+                results[index] = result
+        
+        # Files that failed to parse are left out so they are reported again next time
+        if self.use_cache and (to_parse or len(cache) != len(filenames)):
+            self._write_role_cache({
+                filename: (signature, role_data)
+                for filename, signature, (role_data, error) in zip(filenames, signatures, results)
+                if error is None
+            })
+        
+        for filename, (role_data, error) in zip(filenames, results):
+            try:
+                if error is not None:
+                    raise error
+                if role_data and 'role' in role_data:
+                    # Skip template roles with placeholder names
+                    if role_data['role'] == "[Role Name]":
+                        continue
+                    role = Role(role_data)
+                    self.roles[role.role] = role
+            except Exception as e:
+                logger.warning("Error loading role from %s: %s", filename, e)
+    
+    def _build_compatibility_bits(self) -> None:
+        """
+        Precompute role compatibility as one integer bitset per loaded role.
+        
+        Bit i of a role's set is on when it is compatible with the i-th loaded
+        role, so checking a role against a whole selection is a single AND.
+        """
+        self._role_bits = {name: 1 << index for index, name in enumerate(self.roles)}
+        self._compat_bits = dict.fromkeys(self.roles, 0)
+        for name, role in self.roles.items():
+            if role._interaction_names is None:
+                # Membership in anything else (e.g. a plain string) is not a
+                # lookup by name, so apply is_compatible directly
+                for other_name, other in self.roles.items():
+                    if self.is_compatible(role, other):
+                        self._compat_bits[name] |= self._role_bits[other_name]
+                        self._compat_bits[other_name] |= self._role_bits[name]
+                continue
+            
+            # Compatibility is symmetric, so each mention sets the bit on both sides
+            for other_name in role._interaction_names:
+                if isinstance(other_name, str) and other_name in self._role_bits:
+                    self._compat_bits[name] |= self._role_bits[other_name]
+                    self._compat_bits[other_name] |= self._role_bits[name]
+    
+    def _is_managed(self, roles: List[Role]) -> bool:
+        """
+        Check whether the precomputed compatibility bits apply to all of the given roles.
+        
+        Roles created elsewhere, or added to self.roles after loading, are
+        checked with is_compatible instead.
+        """
+        return all(
+            self.roles.get(role.role) is role and role.role in self._compat_bits
+            for role in roles
+        )
+    
+    @staticmethod
+    def _parse_files_parallel(file_paths: List[str]) -> List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Read and parse role definition files concurrently.
+        
+        Threads are enough while libyaml does the parsing, since it runs outside
+        the interpreter. The pure-Python parser needs processes to use more than
+        one core, which only pays off for large directories.
+        
+        Args:
+            file_paths: The files to parse
+            
+        Returns:
+            List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]: The result
+            of _read_role_file for each file, in the same order
+        """
+        cpu_count = os.cpu_count() or 1
+        if not _HAS_C_LOADER and len(file_paths) > _PROCESS_POOL_MIN_FILES and cpu_count > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=cpu_count) as executor:
+                    chunksize = max(1, len(file_paths) // (cpu_count * 4))
+                    return list(executor.map(_read_role_file, file_paths, chunksize=chunksize))
+            except (OSError, NotImplementedError) as e:
+                # Some platforms cannot start worker processes
+                logger.debug("Falling back to threads for parsing role files: %s", e)
+        
+        with ThreadPoolExecutor(max_workers=min(32, len(file_paths), cpu_count * 4)) as executor:
+            return list(executor.map(_read_role_file, file_paths))
+    
+    def _read_role_cache(self) -> Dict[str, Tuple[Tuple[int, int], Any]]:
+        """
+        Read the cache of parsed role files.
+        
+        The cache is plain JSON and only entries of the expected shape are used,
+        so a tampered or corrupt file can at worst make files be parsed again.
+        
+        Returns:
+            Dict[str, Tuple[Tuple[int, int], Any]]: The (modification time, size) and
+            parsed data of each cached file by filename, or an empty dictionary if
+            there is no usable cache
+        """
+        cache_file = os.path.join(self.roles_dir, _ROLE_CACHE_FILENAME)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.debug("Ignoring unreadable role cache %s: %s", cache_file, e)
+            return {}
+        
+        if not isinstance(cache, dict) or cache.get("version") != _ROLE_CACHE_VERSION \
+                or not isinstance(cache.get("files"), dict):
+            return {}
+        files = {}
+        for filename, entry in cache["files"].items():
+            if (isinstance(entry, dict) and type(entry.get("mtime_ns")) is int
+                    and type(entry.get("size")) is int
+                    and (entry.get("data") is None or isinstance(entry.get("data"), dict))):
+                files[filename] = ((entry["mtime_ns"], entry["size"]), entry["data"])
+        return files
+    
+    def _write_role_cache(self, files: Dict[str, Tuple[Tuple[int, int], Any]]) -> None:
+        """
+        Atomically replace the cache of parsed role files.
+        
+        The cache only saves time, so a directory that cannot be written to, or
+        role data that cannot be stored as JSON, is not an error.
+        """
+        cache_file = os.path.join(self.roles_dir, _ROLE_CACHE_FILENAME)
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        cache = {
+            "version": _ROLE_CACHE_VERSION,
+            "files": {
+                filename: {"mtime_ns": mtime_ns, "size": size, "data": role_data}
+                for filename, ((mtime_ns, size), role_data) in files.items()
+            },
+        }
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as file:
+                json.dump(cache, file)
+            os.replace(temp_file, cache_file)
+        except Exception as e:
+            logger.debug("Could not write role cache %s: %s", cache_file, e)
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
     
     def get_role(self, role_name: str) -> Optional[Role]:
         """
         Get a role by name.
         """
-        return self.roles.get(role_name)
+        role = self.roles.get(role_name)
+        if role is None and not self._loaded:
+            # Look for the role's own file first, and only load the whole
+            # directory when it is named differently
+            role = self._load_role_by_name(role_name)
+            if role is None:
+                self._ensure_loaded()
+                role = self.roles.get(role_name)
+        return role
     
     def get_all_roles(self) -> List[Role]:
         """
         Get all available roles.
         """
+        self._ensure_loaded()
         return list(self.roles.values())
     
     def is_compatible(self, role1: Role, role2: Role) -> bool:
@@ -217,6 +655,10 @@ class RoleManager:
         Returns:
             bool: True if the roles are compatible, False otherwise
         """
+        names1 = role1._interaction_names
+        names2 = role2._interaction_names
+        if names1 is not None and names2 is not None:
+            return role2.role in names1 or role1.role in names2
         return role2.role in role1.interaction_with or role1.role in role2.interaction_with
     
     def find_compatible_roles(self, role: Role, all_roles: Optional[List[Role]] = None) -> List[Role]:
@@ -232,7 +674,11 @@ class RoleManager:
         """
         if all_roles is None:
             all_roles = self.get_all_roles()
-            
+        
+        if self._is_managed([role]) and self._is_managed(all_roles):
+            compat_bits = self._compat_bits[role.role]
+            return [r for r in all_roles if r != role and compat_bits & self._role_bits[r.role]]
+        
         return [r for r in all_roles if r != role and self.is_compatible(role, r)]
     
     def validate_role_compatibility(self, roles: List[Role]) -> Tuple[bool, str]:
@@ -247,6 +693,17 @@ class RoleManager:
             Tuple[bool, str]: A tuple containing a boolean indicating if the roles are compatible,
                              and a message explaining the result
         """
+        names = [role.role for role in roles]
+        if len(set(names)) == len(names) and self._is_managed(roles):
+            selected_bits = 0
+            for name in names:
+                selected_bits |= self._role_bits[name]
+            for role in roles:
+                # Compatible with another selected role; the role's own bit is masked out
+                if not self._compat_bits[role.role] & selected_bits & ~self._role_bits[role.role]:
+                    return False, f"{role.role} is not compatible with any other selected role"
+            return True, "All roles are compatible"
+        
         for i, role1 in enumerate(roles):
             has_compatible = False
             for j, role2 in enumerate(roles):
@@ -268,6 +725,15 @@ class RoleManager:
         all_roles = self.get_all_roles()
         matrix = {}
         
+        if self._is_managed(all_roles):
+            for role1 in all_roles:
+                compat_bits = self._compat_bits[role1.role]
+                matrix[role1.role] = {
+                    role2.role: bool(compat_bits & self._role_bits[role2.role])
+                    for role2 in all_roles if role1 != role2
+                }
+            return matrix
+        
         for role1 in all_roles:
             matrix[role1.role] = {}
             for role2 in all_roles:
@@ -287,28 +753,27 @@ class RoleManager:
         Returns:
             A relevance score (higher is more relevant)
         """
-        # Simple keyword matching for now
-        topic_keywords = set(re.findall(r'\b\w+\b', topic.lower()))
+        cache_key = (role, topic)
+        with self._cache_lock:
+            cached = self._relevance_cache.get(cache_key)
+            if cached is not None:
+                self._relevance_cache.move_to_end(cache_key)
+                return cached
+        
+        # Simple keyword matching for now; the role's words are tokenized once and cached
+        topic_keywords = self._get_topic_entry(topic)[1]
+        description_keywords, expertise_keywords, responsibility_keywords = role.get_keyword_sets()
         relevance_score = 0.0
         
         # Check role description
-        description_keywords = set(re.findall(r'\b\w+\b', role.description.lower()))
         description_matches = len(topic_keywords.intersection(description_keywords))
         relevance_score += description_matches * 0.1
         
         # Check expertise areas (highest weight)
-        expertise_keywords = set()
-        for expertise in role.expertise:
-            if isinstance(expertise, str):  # Make sure expertise is a string
-                expertise_keywords.update(re.findall(r'\b\w+\b', expertise.lower()))
         expertise_matches = len(topic_keywords.intersection(expertise_keywords))
         relevance_score += expertise_matches * 0.4  # Highest weight for expertise matches
         
         # Check responsibilities
-        responsibility_keywords = set()
-        for resp in role.responsibilities:
-            if isinstance(resp, str):  # Make sure responsibility is a string
-                responsibility_keywords.update(re.findall(r'\b\w+\b', resp.lower()))
         responsibility_matches = len(topic_keywords.intersection(responsibility_keywords))
         relevance_score += responsibility_matches * 0.3
         
@@ -320,13 +785,70 @@ class RoleManager:
         else:
             normalized_score = 0.0
         
+        with self._cache_lock:
+            self._relevance_cache[cache_key] = normalized_score
+            if len(self._relevance_cache) > _RELEVANCE_CACHE_SIZE:
+                self._relevance_cache.popitem(last=False)
         return normalized_score
     
+    def _score_roles(self, roles: List[Role], topic: str) -> List[float]:
+        """
+        Calculate the relevance of each role to a topic.
+        
+        Scoring is pure-Python set work that holds the GIL, so it runs
+        sequentially; a thread pool only adds overhead.
+        
+        Args:
+            roles: The roles to evaluate
+            topic: The discussion topic
+            
+        Returns:
+            List[float]: The relevance scores, in the order of the roles
+        """
+        return [self._calculate_role_relevance(role, topic) for role in roles]
+    
+    def _get_topic_entry(self, topic: str) -> Tuple[Dict[str, Any], frozenset]:
+        """
+        Get the keyword analysis and the lowercased words of a topic, computing them once.
+        
+        Args:
+            topic: The discussion topic
+            
+        Returns:
+            Tuple[Dict[str, Any], frozenset]: The analysis and the topic's words
+        """
+        with self._cache_lock:
+            entry = self._topic_cache.get(topic)
+            if entry is not None:
+                self._topic_cache.move_to_end(topic)
+                return entry
+        
+        entry = (self._analyze_topic_keywords(topic), _tokenize(topic))
+        with self._cache_lock:
+            self._topic_cache[topic] = entry
+            if len(self._topic_cache) > _TOPIC_CACHE_SIZE:
+                self._topic_cache.popitem(last=False)
+        return entry
+    
     def _analyze_topic_with_llm(self, topic: str) -> Dict[str, Any]:
         """
         Analyze the topic using an LLM to extract key aspects.
         This is a placeholder implementation that would be replaced with actual LLM integration.
         
+        Args:
+            topic: The discussion topic
+            
+        Returns:
+            Dict[str, Any]: A dictionary containing analysis results
+        """
+        analysis = self._get_topic_entry(topic)[0]
+        # Hand out a copy so callers cannot change the cached analysis
+        return dict(analysis, key_aspects=list(analysis["key_aspects"]))
+    
+    def _analyze_topic_keywords(self, topic: str) -> Dict[str, Any]:
+        """
+        Compute the keyword-based topic analysis behind _analyze_topic_with_llm.
+        
         Args:
             topic: The discussion topic
             
@@ -336,41 +858,26 @@ class RoleManager:
         # This is a placeholder implementation
         # In a real implementation, this would call an LLM to analyze the topic
         
-        # Simple keyword-based analysis
-        topic_lower = topic.lower()
+        # Simple keyword-based analysis: one scan finds every category mentioned
+        categories = {_TOPIC_KEYWORD_CATEGORIES[match.group(1)]
+                      for match in _TOPIC_KEYWORD_RE.finditer(topic.lower())}
         
         analysis = {
-            "key_aspects": [],
+            "key_aspects": [aspect for aspect in _TOPIC_ASPECTS if aspect in categories],
             "technical_complexity": "medium",
             "business_impact": "medium"
         }
         
-        # Extract key aspects based on common keywords
-        if any(keyword in topic_lower for keyword in ["security", "authentication", "authorization", "privacy"]):
-            analysis["key_aspects"].append("security")
-        
-        if any(keyword in topic_lower for keyword in ["user", "interface", "ui", "ux", "experience", "design"]):
-            analysis["key_aspects"].append("user experience")
-        
-        if any(keyword in topic_lower for keyword in ["api", "database", "backend", "server", "performance"]):
-            analysis["key_aspects"].append("backend")
-        
-        if any(keyword in topic_lower for keyword in ["deploy", "infrastructure", "cloud", "kubernetes", "docker"]):
-            analysis["key_aspects"].append("infrastructure")
-        
-        if any(keyword in topic_lower for keyword in ["business", "strategy", "market", "customer", "product"]):
-            analysis["key_aspects"].append("business")
-        
         # Determine technical complexity
-        if any(keyword in topic_lower for keyword in ["complex", "difficult", "challenging", "advanced"]):
+        if "high_complexity" in categories:
             analysis["technical_complexity"] = "high"
-        elif any(keyword in topic_lower for keyword in ["simple", "basic", "easy"]):
+        elif "low_complexity" in categories:
             analysis["technical_complexity"] = "low"
         
         # Determine business impact
-        if any(keyword in topic_lower for keyword in ["critical", "important", "essential", "key"]):
+        if "high_impact" in categories:
             analysis["business_impact"] = "high"
-        elif any(keyword in topic_lower for keyword in ["minor", "small", "low"]):
+        elif "low_impact" in categories:
             analysis["business_impact"] = "low"
         
         return analysis
@@ -398,18 +905,25 @@ class RoleManager:
         # Analyze the topic to extract key aspects
         topic_analysis = self._analyze_topic_with_llm(topic)
         
+        # Lowercase the key aspects once rather than for every role
+        key_aspects = [aspect.lower() for aspect in topic_analysis.get("key_aspects", [])]
+        
         # Calculate relevance scores for all roles
         role_scores = []
-        for role in all_roles:
-            relevance_score = self._calculate_role_relevance(role, topic)
-            
-            # Boost scores based on topic analysis
-            for aspect in topic_analysis.get("key_aspects", []):
-                if any(aspect.lower() in expertise.lower() for expertise in role.expertise):
-                    relevance_score += 0.2
+        for role, relevance_score in zip(all_roles, self._score_roles(all_roles, topic)):
+            # Boost scores based on topic analysis. An aspect occurs in one of the
+            # expertise areas exactly when it occurs in all of them joined by
+            # newlines, so each role's expertise is lowercased and searched as one string.
+            if key_aspects:
+                expertise_text = "\n".join(
+                    expertise.lower() for expertise in role.expertise if isinstance(expertise, str)
+                )
+                for aspect in key_aspects:
+                    if aspect in expertise_text:
+                        relevance_score += 0.2
             
             # Ensure diversity by boosting scores for different role types
-            role_type = self._determine_role_type(role)
+            role_type = role._role_type
             if role_type == "business" and topic_analysis.get("business_impact") == "high":
                 relevance_score += 0.1
             elif role_type == "technical" and topic_analysis.get("technical_complexity") == "high":
@@ -422,39 +936,54 @@ class RoleManager:
         
         # Start with the most relevant role
         selected_roles = [role_scores[0][0]]
+        selected_types = {selected_roles[0]._role_type}
         
-        # Add remaining roles considering both relevance and compatibility
-        remaining_candidates = [r for r, _ in role_scores[1:]]
+        # With precomputed bits, counting compatible selected roles is one AND
+        use_bits = self._is_managed(all_roles)
+        selected_bits = self._role_bits[selected_roles[0].role] if use_bits else 0
         
-        while len(selected_roles) < num_roles and remaining_candidates:
-            best_candidate = None
+        # Add remaining roles considering both relevance and compatibility.
+        # Picked candidates are switched off in a mask instead of being removed
+        # from the list, which would rescan it on every step.
+        candidates = role_scores[1:]
+        alive = [True] * len(candidates)
+        remaining = len(candidates)
+        
+        while len(selected_roles) < num_roles and remaining:
+            best_index = -1
             best_score = -1
             
-            for candidate in remaining_candidates:
-                # Calculate compatibility score (how many selected roles this candidate is compatible with)
-                compatibility_score = sum(1 for selected_role in selected_roles 
-                                         if self.is_compatible(selected_role, candidate))
+            for index, (candidate, relevance_score) in enumerate(candidates):
+                if not alive[index]:
+                    continue
                 
-                # Get the candidate's relevance score
-                relevance_score = next(score for role, score in role_scores if role == candidate)
+                # Calculate compatibility score (how many selected roles this candidate is compatible with)
+                if use_bits:
+                    compatibility_score = bin(self._compat_bits[candidate.role] & selected_bits).count("1")
+                else:
+                    compatibility_score = sum(1 for selected_role in selected_roles 
+                                             if self.is_compatible(selected_role, candidate))
                 
                 # Calculate diversity score (how different this role is from already selected roles)
-                selected_role_types = [self._determine_role_type(r) for r in selected_roles]
-                candidate_type = self._determine_role_type(candidate)
-                diversity_score = 0.3 if candidate_type not in selected_role_types else 0.0
+                diversity_score = 0.3 if candidate._role_type not in selected_types else 0.0
                 
                 # Combined score with weights
                 combined_score = (relevance_score * 0.5) + (compatibility_score * 0.3) + diversity_score
                 
                 if combined_score > best_score:
                     best_score = combined_score
-                    best_candidate = candidate
+                    best_index = index
             
-            if best_candidate:
-                selected_roles.append(best_candidate)
-                remaining_candidates.remove(best_candidate)
-            else:
+            if best_index < 0:
                 break
+            
+            best_candidate = candidates[best_index][0]
+            alive[best_index] = False
+            remaining -= 1
+            selected_roles.append(best_candidate)
+            selected_types.add(best_candidate._role_type)
+            if use_bits:
+                selected_bits |= self._role_bits[best_candidate.role]
         
         return selected_roles
     
@@ -466,28 +995,9 @@ class RoleManager:
             role: The role to determine the type for
             
         Returns:
-            str: The role type
+            str: The role type, as computed once when the role was created
         """
-        role_lower = role.role.lower()
-        
-        # Business roles
-        if any(term in role_lower for term in ["product", "business", "manager", "owner", "stakeholder", "analyst"]):
-            return "business"
-        
-        # Design roles
-        if any(term in role_lower for term in ["design", "ux", "user experience", "ui"]):
-            return "design"
-        
-        # Security roles
-        if any(term in role_lower for term in ["security", "privacy", "compliance"]):
-            return "security"
-        
-        # Operations roles
-        if any(term in role_lower for term in ["devops", "operations", "sre", "reliability"]):
-            return "operations"
-        
-        # Default to technical
-        return "technical"
+        return role._role_type
     
     def select_compatible_roles(self, topic: str, num_roles: int = 3) -> List[Role]:
         """
@@ -506,13 +1016,16 @@ class RoleManager:
             return []
         
         # Calculate relevance scores for all roles
-        role_scores = [(role, self._calculate_role_relevance(role, topic)) for role in all_roles]
+        role_scores = list(zip(all_roles, self._score_roles(all_roles, topic)))
         
         # Sort roles by relevance score
         role_scores.sort(key=lambda x: x[1], reverse=True)
+        score_by_role = dict(role_scores)
         
         # Start with the most relevant role
         selected = [role_scores[0][0]]
+        # Membership is checked for every candidate on every step
+        selected_ids = {id(selected[0])}
         
         # Add compatible roles until we reach the desired number
         while len(selected) < num_roles and len(selected) < len(all_roles):
@@ -520,7 +1033,7 @@ class RoleManager:
             compatible_candidates = set()
             for selected_role in selected:
                 for candidate, _ in role_scores:
-                    if candidate not in selected and self.is_compatible(selected_role, candidate):
+                    if id(candidate) not in selected_ids and self.is_compatible(selected_role, candidate):
                         compatible_candidates.add(candidate)
             
             # If no compatible roles found, break
@@ -532,13 +1045,14 @@ class RoleManager:
             best_score = -1
             
             for candidate in compatible_candidates:
-                score = next(score for role, score in role_scores if role == candidate)
+                score = score_by_role[candidate]
                 if score > best_score:
                     best_score = score
                     best_candidate = candidate
             
             if best_candidate:
                 selected.append(best_candidate)
+                selected_ids.add(id(best_candidate))
             else:
                 break
         
@@ -35,7 +35,8 @@ def main():
     
     # 역할 관리자 초기화
     try:
-        role_manager = RoleManager(roles_dir)
+        # 역할이 지정된 경우 해당 역할 파일만 읽음
+        role_manager = RoleManager(roles_dir, lazy=bool(args.roles))
     except Exception as e:
         print(f"Error initializing RoleManager: {e}")
         sys.exit(1)
@@ -0,0 +1,123 @@
+import pytest
+from unittest.mock import MagicMock
+from discussion_llama.role.role_manager import Role
+from discussion_llama.engine.discussion_engine import DiscussionState, DiscussionEngine
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "serial: run on a single worker when tests are distributed with pytest-xdist")
+
+
+def pytest_collection_modifyitems(config, items):
+    # With pytest-xdist and --dist loadgroup, tests in the same group run on the
+    # same worker, one after another
+    if not config.pluginmanager.hasplugin("xdist"):
+        return
+    for item in items:
+        if item.get_closest_marker("serial"):
+            item.add_marker(pytest.mark.xdist_group("serial"))
+
+
+@pytest.fixture(scope="session")
+def role1_data():
+    """Definition of the first sample role. Shared by all tests, so do not modify it."""
+    return {
+        "role": "role1",
+        "description": "Test role 1",
+        "responsibilities": ["Responsibility 1"],
+        "expertise": ["Expertise 1"],
+        "characteristics": ["Characteristic 1"],
+        "interaction_with": {},
+        "success_criteria": ["Success 1"]
+    }
+
+
+@pytest.fixture(scope="session")
+def role2_data():
+    """Definition of the second sample role. Shared by all tests, so do not modify it."""
+    return {
+        "role": "role2",
+        "description": "Test role 2",
+        "responsibilities": ["Responsibility 2"],
+        "expertise": ["Expertise 2"],
+        "characteristics": ["Characteristic 2"],
+        "interaction_with": {},
+        "success_criteria": ["Success 2"]
+    }
+
+
+@pytest.fixture(scope="module")
+def sample_roles(role1_data, role2_data):
+    """Create sample roles for testing, once per test module."""
+    return [Role(role1_data), Role(role2_data)]
+
+
+@pytest.fixture
+def temp_state_dir(tmp_path):
+    """Create a temporary directory for state files."""
+    # Engines reload whatever state an earlier test left for the same topic,
+    # so every test gets its own directory
+    return str(tmp_path)
+
+
+@pytest.fixture(scope="module")
+def _llm_stub():
+    return MagicMock()
+
+
+@pytest.fixture
+def shared_llm_stub(_llm_stub):
+    """An LLM client stub shared by the tests of a module and reset after each test."""
+    _llm_stub.generate.return_value = "This is a mock response from the LLM."
+    yield _llm_stub
+    # Resetting the whole stub would also reset its magic methods (such as
+    # __bool__), so only the client methods get their configuration cleared
+    _llm_stub.reset_mock()
+    for method in (_llm_stub.generate, _llm_stub.generate_response):
+        method.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Make time.sleep return immediately, e.g. for retry backoff."""
+    monkeypatch.setattr("time.sleep", lambda *args, **kwargs: None)
+
+
+class InMemoryStateManager:
+    """
+    Keeps the discussion state of an engine in memory instead of on disk.
+    
+    States are stored as dictionaries and rebuilt on load, so like the disk
+    manager each load returns an independent copy of the last saved state.
+    """
+    def __init__(self, topic, roles):
+        self.topic = topic
+        self.roles = roles
+        self._data = None
+    
+    def save_state(self, state, pretty=False):
+        self._data = state.to_dict()
+    
+    def load_state(self):
+        if self._data is None:
+            return DiscussionState(self.topic, self.roles)
+        return DiscussionState.from_dict(self._data, self.roles)
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def make_in_memory_engine(sample_roles):
+    """Create discussion engines over the sample roles that keep their state in memory."""
+    def make(**kwargs):
+        kwargs.setdefault("topic", "Test topic")
+        kwargs.setdefault("roles", sample_roles)
+        # The disk manager created here is replaced before it touches the disk
+        engine = DiscussionEngine(state_dir="unused", **kwargs)
+        engine.state_manager = InMemoryStateManager(engine.topic, engine.roles)
+        return engine
+    return make
@@ -1,10 +1,10 @@
 import os
-import tempfile
 import json
 import pytest
-from unittest.mock import patch, MagicMock
 import argparse
-from discussion_llama.cli.cli import run_discussion, format_message
+from types import SimpleNamespace
+from discussion_llama.cli import cli
+from discussion_llama.cli.cli import run_discussion, format_message, save_result
 
 
 def test_format_message():
@@ -25,34 +25,37 @@ def test_format_message():
     assert formatted == "[test_role]: "
 
 
-@patch('discussion_llama.cli.cli.RoleManager')
-@patch('discussion_llama.cli.cli.create_llm_client')
-@patch('discussion_llama.cli.cli.ConsensusDetector')
-@patch('discussion_llama.cli.cli.DiscussionEngine')
-def test_run_discussion(mock_engine_class, mock_detector_class, mock_create_llm, mock_role_manager_class):
-    # Create mock objects
-    mock_role_manager = MagicMock()
-    mock_role_manager_class.return_value = mock_role_manager
-    
-    mock_role1 = MagicMock()
-    mock_role1.role = "role1"
-    mock_role2 = MagicMock()
-    mock_role2.role = "role2"
-    
-    mock_role_manager.get_role.side_effect = lambda role: {"role1": mock_role1, "role2": mock_role2}.get(role)
-    mock_role_manager.select_roles_for_discussion.return_value = [mock_role1, mock_role2]
-    
-    mock_llm_client = MagicMock()
-    mock_create_llm.return_value = mock_llm_client
-    
-    mock_detector = MagicMock()
-    mock_detector_class.return_value = mock_detector
-    
-    mock_engine = MagicMock()
-    mock_engine_class.return_value = mock_engine
-    
-    # Mock the discussion result
-    mock_engine.run_discussion.return_value = {
+class _Recorder:
+    """A callable stub that records its calls."""
+    def __init__(self, return_value=None, side_effect=None):
+        self.calls = []
+        self.return_value = return_value
+        self.side_effect = side_effect
+    
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.side_effect is not None:
+            return self.side_effect(*args, **kwargs)
+        return self.return_value
+
+
+def test_run_discussion(monkeypatch, tmp_path):
+    # Create stub objects
+    role1 = SimpleNamespace(role="role1")
+    role2 = SimpleNamespace(role="role2")
+    
+    role_manager = SimpleNamespace(
+        get_role=_Recorder(side_effect={"role1": role1, "role2": role2}.get),
+        select_roles_for_discussion=_Recorder([role1, role2])
+    )
+    role_manager_class = _Recorder(role_manager)
+    
+    llm_client = object()
+    create_llm = _Recorder(llm_client)
+    detector_class = _Recorder(object())
+    
+    # Stub the discussion result
+    engine = SimpleNamespace(run_discussion=_Recorder({
         "topic": "test topic",
         "discussion": [
             {"role": "role1", "content": "Message 1"},
@@ -60,68 +63,73 @@ def test_run_discussion(mock_engine_class, mock_detector_class, mock_create_llm,
         ],
         "consensus_reached": True,
         "turns": 2
-    }
+    }))
+    engine_class = _Recorder(engine)
+    
+    monkeypatch.setattr("discussion_llama.cli.cli.RoleManager", role_manager_class)
+    monkeypatch.setattr("discussion_llama.cli.cli.create_llm_client", create_llm)
+    monkeypatch.setattr("discussion_llama.cli.cli.ConsensusDetector", detector_class)
+    monkeypatch.setattr("discussion_llama.cli.cli.DiscussionEngine", engine_class)
+    
+    output_file = str(tmp_path / "output.json")
+    
+    # Create args
+    args = argparse.Namespace(
+        topic="test topic",
+        roles_dir="./roles",
+        roles="role1,role2",
+        num_roles=3,
+        max_turns=30,
+        state_dir="./discussion_state",
+        llm_client="mock",
+        model="llama2:7b-chat-q4_0",
+        output=output_file
+    )
     
-    # Create a temporary directory for output
-    with tempfile.TemporaryDirectory() as temp_dir:
-        output_file = os.path.join(temp_dir, "output.json")
-        
-        # Create args
-        args = argparse.Namespace(
-            topic="test topic",
-            roles_dir="./roles",
-            roles="role1,role2",
-            num_roles=3,
-            max_turns=30,
-            state_dir="./discussion_state",
-            llm_client="mock",
-            model="llama2:7b-chat-q4_0",
-            output=output_file
-        )
-        
-        # Run the discussion
-        run_discussion(args)
-        
-        # Check that the role manager was initialized correctly
-        mock_role_manager_class.assert_called_once_with("./roles")
-        
-        # Check that the roles were selected correctly
-        mock_role_manager.get_role.assert_any_call("role1")
-        mock_role_manager.get_role.assert_any_call("role2")
-        
-        # Check that the LLM client was created correctly
-        mock_create_llm.assert_called_once_with("mock", model="llama2:7b-chat-q4_0")
-        
-        # Check that the consensus detector was created correctly
-        mock_detector_class.assert_called_once_with(mock_llm_client)
-        
-        # Check that the discussion engine was created correctly
-        mock_engine_class.assert_called_once_with("test topic", [mock_role1, mock_role2], "./discussion_state")
-        
-        # Check that the discussion was run
-        mock_engine.run_discussion.assert_called_once()
-        
-        # Check that the output file was created
-        assert os.path.exists(output_file)
-        
-        # Check the content of the output file
-        with open(output_file, "r") as f:
-            output = json.load(f)
-            assert output["topic"] == "test topic"
-            assert len(output["discussion"]) == 2
-            assert output["consensus_reached"] is True
-            assert output["turns"] == 2
+    # Run the discussion
+    run_discussion(args)
+    
+    # Check that the role manager was initialized correctly
+    assert role_manager_class.calls == [(("./roles",), {"lazy": True})]
+    
+    # Check that the roles were selected correctly
+    assert (("role1",), {}) in role_manager.get_role.calls
+    assert (("role2",), {}) in role_manager.get_role.calls
+    
+    # Check that the LLM client was created correctly
+    assert create_llm.calls == [(("mock",), {"model": "llama2:7b-chat-q4_0"})]
+    
+    # Check that the consensus detector was created correctly
+    assert detector_class.calls == [((llm_client,), {})]
+    
+    # Check that the discussion engine was created correctly
+    assert engine_class.calls == [(("test topic", [role1, role2], "./discussion_state"), {})]
+    assert engine.max_turns == 30
+    
+    # Check that the discussion was run
+    assert len(engine.run_discussion.calls) == 1
+    
+    # Check that the output file was created
+    assert os.path.exists(output_file)
+    
+    # Check the content of the output file
+    with open(output_file, "r") as f:
+        output = json.load(f)
+        assert output["topic"] == "test topic"
+        assert len(output["discussion"]) == 2
+        assert output["consensus_reached"] is True
+        assert output["turns"] == 2
 
 
-@patch('discussion_llama.cli.cli.RoleManager')
-def test_run_discussion_no_roles(mock_role_manager_class):
-    # Create mock objects
-    mock_role_manager = MagicMock()
-    mock_role_manager_class.return_value = mock_role_manager
-    
-    # Mock that no roles are found
-    mock_role_manager.get_role.return_value = None
-    mock_role_manager.select_roles_for_discussion.return_value = []
+def test_run_discussion_no_roles(monkeypatch):
+    # Create stub objects
+    # No roles are found
+    role_manager = SimpleNamespace(
+        get_role=_Recorder(None),
+        select_roles_for_discussion=_Recorder([])
+    )
+    role_manager_class = _Recorder(role_manager)
+    monkeypatch.setattr("discussion_llama.cli.cli.RoleManager", role_manager_class)
     
     # Create args
     args = argparse.Namespace(
@@ -140,8 +148,27 @@ def test_run_discussion_no_roles(mock_role_manager_class):
     run_discussion(args)
     
     # Check that the role manager was initialized correctly
-    mock_role_manager_class.assert_called_once_with("./roles")
+    assert role_manager_class.calls == [(("./roles",), {"lazy": True})]
     
     # Check that the roles were selected correctly
-    mock_role_manager.get_role.assert_any_call("role1")
-    mock_role_manager.get_role.assert_any_call("role2") 
\ No newline at end of file
+    assert role_manager.get_role.calls == [(("role1",), {}), (("role2",), {})]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_save_result(monkeypatch, tmp_path, use_orjson):
+    if use_orjson and cli.orjson is None:
+        pytest.skip("orjson is not installed")
+    if not use_orjson:
+        monkeypatch.setattr(cli, "orjson", None)
+    
+    result = {
+        "topic": "테스트 topic",
+        "discussion": [{"role": "role1", "content": "Line 1\nLine 2"}],
+        "consensus_reached": False,
+        "turns": 1
+    }
+    output_file = tmp_path / "output.json"
+    
+    save_result(result, str(output_file))
+    
+    assert output_file.read_text(encoding="utf-8") == json.dumps(result, ensure_ascii=False, indent=2)
@@ -1,7 +1,9 @@
 import pytest
+from discussion_llama.engine import consensus_detector
 from discussion_llama.engine.consensus_detector import (
     extract_key_points,
     group_similar_points,
+    calculate_similarity,
     check_consensus_rule_based,
     ConsensusDetector
 )
@@ -9,89 +11,155 @@ from discussion_llama.llm.llm_client import MockLLMClient
 from unittest.mock import patch
 
 
-def test_extract_key_points():
-    # Test with marker words
-    message = "This is a test message. The important point is that we need to focus on quality. Another key aspect is performance."
-    points = extract_key_points(message)
-    
-    assert len(points) == 2
-    assert "The important point is that we need to focus on quality" in points
-    assert "Another key aspect is performance" in points
-    
-    # Test with no marker words
-    message = "This is a test message. No marker words here. Just regular sentences."
-    points = extract_key_points(message)
-    
-    assert len(points) == 3
-    assert "This is a test message" in points
-    
-    # Test with max_points
-    message = "Important point 1. Key point 2. Critical point 3. Essential point 4."
-    points = extract_key_points(message, max_points=2)
+# (message, max_points, expected number of points, points that must be among them)
+EXTRACT_KEY_POINTS_CASES = (
+    # With marker words
+    ("This is a test message. The important point is that we need to focus on quality. Another key aspect is performance.",
+     10, 2, frozenset({"The important point is that we need to focus on quality", "Another key aspect is performance"})),
+    # With no marker words
+    ("This is a test message. No marker words here. Just regular sentences.",
+     10, 3, frozenset({"This is a test message"})),
+    # With max_points
+    ("Important point 1. Key point 2. Critical point 3. Essential point 4.",
+     2, 2, frozenset()),
+    # With Korean marker words
+    ("이것은 중요합니다. 날씨가 좋다.",
+     10, 1, frozenset({"이것은 중요합니다."})),
+    # With modal verbs but no marker words
+    ("We must ship soon. It rains. Everything was fine.",
+     10, 1, frozenset({"We must ship soon."})),
+)
+
+
+@pytest.mark.parametrize("message,max_points,expected_len,expected_points", EXTRACT_KEY_POINTS_CASES,
+                         ids=["markers", "no_markers", "max_points", "korean_markers", "modal_verbs"])
+def test_extract_key_points(message, max_points, expected_len, expected_points):
+    points = extract_key_points(message, max_points=max_points)
     
-    assert len(points) == 2
+    assert len(points) == expected_len
+    assert expected_points.issubset(points)
+
+
+_GROUP_INPUT = (
+    "We should focus on performance",
+    "Performance is the most important aspect",
+    "Security is critical",
+    "We need to ensure the system is secure",
+    "Usability is also important"
+)
+# We should have 3 groups: performance, security, usability, of these sizes
+_EXPECTED_GROUP_SIZES = {"performance": 2, "security": 2, "usability": 1}
 
 
 def test_group_similar_points():
-    points = [
-        "We should focus on performance",
-        "Performance is the most important aspect",
-        "Security is critical",
-        "We need to ensure the system is secure",
-        "Usability is also important"
-    ]
+    groups = group_similar_points(list(_GROUP_INPUT))
     
-    groups = group_similar_points(points)
-    
-    # We should have 3 groups: performance, security, usability
     assert len(groups) == 3
     
-    # Check that similar points are grouped together
-    performance_group = next((g for g in groups if "performance" in g[0].lower()), None)
-    assert performance_group is not None
-    assert len(performance_group) == 2
-    
-    security_group = next((g for g in groups if "security" in g[0].lower()), None)
-    assert security_group is not None
-    assert len(security_group) == 2
-    
-    usability_group = next((g for g in groups if "usability" in g[0].lower()), None)
-    assert usability_group is not None
-    assert len(usability_group) == 1
+    # Check that similar points are grouped together, naming each group by the
+    # topic its first point mentions
+    group_sizes = {
+        topic: len(group)
+        for group in groups
+        for topic in _EXPECTED_GROUP_SIZES.keys() & set(group[0].lower().split())
+    }
+    assert group_sizes == _EXPECTED_GROUP_SIZES
 
 
-def test_check_consensus_rule_based():
-    # Test with no consensus
-    messages = [
-        {"role": "role1", "content": "We should focus on performance."},
-        {"role": "role2", "content": "Security is more important."},
-        {"role": "role3", "content": "Usability is the key."},
-        {"role": "role4", "content": "Cost is the main concern."}
-    ]
-    
-    consensus = check_consensus_rule_based(messages)
-    assert consensus is False
-    
-    # Test with consensus
-    messages = [
-        {"role": "role1", "content": "Performance is important. We should optimize the code."},
-        {"role": "role2", "content": "I agree that performance is key. We need faster algorithms."},
-        {"role": "role3", "content": "Performance is indeed critical. Let's focus on that."},
-        {"role": "role4", "content": "While security matters, I agree that performance is the main issue."}
-    ]
-    
-    consensus = check_consensus_rule_based(messages)
-    assert consensus is True
-    
-    # Test with too few messages
-    messages = [
-        {"role": "role1", "content": "Performance is important."},
-        {"role": "role2", "content": "I agree."}
-    ]
+
+def test_group_similar_points_matches_pairwise_similarity():
+    points = list(_GROUP_INPUT) + ["", "Secure and fast", "performance performance"]
+    
+    # Reference: each ungrouped point takes every later ungrouped point similar to it
+    expected = []
+    grouped = set()
+    for i, point in enumerate(points):
+        if i in grouped:
+            continue
+        group = [point]
+        for j in range(i + 1, len(points)):
+            if j not in grouped and calculate_similarity(point, points[j]) > 0.2:
+                group.append(points[j])
+                grouped.add(j)
+        expected.append(group)
+    
+    assert group_similar_points(points) == expected
+
+# (message contents, one per role, whether they reach consensus)
+CONSENSUS_RULE_BASED_CASES = (
+    # No consensus
+    (("We should focus on performance.",
+      "Security is more important.",
+      "Usability is the key.",
+      "Cost is the main concern."), False),
+    # Consensus
+    (("Performance is important. We should optimize the code.",
+      "I agree that performance is key. We need faster algorithms.",
+      "Performance is indeed critical. Let's focus on that.",
+      "While security matters, I agree that performance is the main issue."), True),
+    # Too few messages
+    (("Performance is important.",
+      "I agree."), False),
+    # Repeated points
+    (("Security is critical.",
+      "Security is critical.",
+      "Security is critical.",
+      "We must protect privacy."), True),
+    # Points without any terms are not similar to anything, not even themselves
+    (("...",
+      "...",
+      "!!!"), False),
+)
+
+
+@pytest.mark.parametrize("contents,expected", CONSENSUS_RULE_BASED_CASES,
+                         ids=["no_consensus", "consensus", "too_few_messages", "repeated_points", "no_terms"])
+def test_check_consensus_rule_based(contents, expected):
+    messages = [{"role": f"role{i}", "content": content} for i, content in enumerate(contents, 1)]
     
     consensus = check_consensus_rule_based(messages)
-    assert consensus is False
+    assert consensus is expected
+
+
+
+@pytest.mark.parametrize("check", [
+    lambda messages: consensus_detector.check_consensus_with_temporal_analysis(messages, "performance"),
+    lambda messages: consensus_detector.check_consensus_with_confidence(messages, "performance"),
+    lambda messages: consensus_detector.check_consensus_with_expertise_weighting(
+        messages, "performance", {f"role{i}": {"performance": 0.5 + i / 10} for i in range(1, 5)}),
+], ids=["temporal", "confidence", "expertise"])
+def test_consensus_checks_extract_key_points_once(monkeypatch, check):
+    consensus_detector._key_points.cache_clear()
+    extracted = []
+    
+    def recording_extract_key_points(message, max_points=10):
+        extracted.append(message)
+        return extract_key_points(message, max_points)
+    
+    monkeypatch.setattr(consensus_detector, "extract_key_points", recording_extract_key_points)
+    contents = CONSENSUS_RULE_BASED_CASES[1][0]
+    messages = [{"role": f"role{i}", "content": content} for i, content in enumerate(contents, 1)]
+    
+    check(messages)
+    assert sorted(extracted) == sorted(contents)
+
 
+def test_check_consensus_rule_based_reuses_key_points(monkeypatch):
+    consensus_detector._key_points.cache_clear()
+    extracted = []
+    
+    def recording_extract_key_points(message, max_points=10):
+        extracted.append(message)
+        return extract_key_points(message, max_points)
+    
+    monkeypatch.setattr(consensus_detector, "extract_key_points", recording_extract_key_points)
+    contents = CONSENSUS_RULE_BASED_CASES[1][0]
+    messages = [{"role": f"role{i}", "content": content} for i, content in enumerate(contents, 1)]
+    
+    # Every turn checks the whole discussion, but each message is only analyzed once
+    assert check_consensus_rule_based(messages[:3]) is True
+    assert check_consensus_rule_based(messages) is True
+    assert extracted == list(contents)
 
 def test_consensus_detector():
     # Create a mock LLM client that always returns consensus
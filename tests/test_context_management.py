@@ -1,6 +1,5 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from discussion_llama.role.role_manager import Role
 from discussion_llama.engine.discussion_engine import (
     Message, 
     DiscussionState, 
@@ -8,36 +7,36 @@ from discussion_llama.engine.discussion_engine import (
 )
 
 
-@pytest.fixture
-def sample_roles():
-    """Create sample roles for testing."""
-    role1_data = {
-        "role": "role1",
-        "description": "Test role 1",
-        "responsibilities": ["Responsibility 1"],
-        "expertise": ["Expertise 1"],
-        "characteristics": ["Characteristic 1"],
-        "interaction_with": {},
-        "success_criteria": ["Success 1"]
-    }
-    
-    role2_data = {
-        "role": "role2",
-        "description": "Test role 2",
-        "responsibilities": ["Responsibility 2"],
-        "expertise": ["Expertise 2"],
-        "characteristics": ["Characteristic 2"],
-        "interaction_with": {},
-        "success_criteria": ["Success 2"]
-    }
-    
-    return [Role(role1_data), Role(role2_data)]
+# (role, content) of the messages the tests add, alternating between the two roles
+_MESSAGES = tuple((f"role{i % 2 + 1}", f"Message {i}") for i in range(20))
+
+# Engine settings that tests override
+_ENGINE_SETTINGS = ("max_context_messages", "max_tokens")
+
+
+@pytest.fixture(scope="module")
+def discussion_engine(sample_roles, tmp_path_factory):
+    """Create a discussion engine shared by the tests in this module."""
+    return DiscussionEngine("test topic", sample_roles, str(tmp_path_factory.mktemp("context")))
 
 
-@pytest.fixture
-def discussion_engine(sample_roles, tmp_path):
-    """Create a discussion engine for testing."""
-    return DiscussionEngine("test topic", sample_roles, str(tmp_path))
+@pytest.fixture(autouse=True)
+def _reset_engine_state(discussion_engine):
+    """Give every test an empty discussion and restore the settings it changes."""
+    settings = {name: getattr(discussion_engine, name) for name in _ENGINE_SETTINGS
+                if hasattr(discussion_engine, name)}
+    discussion_engine.state = DiscussionState(discussion_engine.topic, discussion_engine.roles)
+    yield
+    for name in _ENGINE_SETTINGS:
+        if name in settings:
+            setattr(discussion_engine, name, settings[name])
+        elif hasattr(discussion_engine, name):
+            delattr(discussion_engine, name)
+
+
+def _add_messages(state, count):
+    """Add the first count of _MESSAGES to a discussion state."""
+    state.messages.extend(Message(role, content) for role, content in _MESSAGES[:count])
 
 
 def test_prepare_context_empty_discussion(discussion_engine, sample_roles):
@@ -63,8 +62,7 @@ def test_prepare_context_empty_discussion(discussion_engine, sample_roles):
 def test_prepare_context_with_messages(discussion_engine, sample_roles):
     """Test preparing context with existing messages."""
     # Add some messages to the discussion
-    for i in range(5):
-        discussion_engine.state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+    _add_messages(discussion_engine.state, 5)
     
     # Prepare context for the first role
     context = discussion_engine.prepare_context(sample_roles[0])
@@ -78,8 +76,7 @@ def test_prepare_context_with_messages(discussion_engine, sample_roles):
 def test_prepare_context_with_many_messages(discussion_engine, sample_roles):
     """Test preparing context with many messages (exceeding context window)."""
     # Add many messages to the discussion
-    for i in range(20):
-        discussion_engine.state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+    _add_messages(discussion_engine.state, 20)
     
     # Set a small context window size for testing
     discussion_engine.max_context_messages = 10
@@ -99,8 +96,7 @@ def test_prepare_context_with_many_messages(discussion_engine, sample_roles):
 def test_compress_context(discussion_engine, sample_roles):
     """Test compressing the context when it gets too large."""
     # Add many messages to the discussion
-    for i in range(20):
-        discussion_engine.state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+    _add_messages(discussion_engine.state, 20)
     
     # Set a small context window size for testing
     discussion_engine.max_context_messages = 10
@@ -120,8 +116,7 @@ def test_compress_context(discussion_engine, sample_roles):
 def test_generate_prompt(discussion_engine, sample_roles):
     """Test generating a prompt for a role."""
     # Add some messages to the discussion
-    for i in range(3):
-        discussion_engine.state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+    _add_messages(discussion_engine.state, 3)
     
     # Generate a prompt for the first role
     prompt = discussion_engine.generate_prompt(sample_roles[0])
@@ -143,8 +138,7 @@ def test_generate_prompt(discussion_engine, sample_roles):
 def test_summarize_messages_called(mock_summarize, discussion_engine, sample_roles):
     """Test that _summarize_messages is called when compressing context."""
     # Add many messages to the discussion
-    for i in range(20):
-        discussion_engine.state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+    _add_messages(discussion_engine.state, 20)
     
     # Set a small context window size for testing
     discussion_engine.max_context_messages = 10
@@ -165,8 +159,7 @@ def test_summarize_messages_called(mock_summarize, discussion_engine, sample_rol
 def test_context_with_summary(discussion_engine, sample_roles):
     """Test that the context includes the summary when available."""
     # Add some messages and set a summary
-    for i in range(5):
-        discussion_engine.state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+    _add_messages(discussion_engine.state, 5)
     discussion_engine.state.summary = "This is a pre-existing summary."
     
     # Prepare context
@@ -181,8 +174,7 @@ def test_token_counting(discussion_engine, sample_roles):
     # Mock the token counting method to return a fixed number
     with patch('discussion_llama.engine.discussion_engine.DiscussionEngine._count_tokens', return_value=100):
         # Add many messages
-        for i in range(20):
-            discussion_engine.state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+        _add_messages(discussion_engine.state, 20)
         
         # Set a token limit
         discussion_engine.max_tokens = 1000
@@ -194,52 +186,40 @@ def test_token_counting(discussion_engine, sample_roles):
         assert len(context["full_context"]) <= 10
 
 
-def test_context_with_role_specific_information(discussion_engine, sample_roles):
+@pytest.mark.parametrize("role_index", [0, 1])
+def test_context_with_role_specific_information(discussion_engine, sample_roles, role_index):
     """Test that the context includes role-specific information."""
-    # Prepare context for each role
-    context1 = discussion_engine.prepare_context(sample_roles[0])
-    context2 = discussion_engine.prepare_context(sample_roles[1])
-    
-    # Check that each context has the correct role
-    assert context1["role"] == sample_roles[0]
-    assert context2["role"] == sample_roles[1]
-    
-    # Generate prompts for each role
-    prompt1 = discussion_engine.generate_prompt(sample_roles[0])
-    prompt2 = discussion_engine.generate_prompt(sample_roles[1])
+    role = sample_roles[role_index]
+    number = role_index + 1
     
-    # Check that each prompt has role-specific information
-    assert "You are a role1" in prompt1
-    assert "Responsibility 1" in prompt1
-    assert "Expertise 1" in prompt1
+    # Check that the context has the correct role
+    context = discussion_engine.prepare_context(role)
+    assert context["role"] == role
     
-    assert "You are a role2" in prompt2
-    assert "Responsibility 2" in prompt2
-    assert "Expertise 2" in prompt2
+    # Check that the prompt has role-specific information
+    prompt = discussion_engine.generate_prompt(role)
+    assert f"You are a role{number}" in prompt
+    assert f"Responsibility {number}" in prompt
+    assert f"Expertise {number}" in prompt
 
 
-def test_context_with_turn_information(discussion_engine, sample_roles):
-    """Test that the context includes turn information."""
-    # Set the turn number
-    discussion_engine.state.turn = 5
-    
-    # Prepare context
-    context = discussion_engine.prepare_context(sample_roles[0])
-    
-    # Check that the turn information is included
-    prompt = discussion_engine.generate_prompt(sample_roles[0])
-    assert "Turn 5" in prompt or "turn 5" in prompt.lower()
+# (state attribute, value, words the prompt must then mention)
+_STATE_INFORMATION_CASES = (
+    ("turn", 5, ("turn 5",)),
+    ("consensus_reached", True, ("consensus", "reached")),
+)
 
 
-def test_context_with_consensus_information(discussion_engine, sample_roles):
-    """Test that the context includes consensus information."""
-    # Set consensus status
-    discussion_engine.state.consensus_reached = True
+@pytest.mark.parametrize("attribute,value,expected_words", _STATE_INFORMATION_CASES,
+                         ids=["turn", "consensus"])
+def test_context_with_state_information(discussion_engine, sample_roles, attribute, value, expected_words):
+    """Test that the context includes the turn and consensus information."""
+    setattr(discussion_engine.state, attribute, value)
     
     # Prepare context
-    context = discussion_engine.prepare_context(sample_roles[0])
+    discussion_engine.prepare_context(sample_roles[0])
     
-    # Check that the consensus information is included
-    prompt = discussion_engine.generate_prompt(sample_roles[0])
-    assert "consensus" in prompt.lower()
-    assert "reached" in prompt.lower() 
\ No newline at end of file
+    # Check that the information is included
+    prompt = discussion_engine.generate_prompt(sample_roles[0]).lower()
+    for word in expected_words:
+        assert word in prompt
@@ -1,9 +1,7 @@
 import os
-import tempfile
 import json
 import pytest
-from unittest.mock import patch, MagicMock
-from discussion_llama.role.role_manager import Role
+from unittest.mock import patch
 from discussion_llama.engine.discussion_engine import (
     Message, 
     DiscussionState, 
@@ -12,52 +10,32 @@ from discussion_llama.engine.discussion_engine import (
 )
 
 
-@pytest.fixture
-def sample_roles():
-    role1_data = {
-        "role": "role1",
-        "description": "Test role 1",
-        "responsibilities": ["Responsibility 1"],
-        "expertise": ["Expertise 1"],
-        "characteristics": ["Characteristic 1"],
-        "interaction_with": {},
-        "success_criteria": ["Success 1"]
-    }
-    
-    role2_data = {
-        "role": "role2",
-        "description": "Test role 2",
-        "responsibilities": ["Responsibility 2"],
-        "expertise": ["Expertise 2"],
-        "characteristics": ["Characteristic 2"],
-        "interaction_with": {},
-        "success_criteria": ["Success 2"]
-    }
-    
-    return [Role(role1_data), Role(role2_data)]
+# Similar messages from the two roles alternating, enough to trigger deadlock
+# detection: (index of the speaking role, content)
+_DEADLOCK_PATTERN = tuple(
+    (i % 2, "I maintain my position on this issue. My view is unchanged." if i > 0 else "My position on this issue.")
+    for i in range(6)
+)
 
 
-@pytest.fixture
-def temp_state_dir():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
+def _seed_deadlock_state(engine, roles):
+    """Save a state holding the repetitive messages of _DEADLOCK_PATTERN."""
+    state = engine.state_manager.load_state()
+    state.messages.extend(Message(roles[role_index].role, content) for role_index, content in _DEADLOCK_PATTERN)
+    engine.state_manager.save_state(state)
+    return state
 
 
 @pytest.fixture
-def mock_llm_client():
+def mock_llm_client(shared_llm_stub):
     with patch('discussion_llama.llm.llm_client.create_llm_client') as mock_create:
-        mock_client = MagicMock()
-        mock_client.generate.return_value = "This is a mock response from the LLM."
-        mock_create.return_value = mock_client
-        yield mock_client
+        mock_create.return_value = shared_llm_stub
+        yield shared_llm_stub
 
 
-def test_deadlock_detection_initialization(sample_roles, temp_state_dir):
+def test_deadlock_detection_initialization(sample_roles, make_in_memory_engine):
     """Test that the DiscussionEngine initializes with deadlock detection enabled."""
-    engine = DiscussionEngine(
-        topic="Test topic",
-        roles=sample_roles,
-        state_dir=temp_state_dir,
+    engine = make_in_memory_engine(
         deadlock_detection_enabled=True
     )
     
@@ -66,58 +44,32 @@ def test_deadlock_detection_initialization(sample_roles, temp_state_dir):
     assert hasattr(engine, 'deadlock_resolution_strategies')
 
 
-def test_detect_deadlock_with_repetitive_messages(sample_roles, temp_state_dir, mock_llm_client):
+def test_detect_deadlock_with_repetitive_messages(sample_roles, make_in_memory_engine, mock_llm_client):
     """Test that the engine can detect a deadlock when messages become repetitive."""
-    engine = DiscussionEngine(
-        topic="Test topic",
-        roles=sample_roles,
-        state_dir=temp_state_dir,
+    engine = make_in_memory_engine(
         deadlock_detection_enabled=True,
         deadlock_threshold=0.9  # High similarity threshold for testing
     )
     
     # Create a state with repetitive messages
-    state = engine.state_manager.load_state()
-    
-    # Add similar messages from the same role alternating
-    for i in range(6):  # Add enough messages to trigger deadlock detection
-        role_index = i % 2
-        content = f"I maintain my position on this issue. My view is unchanged." if i > 0 else "My position on this issue."
-        message = Message(sample_roles[role_index].role, content)
-        state.add_message(message)
-    
-    engine.state_manager.save_state(state)
+    state = _seed_deadlock_state(engine, sample_roles)
     
     # Check if deadlock is detected
     is_deadlocked = engine.detect_deadlock()
     assert is_deadlocked is True
 
 
-def test_deadlock_resolution(sample_roles, temp_state_dir, mock_llm_client):
+def test_deadlock_resolution(sample_roles, make_in_memory_engine, mock_llm_client, shared_llm_stub):
     """Test that the engine can resolve a deadlock when detected."""
-    # Create a mock LLM client directly
-    mock_client = MagicMock()
-    mock_client.generate.return_value = "Here's a new perspective to consider..."
-    
-    engine = DiscussionEngine(
-        topic="Test topic",
-        roles=sample_roles,
-        state_dir=temp_state_dir,
+    shared_llm_stub.generate.return_value = "Here's a new perspective to consider..."
+    
+    engine = make_in_memory_engine(
         deadlock_detection_enabled=True,
-        llm_client=mock_client  # Use the mock client directly
+        llm_client=shared_llm_stub
     )
     
     # Create a state with repetitive messages
-    state = engine.state_manager.load_state()
-    
-    # Add similar messages from the same role alternating
-    for i in range(6):  # Add enough messages to trigger deadlock detection
-        role_index = i % 2
-        content = f"I maintain my position on this issue. My view is unchanged." if i > 0 else "My position on this issue."
-        message = Message(sample_roles[role_index].role, content)
-        state.add_message(message)
-    
-    engine.state_manager.save_state(state)
+    state = _seed_deadlock_state(engine, sample_roles)
     
     # Mock the detect_deadlock method to return True
     with patch.object(engine, 'detect_deadlock', return_value=True):
@@ -136,20 +88,13 @@ def test_deadlock_resolution(sample_roles, temp_state_dir, mock_llm_client):
         assert updated_state.messages[-1].content == resolution_message.content
 
 
-def test_run_discussion_with_deadlock_detection(sample_roles, temp_state_dir, mock_llm_client):
+def test_run_discussion_with_deadlock_detection(sample_roles, make_in_memory_engine, mock_llm_client, shared_llm_stub):
     """Test that the run_discussion method handles deadlock detection and resolution."""
-    # Create a mock LLM client directly
-    mock_client = MagicMock()
-    mock_client.generate.return_value = "This is a mock response from the LLM."
-    
     # Create a simple test to verify that deadlock detection and resolution work
-    engine = DiscussionEngine(
-        topic="Test topic",
-        roles=sample_roles,
-        state_dir=temp_state_dir,
+    engine = make_in_memory_engine(
         deadlock_detection_enabled=True,
         max_turns=5,  # Set a very low max_turns for testing
-        llm_client=mock_client
+        llm_client=shared_llm_stub
     )
     
     # Create a state with a message
@@ -180,4 +125,90 @@ def test_run_discussion_with_deadlock_detection(sample_roles, temp_state_dir, mo
         }
         
         assert result["deadlock_detected"] is True
-        assert result["deadlock_resolution_applied"] is True 
\ No newline at end of file
+        assert result["deadlock_resolution_applied"] is True 
+
+def test_deadlock_strategies_share_preamble(sample_roles, make_in_memory_engine, shared_llm_stub):
+    """Test that all mediator strategies send the same preamble as the system prompt."""
+    shared_llm_stub.generate.return_value = "Mediator suggestion"
+    
+    engine = make_in_memory_engine(
+        deadlock_detection_enabled=True,
+        llm_client=shared_llm_stub
+    )
+    
+    state = engine.state_manager.load_state()
+    for strategy in engine.deadlock_resolution_strategies:
+        strategy(state)
+    
+    assert shared_llm_stub.generate.call_count == 3
+    for call_args in shared_llm_stub.generate.call_args_list:
+        assert call_args.kwargs["system_prompt"] == "The discussion on 'Test topic' appears to be in a deadlock. "
+        assert "Test topic" not in call_args.args[0]
+
+
+
+def test_suggest_compromise_uses_given_state(sample_roles, make_in_memory_engine, shared_llm_stub, monkeypatch):
+    """Test that the compromise prompt is built from the live state's last 10 messages."""
+    engine = make_in_memory_engine(llm_client=shared_llm_stub)
+    state = DiscussionState("Test topic", sample_roles)
+    state.messages.extend(Message(sample_roles[i % 2].role, f"Point {i}") for i in range(12))
+    monkeypatch.setattr(engine.state_manager, "load_state", lambda: pytest.fail("state reloaded"))
+    
+    engine._suggest_compromise(state)
+    
+    prompt = shared_llm_stub.generate.call_args.args[0]
+    assert "Point 0" not in prompt and "Point 1\n" not in prompt
+    assert all(f"Point {i}" in prompt for i in range(2, 12))
+
+def test_message_normalized_content_is_cached():
+    """Test that a message normalizes its content once and refreshes on change."""
+    message = Message("Developer", "  We Should\n\tUse   Python  ")
+    
+    assert message.normalized_content == "we should use python"
+    assert message.normalized_content is message.normalized_content
+    
+    message.content = "Something  Else"
+    assert message.normalized_content == "something else"
+
+
+def test_run_discussion_keeps_mediator_messages(sample_roles, make_in_memory_engine, shared_llm_stub):
+    """Test that messages added by deadlock resolution end up in the discussion result."""
+    shared_llm_stub.generate.return_value = "Mediator suggestion"
+    shared_llm_stub.generate_response.return_value = "Role response"
+    
+    engine = make_in_memory_engine(
+        deadlock_detection_enabled=True,
+        max_turns=2,
+        llm_client=shared_llm_stub
+    )
+    
+    with patch.object(engine, 'detect_deadlock', return_value=True), \
+         patch.object(engine, 'check_consensus', return_value=False):
+        result = engine.run_discussion()
+    
+    mediator_messages = [msg for msg in result["discussion"] if msg["role"] == "System (Mediator)"]
+    assert len(mediator_messages) == 2
+    assert result["deadlock_resolution_applied"] is True
+
+
+def test_detect_deadlock_waits_after_resolution(sample_roles, make_in_memory_engine, mock_llm_client):
+    """Test that deadlock detection pauses for a few messages after a resolution."""
+    engine = make_in_memory_engine(
+        deadlock_detection_enabled=True,
+        deadlock_threshold=0.8
+    )
+    
+    state = engine.state_manager.load_state()
+    for _ in range(3):
+        state.add_message(Message(sample_roles[0].role, "I think we should use Python for this project."))
+        state.add_message(Message(sample_roles[1].role, "I believe Java would be better for this project."))
+    state.deadlock_detected = True
+    state.deadlock_resolution_applied = True
+    state.add_message(Message("System", "A deadlock was resolved."))
+    state.add_message(Message(sample_roles[0].role, "I think we should use Python for this project."))
+    
+    assert engine.detect_deadlock(state) is False
+    
+    state.add_message(Message(sample_roles[1].role, "I believe Java would be better for this project."))
+    state.add_message(Message(sample_roles[0].role, "I think we should use Python for this project."))
+    assert engine.detect_deadlock(state) is True
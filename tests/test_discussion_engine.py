@@ -1,45 +1,16 @@
 import os
-import tempfile
 import json
-import pytest
-from discussion_llama.role.role_manager import Role
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from discussion_llama.engine import discussion_engine
 from discussion_llama.engine.discussion_engine import (
     Message, 
     DiscussionState, 
     DiskBasedDiscussionManager, 
     DiscussionEngine
 )
-
-
-@pytest.fixture
-def sample_roles():
-    role1_data = {
-        "role": "role1",
-        "description": "Test role 1",
-        "responsibilities": ["Responsibility 1"],
-        "expertise": ["Expertise 1"],
-        "characteristics": ["Characteristic 1"],
-        "interaction_with": {},
-        "success_criteria": ["Success 1"]
-    }
-    
-    role2_data = {
-        "role": "role2",
-        "description": "Test role 2",
-        "responsibilities": ["Responsibility 2"],
-        "expertise": ["Expertise 2"],
-        "characteristics": ["Characteristic 2"],
-        "interaction_with": {},
-        "success_criteria": ["Success 2"]
-    }
-    
-    return [Role(role1_data), Role(role2_data)]
-
-
-@pytest.fixture
-def temp_state_dir():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
+from discussion_llama.llm.cache import CachedLLMClient
+from discussion_llama.llm.llm_client import MockLLMClient
 
 
 def test_message_creation():
@@ -51,6 +22,18 @@ def test_message_creation():
     assert message.timestamp is not None
 
 
+def test_message_timestamps_strictly_increase(monkeypatch):
+    # A clock that stands still and then goes backwards
+    clock = iter([1000.0, 1000.0, 999.0])
+    monkeypatch.setattr(discussion_engine, "time", SimpleNamespace(time=lambda: next(clock)))
+    monkeypatch.setattr(discussion_engine, "_last_timestamp", 0.0)
+    
+    timestamps = [Message("role1", f"Message {i}").timestamp for i in range(3)]
+    
+    assert timestamps[0] == 1000.0
+    assert timestamps[0] < timestamps[1] < timestamps[2] < 1000.01
+
+
 def test_message_to_dict():
     message = Message("test_role", "Test message content", {"key": "value"})
     message_dict = message.to_dict()
@@ -147,6 +130,31 @@ def test_discussion_engine_initialization(sample_roles, temp_state_dir):
     assert engine.max_turns == 30
 
 
+def test_discussion_engine_streams_through_cached_client(sample_roles, temp_state_dir):
+    inner = MockLLMClient()
+    inner.generate_streaming_response = MagicMock(return_value="Streamed")
+    engine = DiscussionEngine("test topic", sample_roles, temp_state_dir,
+                              llm_client=CachedLLMClient(inner), use_streaming=True)
+    
+    context = engine.prepare_context(sample_roles[0])
+    assert engine.generate_response(sample_roles[0], context) == "Streamed"
+    inner.generate_streaming_response.assert_called_once()
+
+
+def test_discussion_engine_cancel_between_turns(sample_roles, temp_state_dir):
+    inner = MockLLMClient()
+    inner.generate_streaming_response = MagicMock(
+        side_effect=lambda *args, cancel_event, **kwargs: "" if cancel_event.is_set() else "Streamed")
+    engine = DiscussionEngine("test topic", sample_roles, temp_state_dir,
+                              llm_client=inner, use_streaming=True)
+    context = engine.prepare_context(sample_roles[0])
+    
+    # A cancel that arrives before the response starts still stops it, and only it
+    engine.cancel()
+    assert engine.generate_response(sample_roles[0], context) == ""
+    assert engine.generate_response(sample_roles[0], context) == "Streamed"
+
+
 def test_discussion_engine_prepare_context(sample_roles, temp_state_dir):
     engine = DiscussionEngine("test topic", sample_roles, temp_state_dir)
     
@@ -181,6 +189,38 @@ def test_discussion_engine_compress_context(sample_roles, temp_state_dir):
     assert engine.state.summary != ""
 
 
+def test_discussion_engine_compress_given_state(sample_roles, temp_state_dir):
+    engine = DiscussionEngine("test topic", sample_roles, temp_state_dir)
+    state = DiscussionState("test topic", sample_roles)
+    for i in range(10):
+        state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+    
+    engine.compress_context(state)
+    
+    # The live state keeps its full transcript, gets the summary and is not saved
+    assert len(state.messages) == 10
+    assert state.summary == "Summary of 4 previous messages about test topic"
+    assert not os.path.exists(engine.state_manager.state_file)
+
+
+def test_discussion_engine_run_keeps_transcript_on_disk(monkeypatch, sample_roles, temp_state_dir):
+    from discussion_llama.llm.llm_client import MockLLMClient
+    
+    engine = DiscussionEngine("test topic", sample_roles, temp_state_dir, llm_client=MockLLMClient(), max_turns=9)
+    snapshots = []
+    write = engine.state_manager._write
+    monkeypatch.setattr(engine.state_manager, "_write", lambda *args: snapshots.append(1) or write(*args))
+    
+    result = engine.run_discussion()
+    
+    # Compressing the context only summarizes, so every turn after the first
+    # save is appended to the changelog and the whole transcript is persisted
+    assert len(snapshots) == 1
+    saved_state = engine.state_manager.load_state()
+    assert len(saved_state.messages) == len(result["discussion"])
+    assert saved_state.summary.startswith("Summary of")
+
+
 def test_discussion_engine_run_discussion(sample_roles, temp_state_dir):
     engine = DiscussionEngine("test topic", sample_roles, temp_state_dir)
     engine.max_turns = 5  # Limit to 5 turns for testing
@@ -1,9 +1,11 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from discussion_llama.engine import consensus_detector
 from discussion_llama.engine.consensus_detector import (
     extract_key_points,
     group_similar_points,
     check_consensus_rule_based,
+    check_consensus_with_expertise_weighting,
     ConsensusDetector
 )
 from discussion_llama.llm.llm_client import MockLLMClient
@@ -155,6 +157,55 @@ def test_consensus_detector_with_llm_fallback():
         assert consensus is True
 
 
+
+@pytest.fixture
+def undecided_detector():
+    """Create a detector whose rule-based methods are all undecided, so the LLM is the only fallback."""
+    llm_client = MagicMock()
+    detector = ConsensusDetector(llm_client)
+    with patch('discussion_llama.engine.consensus_detector.check_consensus_rule_based', return_value=None), \
+         patch('discussion_llama.engine.consensus_detector.check_consensus_with_sentiment', return_value=None), \
+         patch.object(detector, 'calculate_topic_relevance', return_value=1.0), \
+         patch.object(detector, 'check_consensus_with_confidence', return_value=(None, 0.0)):
+        yield detector, llm_client
+
+
+def test_consensus_detector_caches_llm_judgement(undecided_detector, monkeypatch):
+    """Test that the LLM is asked only once about the same excerpt of a discussion."""
+    detector, llm_client = undecided_detector
+    llm_client.generate_response.return_value = "CONSENSUS: YES"
+    messages = [{"role": f"role{i % 3}", "content": f"Point {i}"} for i in range(14)]
+    
+    assert detector.check_consensus(messages, "Caching strategy") is True
+    # The prompt only shows the most recent messages, so older ones do not matter
+    assert detector.check_consensus([{"role": "role0", "content": "Changed"}] + messages[1:], "Caching strategy") is True
+    assert llm_client.generate_response.call_count == 1
+    
+    # A new message or another topic is a different discussion
+    messages.append({"role": "role1", "content": "Agreed."})
+    detector.check_consensus(messages, "Caching strategy")
+    detector.check_consensus(messages, "Load testing")
+    assert llm_client.generate_response.call_count == 3
+    
+    # The cache keeps only the most recently used verdicts
+    monkeypatch.setattr(consensus_detector, "_LLM_CONSENSUS_CACHE_SIZE", 1)
+    detector.check_consensus(messages, "Rollout plan")
+    assert len(detector.llm_consensus_cache) == 1
+    assert next(iter(detector.llm_consensus_cache))[0] == "Rollout plan"
+
+
+def test_consensus_detector_does_not_cache_llm_errors(undecided_detector):
+    """Test that a failed LLM request is retried instead of counting as no consensus for good."""
+    detector, llm_client = undecided_detector
+    llm_client.generate_response.side_effect = ["Error: Request timed out", "CONSENSUS: YES - agreed"]
+    messages = [{"role": f"role{i}", "content": f"Point {i}"} for i in range(3)]
+    
+    assert detector.check_consensus(messages, "Caching strategy") is False
+    assert detector.check_consensus(messages, "Caching strategy") is True
+    assert detector.check_consensus(messages, "Caching strategy") is True
+    assert llm_client.generate_response.call_count == 2
+
+
 def test_consensus_detector_with_changing_opinions():
     """Test consensus detection when participants change their opinions during discussion."""
     mock_client = MockLLMClient()
@@ -329,6 +380,36 @@ def test_improved_topic_relevance():
     assert topic_relevance < 0.3
 
 
+
+def test_topic_relevance_score():
+    """Test that topic relevance averages the Jaccard similarity of the topic and each message."""
+    detector = ConsensusDetector(MockLLMClient())
+    messages = [
+        {"role": "role1", "content": "CACHING helps"},
+        {"role": "role2", "content": ""}
+    ]
+    
+    # {caching, strategy} against {caching, helps} is 1/3, and an empty message scores 0
+    assert detector.calculate_topic_relevance(messages, "Caching Strategy") == pytest.approx(1 / 6)
+    assert detector.calculate_topic_relevance(messages, "") == 0.0
+
+
+@pytest.mark.parametrize("second_content,first_expertise,expected", [
+    ("Security is critical.", 1.0, True),   # Two of three equally weighted roles agree
+    ("Speed matters.", 1.0, False),         # No point has enough support
+    ("Speed matters.", 8.0, True),          # The expert alone carries the weight
+], ids=["majority", "no_majority", "expert"])
+def test_expertise_weighted_agreement(second_content, first_expertise, expected):
+    """Test that expertise-weighted agreement adds up the normalized weights of agreeing roles."""
+    role_expertise = {"role1": {"security": first_expertise}, "role2": {"security": 1.0}, "role3": {"security": 1.0}}
+    messages = [
+        {"role": "role1", "content": "Security is critical."},
+        {"role": "role2", "content": second_content},
+        {"role": "role3", "content": "Cost matters most."}
+    ]
+    
+    assert check_consensus_with_expertise_weighting(messages, "security", role_expertise) is expected
+
 def test_consensus_confidence_scoring():
     """Test that consensus detection includes a confidence score."""
     mock_client = MockLLMClient()
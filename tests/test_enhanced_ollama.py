@@ -1,9 +1,11 @@
+import asyncio
 import pytest
 import json
 import time
-from unittest.mock import patch, MagicMock, call
+import threading
+from unittest.mock import patch, MagicMock, AsyncMock
 import requests
-from discussion_llama.llm.llm_client import OllamaClient, EnhancedOllamaClient
+from discussion_llama.llm.llm_client import OllamaClient, EnhancedOllamaClient, AsyncEnhancedOllamaClient
 
 
 @pytest.fixture
@@ -19,12 +21,17 @@ def mock_stream_response():
     class MockStreamResponse:
         def __init__(self, responses):
             self.status_code = 200
-            self.responses = responses
-            self.iter_index = 0
+            self.lines = [json.dumps(resp).encode('utf-8') for resp in responses]
+            self.closed = False
         
-        def iter_lines(self):
-            for resp in self.responses:
-                yield json.dumps(resp).encode('utf-8')
+        def iter_content(self, chunk_size=1):
+            # Deliver the body in small network-sized pieces that split lines
+            body = b"\n".join(self.lines) + b"\n"
+            for i in range(0, len(body), 16):
+                yield body[i:i + 16]
+        
+        def close(self):
+            self.closed = True
     
     stream_data = [
         {"response": "This ", "done": False},
@@ -37,6 +44,8 @@ def mock_stream_response():
     return MockStreamResponse(stream_data)
 
 
+# Retries back off for real unless a test patches time.sleep itself
+@pytest.mark.usefixtures("no_sleep")
 class TestEnhancedOllamaClient:
     
     def test_init(self):
@@ -54,7 +63,7 @@ class TestEnhancedOllamaClient:
         assert client.retry_delay == 1.0
         assert client.timeout == 30
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_response_success(self, mock_post, mock_successful_response):
         mock_post.return_value = mock_successful_response
         
@@ -64,7 +73,7 @@ class TestEnhancedOllamaClient:
         assert response == "Test response"
         mock_post.assert_called_once()
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_response_with_retry(self, mock_post):
         # First call fails with a 500 error, second call succeeds
         mock_error_response = MagicMock()
@@ -83,7 +92,7 @@ class TestEnhancedOllamaClient:
         assert response == "Success after retry"
         assert mock_post.call_count == 2
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_response_max_retries_exceeded(self, mock_post):
         # All calls fail with a 500 error
         mock_error_response = MagicMock()
@@ -99,7 +108,7 @@ class TestEnhancedOllamaClient:
         assert "Internal Server Error" in response
         assert mock_post.call_count == 4  # Initial attempt + 3 retries
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_response_timeout(self, mock_post):
         # Mock a timeout exception
         mock_post.side_effect = requests.exceptions.Timeout("Request timed out")
@@ -111,7 +120,7 @@ class TestEnhancedOllamaClient:
         assert "Request timed out" in response
         assert mock_post.call_count == 3  # Initial attempt + 2 retries
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_streaming_response(self, mock_post, mock_stream_response):
         mock_post.return_value = mock_stream_response
         
@@ -120,7 +129,7 @@ class TestEnhancedOllamaClient:
         
         assert response == "This is a streamed response."
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_generate_streaming_response_with_callback(self, mock_post, mock_stream_response):
         mock_post.return_value = mock_stream_response
         
@@ -135,7 +144,55 @@ class TestEnhancedOllamaClient:
         assert response == "This is a streamed response."
         assert collected_chunks == ["This ", "is ", "a ", "streamed ", "response."]
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
+    def test_generate_streaming_response_skips_invalid_lines(self, mock_post, mock_stream_response):
+        lines = mock_stream_response.lines
+        mock_stream_response.lines = lines[:2] + [b"not json", b"", b"  "] + lines[2:]
+        mock_post.return_value = mock_stream_response
+        
+        client = EnhancedOllamaClient()
+        response = client.generate_streaming_response("test prompt")
+        
+        assert response == "This is a streamed response."
+    
+    def test_iter_stream_lines(self):
+        response = MagicMock()
+        response.iter_content.return_value = iter([b'{"a": 1}\n{"b"', b'', b': 2}\r\n\n{"c": 3}'])
+        
+        lines = list(EnhancedOllamaClient._iter_stream_lines(response))
+        
+        assert [json.loads(line) for line in lines] == [{"a": 1}, {"b": 2}, {"c": 3}]
+    
+    @patch('requests.Session.post')
+    def test_generate_streaming_response_cancel(self, mock_post, mock_stream_response):
+        mock_post.return_value = mock_stream_response
+        cancel_event = threading.Event()
+        
+        def callback(chunk):
+            if chunk == "is ":
+                cancel_event.set()
+        
+        client = EnhancedOllamaClient()
+        response = client.generate_streaming_response(
+            "test prompt", callback=callback, cancel_event=cancel_event
+        )
+        
+        assert response == "This is "
+        assert mock_stream_response.closed
+    
+    @patch('requests.Session.post')
+    def test_generate_streaming_response_error_releases_connection(self, mock_post):
+        mock_error_response = MagicMock()
+        mock_error_response.status_code = 500
+        mock_post.return_value = mock_error_response
+        
+        client = EnhancedOllamaClient()
+        response = client.generate_streaming_response("test prompt")
+        
+        assert response == "Error: Ollama API returned status code 500"
+        mock_error_response.close.assert_called_once()
+    
+    @patch('requests.Session.post')
     def test_generate_streaming_response_error(self, mock_post):
         # Mock an error response
         mock_error_response = MagicMock()
@@ -150,8 +207,80 @@ class TestEnhancedOllamaClient:
         assert "Error: 500" in response
         assert "Internal Server Error" in response
     
+    @patch('requests.Session.post')
+    def test_generate_response_cache(self, mock_post, mock_successful_response):
+        mock_post.return_value = mock_successful_response
+        
+        client = EnhancedOllamaClient(cache_size=1)
+        
+        # Deterministic requests are answered from the cache
+        assert client.generate_response("prompt", temperature=0.0) == "Test response"
+        assert client.generate_response("prompt", temperature=0.0) == "Test response"
+        assert mock_post.call_count == 1
+        
+        # Unless the cache is bypassed or the temperature allows varied answers
+        client.generate_response("prompt", temperature=0.0, bypass_cache=True)
+        client.generate_response("prompt", temperature=0.7)
+        client.generate_response("prompt", temperature=0.7)
+        assert mock_post.call_count == 4
+        
+        # The least recently used entry is evicted
+        client.generate_response("other prompt", temperature=0.0)
+        client.generate_response("prompt", temperature=0.0)
+        assert mock_post.call_count == 6
+    
+    @patch('time.sleep')
+    @patch('requests.Session.post')
+    def test_retry_after_header(self, mock_post, mock_sleep, mock_successful_response):
+        mock_rate_limited = MagicMock()
+        mock_rate_limited.status_code = 429
+        mock_rate_limited.headers = {"Retry-After": "3"}
+        mock_post.side_effect = [mock_rate_limited, mock_successful_response]
+        
+        client = EnhancedOllamaClient(max_retries=3, retry_delay=1.0)
+        response = client.generate_response("test prompt")
+        
+        assert response == "Test response"
+        mock_sleep.assert_called_once_with(3.0)
+    
+    @patch('time.sleep')
+    @patch('requests.Session.post')
+    def test_retry_after_header_is_capped(self, mock_post, mock_sleep, mock_successful_response):
+        mock_rate_limited = MagicMock()
+        mock_rate_limited.status_code = 429
+        mock_rate_limited.headers = {"Retry-After": "86400"}
+        mock_post.side_effect = [mock_rate_limited, mock_successful_response]
+        
+        client = EnhancedOllamaClient(max_retries=3, timeout=30)
+        response = client.generate_response("test prompt")
+        
+        assert response == "Test response"
+        mock_sleep.assert_called_once_with(30)
+    
+    @patch('time.sleep')
+    @patch('requests.Session.post')
+    def test_generate_response_does_not_retry_client_errors(self, mock_post, mock_sleep):
+        mock_not_found = MagicMock()
+        mock_not_found.status_code = 404
+        mock_post.return_value = mock_not_found
+        
+        client = EnhancedOllamaClient(max_retries=3)
+        response = client.generate_response("test prompt")
+        
+        assert response == "Error: Ollama API returned status code 404"
+        assert mock_post.call_count == 1
+        mock_sleep.assert_not_called()
+    
+    def test_retry_wait_jitter(self):
+        client = EnhancedOllamaClient(retry_delay=1.0)
+        
+        for retries in range(1, 4):
+            backoff = 2 ** (retries - 1)
+            waits = [client._retry_wait(retries) for _ in range(20)]
+            assert all(1.0 <= wait <= backoff * 2 for wait in waits)
+    
     @patch('time.sleep')
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_exponential_backoff(self, mock_post, mock_sleep):
         # All calls fail with a 429 rate limit error
         mock_error_response = MagicMock()
@@ -167,9 +296,90 @@ class TestEnhancedOllamaClient:
         assert "Rate limit exceeded" in response
         assert mock_post.call_count == 4  # Initial attempt + 3 retries
         
-        # Check that sleep was called with exponential backoff
-        mock_sleep.assert_has_calls([
-            call(1.0),  # First retry
-            call(2.0),  # Second retry
-            call(4.0)   # Third retry
-        ]) 
\ No newline at end of file
+        # Check that sleep was called with jittered exponential backoff:
+        # between retry_delay and twice the delay of the nth retry
+        waits = [args[0] for args, _ in mock_sleep.call_args_list]
+        assert len(waits) == 3
+        for retries, wait in enumerate(waits, start=1):
+            assert 1.0 <= wait <= 2 * 1.0 * 2 ** (retries - 1)
+
+
+class TestAsyncEnhancedOllamaClient:
+    
+    @patch('requests.Session.post')
+    def test_agenerate_response(self, mock_post, mock_successful_response):
+        mock_post.return_value = mock_successful_response
+        
+        client = AsyncEnhancedOllamaClient(max_concurrency=2)
+        
+        async def run():
+            return await asyncio.gather(*(client.agenerate_response(f"prompt {i}") for i in range(3)))
+        
+        assert asyncio.run(run()) == ["Test response"] * 3
+        assert mock_post.call_count == 3
+        
+        # The client can be used again from a new event loop
+        assert asyncio.run(client.agenerate("prompt")) == "Test response"
+    
+    @patch('time.sleep')
+    @patch('asyncio.sleep', new_callable=AsyncMock)
+    @patch('requests.Session.post')
+    def test_agenerate_response_retries_without_blocking(self, mock_post, mock_async_sleep, mock_sleep,
+                                                         mock_successful_response):
+        mock_rate_limited = MagicMock()
+        mock_rate_limited.status_code = 429
+        mock_rate_limited.headers = {"Retry-After": "2"}
+        mock_post.side_effect = [mock_rate_limited, mock_successful_response]
+        
+        client = AsyncEnhancedOllamaClient(max_retries=3)
+        
+        assert asyncio.run(client.agenerate_response("test prompt")) == "Test response"
+        mock_async_sleep.assert_awaited_once_with(2.0)
+        mock_sleep.assert_not_called()
+    
+    @patch('asyncio.sleep', new_callable=AsyncMock)
+    @patch('requests.Session.post')
+    def test_agenerate_response_caps_retry_after(self, mock_post, mock_async_sleep, mock_successful_response):
+        mock_rate_limited = MagicMock()
+        mock_rate_limited.status_code = 429
+        mock_rate_limited.headers = {"Retry-After": "86400"}
+        mock_post.side_effect = [mock_rate_limited, mock_successful_response]
+        
+        client = AsyncEnhancedOllamaClient(max_retries=3, timeout=30)
+        
+        assert asyncio.run(client.agenerate_response("test prompt")) == "Test response"
+        mock_async_sleep.assert_awaited_once_with(30)
+    
+    @patch('requests.Session.post')
+    def test_abatch_generate_limits_concurrency(self, mock_post, mock_successful_response):
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+        
+        def post(*args, **kwargs):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.pop()
+            return mock_successful_response
+        
+        mock_post.side_effect = post
+        
+        client = AsyncEnhancedOllamaClient(max_concurrency=2)
+        responses = asyncio.run(client.abatch_generate([f"prompt {i}" for i in range(6)]))
+        
+        assert responses == ["Test response"] * 6
+        assert max(peak) <= 2
+    
+    @patch('requests.Session.post')
+    def test_agenerate_streaming_response(self, mock_post, mock_stream_response):
+        mock_post.return_value = mock_stream_response
+        
+        client = AsyncEnhancedOllamaClient()
+        
+        async def run():
+            return [chunk async for chunk in client.agenerate_streaming_response("test prompt")]
+        
+        assert asyncio.run(run()) == ["This ", "is ", "a ", "streamed ", "response."]
@@ -1,9 +1,7 @@
 import os
-import tempfile
 import json
 import pytest
 from unittest.mock import patch, MagicMock
-from discussion_llama.role.role_manager import Role
 from discussion_llama.engine.discussion_engine import (
     Message, 
     DiscussionState, 
@@ -12,37 +10,6 @@ from discussion_llama.engine.discussion_engine import (
 )
 
 
-@pytest.fixture
-def sample_roles():
-    role1_data = {
-        "role": "role1",
-        "description": "Test role 1",
-        "responsibilities": ["Responsibility 1"],
-        "expertise": ["Expertise 1"],
-        "characteristics": ["Characteristic 1"],
-        "interaction_with": {},
-        "success_criteria": ["Success 1"]
-    }
-    
-    role2_data = {
-        "role": "role2",
-        "description": "Test role 2",
-        "responsibilities": ["Responsibility 2"],
-        "expertise": ["Expertise 2"],
-        "characteristics": ["Characteristic 2"],
-        "interaction_with": {},
-        "success_criteria": ["Success 2"]
-    }
-    
-    return [Role(role1_data), Role(role2_data)]
-
-
-@pytest.fixture
-def temp_state_dir():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
-
-
 @pytest.fixture
 def mock_llm_client():
     with patch('discussion_llama.llm.llm_client.create_llm_client') as mock_create:
@@ -69,8 +36,9 @@ def test_extended_discussion_run(sample_roles, temp_state_dir, mock_llm_client):
     # Mock the consensus check to return True after a specific number of turns
     original_check_consensus = DiscussionEngine.check_consensus
     
-    def mock_check_consensus(self):
-        state = self.state_manager.load_state()
+    def mock_check_consensus(self, state=None):
+        if state is None:
+            state = self.state_manager.load_state()
         # Return True after 150 turns to simulate consensus
         return state.turn >= 150
     
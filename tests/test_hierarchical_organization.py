@@ -1,5 +1,4 @@
 import os
-import tempfile
 import json
 import pytest
 from unittest.mock import patch, MagicMock
@@ -88,12 +87,6 @@ def hierarchical_roles():
     ]
 
 
-@pytest.fixture
-def temp_state_dir():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
-
-
 @pytest.fixture
 def mock_llm_client():
     with patch('discussion_llama.llm.llm_client.create_llm_client') as mock_create:
@@ -242,4 +235,102 @@ def test_decision_escalation(hierarchical_roles, temp_state_dir, mock_llm_client
         
         # Check that the next speaker is the superior
         next_speaker = engine.get_next_speaker()
-        assert next_speaker == "Engineering Manager" 
\ No newline at end of file
+        assert next_speaker == "Engineering Manager" 
+
+def test_detect_escalation_uses_last_message(hierarchical_roles, temp_state_dir, mock_llm_client):
+    """Test that escalation is detected from a role's most recent message only."""
+    engine = DiscussionEngine(
+        topic="Test topic",
+        roles=hierarchical_roles,
+        state_dir=temp_state_dir,
+        hierarchical_mode=True
+    )
+    state = DiscussionState("Test topic", hierarchical_roles)
+    state.add_message(Message("Software Engineer", "I need to escalate this to my manager."))
+    state.add_message(Message("CTO", "Noted."))
+    
+    assert engine.detect_escalation("Software Engineer", state=state)
+    assert not engine.detect_escalation("QA Engineer", state=state)
+    
+    state.add_message(Message("Software Engineer", "Never mind, I can decide this myself."))
+    assert not engine.detect_escalation("Software Engineer", state=state)
+
+
+def test_parallel_first_round(hierarchical_roles, temp_state_dir):
+    """Test that opening statements are generated together and spoken in hierarchy order."""
+    from discussion_llama.llm.llm_client import MockLLMClient
+    
+    llm_client = MockLLMClient()
+    engine = DiscussionEngine(
+        topic="Test topic",
+        roles=hierarchical_roles,
+        state_dir=temp_state_dir,
+        llm_client=llm_client,
+        hierarchical_mode=True,
+        parallel_first_round=True
+    )
+    
+    with patch.object(engine, 'check_consensus', return_value=False), \
+         patch.object(engine, 'generate_response', wraps=engine.generate_response) as generate:
+        engine.max_turns = len(hierarchical_roles)
+        result = engine.run_discussion()
+    
+    # Every opening statement came from the prefetch
+    assert generate.call_count == 0
+    
+    speakers = [msg["role"] for msg in result["discussion"] if msg["role"] != "System"]
+    expected = [role.role for role in sorted(hierarchical_roles, key=lambda r: r.hierarchy_level)]
+    assert speakers == expected
+
+
+def test_parallel_first_round_inside_event_loop(hierarchical_roles, temp_state_dir):
+    """Test that the opening statements can be prefetched while an event loop is running."""
+    import asyncio
+    from discussion_llama.llm.llm_client import MockLLMClient
+    
+    llm_client = MockLLMClient()
+    engine = DiscussionEngine(
+        topic="Test topic",
+        roles=hierarchical_roles,
+        state_dir=temp_state_dir,
+        llm_client=llm_client,
+        hierarchical_mode=True,
+        parallel_first_round=True
+    )
+    state = DiscussionState("Test topic", hierarchical_roles)
+    
+    async def prefetch():
+        return engine._prefetch_first_round(state)
+    
+    with patch.object(llm_client, 'abatch_generate') as abatch_generate:
+        responses = asyncio.run(prefetch())
+    
+    abatch_generate.assert_not_called()
+    assert set(responses) == {role.role for role in hierarchical_roles}
+    
+    # Clients with a thread-based batch method use it
+    llm_client.generate_batch = MagicMock(side_effect=lambda prompts, **kwargs: ["Batched"] * len(prompts))
+    responses = asyncio.run(prefetch())
+    llm_client.generate_batch.assert_called_once()
+    assert set(responses.values()) == {"Batched"}
+
+
+def test_next_speaker_after_first_round(hierarchical_roles, temp_state_dir):
+    """Test that the highest-ranking role missing from the recent messages speaks next."""
+    engine = DiscussionEngine(
+        topic="Test topic",
+        roles=hierarchical_roles,
+        state_dir=temp_state_dir,
+        hierarchical_mode=True
+    )
+    
+    state = engine.state_manager.load_state()
+    state.turn = len(hierarchical_roles)
+    for role_name in ["CEO", "CTO", "System", "Engineering Manager", "Software Engineer"]:
+        state.add_message(Message(role_name, "Message"))
+    
+    assert engine.get_next_speaker(state) == "CFO"
+    
+    # Once every role has spoken recently, fall back to round-robin
+    state.messages = [Message(role.role, "Message") for role in hierarchical_roles]
+    assert engine.get_next_speaker(state) == hierarchical_roles[state.turn % len(hierarchical_roles)].role
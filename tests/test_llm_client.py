@@ -1,11 +1,20 @@
+import asyncio
+import json
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, call
 from discussion_llama.llm.llm_client import (
     LLMClient,
     MockLLMClient,
     OllamaClient,
     create_llm_client
 )
+from discussion_llama.llm.cache import CachedLLMClient
+
+
+def request_body(call_args):
+    """Decode the JSON body sent by a mocked Session.post call."""
+    kwargs = call_args.kwargs
+    return kwargs["json"] if "json" in kwargs else json.loads(kwargs["data"])
 
 
 def test_llm_client_base_class():
@@ -40,7 +49,7 @@ def test_mock_llm_client():
     assert response == "This is a mock response from the LLM."
 
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_success(mock_post):
     # Mock the response from Ollama
     mock_response = MagicMock()
@@ -57,13 +66,13 @@ def test_ollama_client_success(mock_post):
     # Check that the request was made with the correct parameters
     args, kwargs = mock_post.call_args
     assert args[0] == "http://localhost:11434/api/generate"
-    assert kwargs["json"]["model"] == "llama2:7b-chat-q4_0"
-    assert kwargs["json"]["prompt"] == "test prompt"
-    assert kwargs["json"]["options"]["num_predict"] == 512
-    assert kwargs["json"]["options"]["temperature"] == 0.7
+    assert request_body(mock_post.call_args)["model"] == "llama2:7b-chat-q4_0"
+    assert request_body(mock_post.call_args)["prompt"] == "test prompt"
+    assert request_body(mock_post.call_args)["options"]["num_predict"] == 512
+    assert request_body(mock_post.call_args)["options"]["temperature"] == 0.7
 
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_error(mock_post):
     # Mock an error response from Ollama
     mock_response = MagicMock()
@@ -78,7 +87,7 @@ def test_ollama_client_error(mock_post):
     assert "Internal Server Error" in response
 
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_exception(mock_post):
     # Mock an exception when making the request
     mock_post.side_effect = Exception("Connection error")
@@ -100,6 +109,207 @@ def test_create_llm_client():
     assert isinstance(client, OllamaClient)
     assert client.model == "mistral:7b-instruct-v0.2-q4_0"
     
+    # Test creating the retrying and async Ollama clients
+    assert type(create_llm_client("enhanced_ollama")).__name__ == "EnhancedOllamaClient"
+    assert type(create_llm_client("async_ollama")).__name__ == "AsyncEnhancedOllamaClient"
+    
+    # Test wrapping a client in the response cache
+    client = create_llm_client("mock", cache=True)
+    assert isinstance(client, CachedLLMClient)
+    assert isinstance(client.client, MockLLMClient)
+    
+    # Clients with their own response cache are not cached twice
+    client = create_llm_client("enhanced_ollama", cache=True)
+    assert type(client).__name__ == "EnhancedOllamaClient"
+    assert type(create_llm_client("enhanced_ollama", cache=True, cache_size=0)).__name__ == "CachedLLMClient"
+    
     # Test with unknown client type
     with pytest.raises(ValueError):
-        create_llm_client("unknown") 
\ No newline at end of file
+        create_llm_client("unknown") 
+
+
+def test_cached_llm_client():
+    inner = MockLLMClient({"question": "Answer"})
+    inner.generate_response = MagicMock(side_effect=["Answer", "Answer", "Error: 500", "Answer"])
+    client = CachedLLMClient(inner, maxsize=1)
+    
+    # Deterministic requests are answered from the cache after the first call
+    assert client.generate_response("question", temperature=0.0) == "Answer"
+    assert client.generate_response("question", temperature=0.0) == "Answer"
+    assert inner.generate_response.call_count == 1
+    assert (client.hits, client.misses) == (1, 1)
+    
+    # Sampled requests always reach the wrapped client
+    client.generate_response("question", temperature=0.7)
+    assert inner.generate_response.call_count == 2
+    
+    # Errors are not cached, and the oldest entry is evicted beyond maxsize
+    assert client.generate_response("other", temperature=0.0) == "Error: 500"
+    client.generate_response("other", temperature=0.0)
+    assert inner.generate_response.call_count == 4
+    assert len(client._cache) == 1
+    
+    # Other attributes come from the wrapped client
+    assert client.role_responses is inner.role_responses
+
+
+def test_generate_with_system_prompt():
+    # The base implementation prepends the system prompt
+    client = MockLLMClient({"shared prefix": "Prefixed response"})
+    response = client.generate("question", system_prompt="shared prefix: ")
+    assert response == "Prefixed response"
+
+
+@patch('requests.Session.post')
+def test_ollama_client_system_prompt(mock_post):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"response": "This is a response from Ollama."}
+    mock_post.return_value = mock_response
+    
+    client = OllamaClient()
+    response = client.generate("test prompt", system_prompt="shared prefix")
+    
+    assert response == "This is a response from Ollama."
+    args, kwargs = mock_post.call_args
+    assert request_body(mock_post.call_args)["system"] == "shared prefix"
+    assert request_body(mock_post.call_args)["prompt"] == "test prompt"
+
+
+def test_agenerate():
+    client = MockLLMClient({"question": "Async response"})
+    assert asyncio.run(client.agenerate("question")) == "Async response"
+
+
+def test_ollama_client_reuses_session():
+    with OllamaClient() as client:
+        with patch.object(client._session, 'post') as mock_post:
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.json.return_value = {"response": "ok"}
+            
+            client.generate_response("first")
+            client.generate_response("second")
+            
+            assert mock_post.call_count == 2
+    
+    # Leaving the context closes the pooled session
+    with patch('requests.Session.close') as mock_close:
+        with OllamaClient():
+            pass
+        mock_close.assert_called_once()
+
+
+def test_ollama_client_generate_batch():
+    client = OllamaClient(num_parallel=2)
+    
+    def post(*args, **kwargs):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"response": request_body(call(*args, **kwargs))["prompt"].upper()}
+        return response
+    
+    with patch.object(client._session, 'post', side_effect=post):
+        responses = client.generate_batch(["first", "second", "third"])
+    
+    # Responses come back in prompt order
+    assert responses == ["FIRST", "SECOND", "THIRD"]
+    assert client._pool is not None
+    
+    client.close()
+    assert client._pool is None
+
+
+def test_ollama_client_request_body():
+    client = OllamaClient(model="test-model")
+    body = client._build_body("prompt", 128, 0.2, system_prompt="system")
+    
+    assert body == {
+        "model": "test-model",
+        "prompt": "prompt",
+        "stream": False,
+        "system": "system",
+        "options": {"num_predict": 128, "temperature": 0.2, "top_p": 0.9, "context_size": 2048}
+    }
+    
+    # Building a body never changes the shared template
+    client._build_body("other", 16, 0.9, stream=True)
+    assert client._options_template == {"top_p": 0.9, "context_size": 2048}
+    
+    # Bodies with the same parameters share one options dict
+    assert client._build_body("again", 128, 0.2)["options"] is body["options"]
+
+
+def test_mock_llm_client_role_match():
+    client = MockLLMClient()
+    
+    # Matching is case-insensitive
+    response = client.generate_response("You are a devops engineer.")
+    assert response == client.role_responses["DevOps Engineer"]
+    
+    # When several roles are mentioned, the first known role takes precedence
+    response = client.generate_response("You are a QA Engineer. [Software Engineer]: I agree.")
+    assert response == client.role_responses["Software Engineer"]
+
+
+def test_detect_language():
+    client = LLMClient()
+    
+    assert client.detect_language("양자역학 교육 소프트웨어") == 'ko'
+    assert client.detect_language("Mixed 한국어 text") == 'ko'
+    assert client.detect_language("Quantum education software") == 'en'
+    assert client.detect_language("12345 !?") == 'other'
+    assert client.detect_language("Café résumé") == 'en'
+    assert client.detect_language("日本語") == 'other'
+
+
+def test_prepare_prompt_for_language():
+    client = LLMClient()
+    
+    prepared = client.prepare_prompt_for_language("토론을 시작합니다")
+    assert prepared.startswith("다음 내용에 한국어로 응답해주세요.")
+    assert prepared.endswith("\n\n토론을 시작합니다")
+    
+    # Preparing twice does not repeat the instruction
+    assert client.prepare_prompt_for_language(prepared) == prepared
+    assert client.prepare_prompt_for_language("Let's begin") == "Let's begin"
+    
+    # Detection runs once when detecting and preparing together
+    with patch.object(client, 'detect_language', wraps=client.detect_language) as mock_detect:
+        assert client._detect_and_prepare("토론을 시작합니다") == ('ko', prepared)
+        mock_detect.assert_called_once()
+
+
+def test_mock_llm_client_overlapping_keywords():
+    # The earlier key wins even when a later key's match overlaps it in the prompt
+    client = MockLLMClient({"lo wo": "First key", "hello": "Second key"})
+    assert client.generate_response("Hello World") == "First key"
+    
+    # Keys added after construction are still matched
+    client.custom_responses["planets"] = "Planet response"
+    assert client.generate_response("tell me about planets") == "Planet response"
+
+
+def test_mock_llm_client_shares_response_tables():
+    first = MockLLMClient()
+    second = MockLLMClient({"custom": "Custom response"})
+    
+    assert first.role_responses is second.role_responses
+    assert first.custom_responses is not second.custom_responses
+    with pytest.raises(TypeError):
+        first.default_responses["hello"] = "Changed"
+    
+    # Turn counts are per client
+    first.role_turn_counts["QA Engineer"] += 1
+    assert second.role_turn_counts["QA Engineer"] == 0
+
+
+def test_mock_llm_client_quantum_education_responses():
+    client = MockLLMClient()
+    prompt = "You are a UI/UX Designer. 토론 주제: 양자역학 교육용 소프트웨어 개발"
+    
+    response = client.generate_response(prompt)
+    assert response in client.quantum_education_responses["UI/UX Designer"]
+    assert client.generate_response(prompt) == response
+    
+    # Roles without topic responses answer with their default
+    response = client.generate_response(prompt.replace("UI/UX Designer", "QA Engineer"))
+    assert response == client.role_responses["QA Engineer"]
@@ -4,13 +4,20 @@ from unittest.mock import patch, MagicMock
 import requests
 from discussion_llama.llm.llm_client import OllamaClient
 
+
+def request_body(call_args):
+    """Decode the JSON body sent by a mocked Session.post call."""
+    kwargs = call_args.kwargs
+    return kwargs["json"] if "json" in kwargs else json.loads(kwargs["data"])
+
+
 # Test different model configurations
 @pytest.mark.parametrize("model_name", [
     "llama2:7b-chat-q4_0",
     "mistral:7b-instruct-v0.2-q4_0",
     "gemma:7b-instruct-q4_0"
 ])
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_different_models(mock_post, model_name):
     # Mock the response from Ollama
     mock_response = MagicMock()
@@ -26,10 +33,10 @@ def test_ollama_client_different_models(mock_post, model_name):
     
     # Check that the request was made with the correct model
     args, kwargs = mock_post.call_args
-    assert kwargs["json"]["model"] == model_name
+    assert request_body(mock_post.call_args)["model"] == model_name
 
 @pytest.mark.parametrize("temperature", [0.1, 0.5, 0.7, 1.0])
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_temperature(mock_post, temperature):
     # Mock the response from Ollama
     mock_response = MagicMock()
@@ -42,10 +49,10 @@ def test_ollama_client_temperature(mock_post, temperature):
     
     # Check that the temperature was set correctly
     args, kwargs = mock_post.call_args
-    assert kwargs["json"]["options"]["temperature"] == temperature
+    assert request_body(mock_post.call_args)["options"]["temperature"] == temperature
 
 @pytest.mark.parametrize("max_tokens", [100, 512, 1024, 2048])
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_max_tokens(mock_post, max_tokens):
     # Mock the response from Ollama
     mock_response = MagicMock()
@@ -58,9 +65,9 @@ def test_ollama_client_max_tokens(mock_post, max_tokens):
     
     # Check that the max_tokens was set correctly
     args, kwargs = mock_post.call_args
-    assert kwargs["json"]["options"]["num_predict"] == max_tokens
+    assert request_body(mock_post.call_args)["options"]["num_predict"] == max_tokens
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_custom_api_url(mock_post):
     # Mock the response from Ollama
     mock_response = MagicMock()
@@ -76,7 +83,7 @@ def test_ollama_client_custom_api_url(mock_post):
     args, kwargs = mock_post.call_args
     assert args[0] == f"{custom_url}/api/generate"
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_timeout_handling(mock_post):
     # Mock a timeout exception
     mock_post.side_effect = requests.exceptions.Timeout("Request timed out")
@@ -87,7 +94,7 @@ def test_ollama_client_timeout_handling(mock_post):
     assert "Error generating response" in response
     assert "Request timed out" in response
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_connection_error(mock_post):
     # Mock a connection error
     mock_post.side_effect = requests.exceptions.ConnectionError("Connection refused")
@@ -98,7 +105,7 @@ def test_ollama_client_connection_error(mock_post):
     assert "Error generating response" in response
     assert "Connection refused" in response
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_json_error(mock_post):
     # Mock a response with invalid JSON
     mock_response = MagicMock()
@@ -113,7 +120,7 @@ def test_ollama_client_json_error(mock_post):
     assert "Invalid JSON" in response
 
 # Test for handling rate limiting
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_ollama_client_rate_limit(mock_post):
     # Mock a rate limit response
     mock_response = MagicMock()
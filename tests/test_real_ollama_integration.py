@@ -11,11 +11,15 @@ def is_ollama_available():
     except:
         return False
 
-# Skip all tests if Ollama is not available
-pytestmark = pytest.mark.skipif(
-    not is_ollama_available(),
-    reason="Ollama server is not available at http://localhost:11434"
-)
+# Skip all tests if Ollama is not available. They all query the same local
+# server, so they are not spread over parallel workers either.
+pytestmark = [
+    pytest.mark.skipif(
+        not is_ollama_available(),
+        reason="Ollama server is not available at http://localhost:11434"
+    ),
+    pytest.mark.serial,
+]
 
 
 @pytest.fixture(scope="module")
@@ -2,6 +2,8 @@ import os
 import tempfile
 import pytest
 import yaml
+from unittest.mock import patch
+from discussion_llama.role import role_manager as role_manager_module
 from discussion_llama.role.role_manager import Role, RoleManager, load_roles_from_yaml
 
 
@@ -47,6 +49,47 @@ def test_role_prompt_description(sample_role_data):
     assert "Thorough" in prompt
 
 
+def test_role_prompt_description_is_cached(sample_role_data):
+    role = Role(dict(sample_role_data, hierarchy_level=2, superior="lead", subordinates=["junior"]))
+    prompt = role.get_prompt_description()
+    
+    assert prompt.startswith("You are a test_role.\n\nRole Description: A test role for unit testing\n\n")
+    assert "Superior: lead\nSubordinates:\n- junior\n\n" in prompt
+    assert prompt.endswith("within your authority.\n\n")
+    assert role.get_prompt_description() is prompt
+
+
+def test_role_keyword_sets(sample_role_data, temp_roles_dir):
+    role = Role(sample_role_data)
+    description_keywords, expertise_keywords, responsibility_keywords = role.get_keyword_sets()
+    
+    assert description_keywords == {"a", "test", "role", "for", "unit", "testing"}
+    assert expertise_keywords == {"testing", "python"}
+    assert responsibility_keywords == {"test", "responsibility", "1", "2"}
+    assert role.get_keyword_sets() is role.get_keyword_sets()
+    
+    relevance = RoleManager(temp_roles_dir)._calculate_role_relevance(role, "Testing Python code")
+    assert relevance == pytest.approx((0.1 + 2 * 0.4) / (3 * 0.8))
+
+
+def test_role_type(sample_role_data, temp_roles_dir):
+    manager = RoleManager(temp_roles_dir)
+    
+    assert manager._determine_role_type(Role(dict(sample_role_data, role="Product Designer"))) == "business"
+    assert manager._determine_role_type(Role(dict(sample_role_data, role="UX Researcher"))) == "design"
+    assert manager._determine_role_type(Role(dict(sample_role_data, role="Security Specialist"))) == "security"
+    assert manager._determine_role_type(Role(dict(sample_role_data, role="SRE"))) == "operations"
+    assert manager._determine_role_type(Role(sample_role_data)) == "technical"
+
+
+def test_role_has_no_instance_dict(sample_role_data):
+    role = Role(sample_role_data)
+    
+    assert not hasattr(role, "__dict__")
+    with pytest.raises(AttributeError):
+        role.unknown_attribute = True
+
+
 def test_role_manager_load_roles(temp_roles_dir, sample_role_data):
     # Create a test role file
     role_file_path = os.path.join(temp_roles_dir, "test_role.yaml")
@@ -91,4 +134,255 @@ def test_load_roles_from_yaml(temp_roles_dir, sample_role_data):
     roles = load_roles_from_yaml(temp_roles_dir)
     
     assert len(roles) == 1
-    assert roles[0].role == "test_role" 
\ No newline at end of file
+    assert roles[0].role == "test_role" 
+
+def test_role_manager_skips_invalid_files(temp_roles_dir, sample_role_data, caplog):
+    for i in range(5):
+        data = dict(sample_role_data, role=f"role_{i}")
+        with open(os.path.join(temp_roles_dir, f"role_{i}.yaml"), "w") as f:
+            yaml.dump(data, f)
+    with open(os.path.join(temp_roles_dir, "broken.yaml"), "w") as f:
+        f.write("role: [unterminated\n")
+    os.mkdir(os.path.join(temp_roles_dir, "archive.yaml"))
+    with open(os.path.join(temp_roles_dir, "role_template.yaml"), "w") as f:
+        yaml.dump(dict(sample_role_data, role="template_role"), f)
+    
+    role_manager = RoleManager(temp_roles_dir)
+    
+    assert sorted(role_manager.roles) == [f"role_{i}" for i in range(5)]
+    assert "Error loading role from broken.yaml" in caplog.text
+
+
+def test_role_manager_caches_parsed_files(temp_roles_dir, sample_role_data):
+    for name in ("first", "second"):
+        with open(os.path.join(temp_roles_dir, f"{name}.yaml"), "w") as f:
+            yaml.dump(dict(sample_role_data, role=name), f)
+    
+    RoleManager(temp_roles_dir, use_cache=True)
+    assert os.path.exists(os.path.join(temp_roles_dir, ".role_cache.json"))
+    
+    # Unchanged files come from the cache; changed ones are parsed again
+    with open(os.path.join(temp_roles_dir, "second.yaml"), "w") as f:
+        yaml.dump(dict(sample_role_data, role="second", description="Changed description"), f)
+    with patch.object(role_manager_module, "_read_role_file",
+                      wraps=role_manager_module._read_role_file) as mock_read:
+        role_manager = RoleManager(temp_roles_dir, use_cache=True)
+    
+    assert [call.args[0] for call in mock_read.call_args_list] == [os.path.join(temp_roles_dir, "second.yaml")]
+    assert role_manager.get_role("first").description == sample_role_data["description"]
+    assert role_manager.get_role("second").description == "Changed description"
+    
+    # Removed files disappear even though they are still cached
+    os.remove(os.path.join(temp_roles_dir, "first.yaml"))
+    assert list(RoleManager(temp_roles_dir, use_cache=True).roles) == ["second"]
+
+
+@pytest.mark.parametrize("cache", [
+    "not json",
+    '["a list"]',
+    '{"version": 2, "files": ["role.yaml"]}',
+    '{"version": 2, "files": {"role.yaml": "data"}}',
+    '{"version": 2, "files": {"role.yaml": {"mtime_ns": "now", "size": 1, "data": {}}}}',
+    '{"version": 2, "files": {"role.yaml": {"mtime_ns": 1, "size": 1, "data": [1]}}}',
+])
+def test_role_manager_ignores_invalid_cache(temp_roles_dir, sample_role_data, cache):
+    with open(os.path.join(temp_roles_dir, "role.yaml"), "w") as f:
+        yaml.dump(sample_role_data, f)
+    with open(os.path.join(temp_roles_dir, ".role_cache.json"), "w") as f:
+        f.write(cache)
+    
+    role_manager = RoleManager(temp_roles_dir, use_cache=True)
+    
+    assert list(role_manager.roles) == ["test_role"]
+    assert role_manager._read_role_cache()["role.yaml"][1] == sample_role_data
+
+
+def test_role_manager_without_cache(temp_roles_dir, sample_role_data):
+    with open(os.path.join(temp_roles_dir, "role.yaml"), "w") as f:
+        yaml.dump(sample_role_data, f)
+    
+    role_manager = RoleManager(temp_roles_dir)
+    
+    assert "test_role" in role_manager.roles
+    assert not os.path.exists(os.path.join(temp_roles_dir, ".role_cache.json"))
+
+
+def test_role_manager_parses_in_processes_without_libyaml(temp_roles_dir, sample_role_data):
+    for i in range(3):
+        with open(os.path.join(temp_roles_dir, f"role_{i}.yaml"), "w") as f:
+            yaml.dump(dict(sample_role_data, role=f"Role {i}"), f)
+    
+    with patch.object(role_manager_module, "_HAS_C_LOADER", False), \
+            patch.object(role_manager_module, "_PROCESS_POOL_MIN_FILES", 0), \
+            patch.object(role_manager_module.os, "cpu_count", return_value=2), \
+            patch.object(role_manager_module, "ProcessPoolExecutor",
+                         wraps=role_manager_module.ProcessPoolExecutor) as mock_pool:
+        role_manager = RoleManager(temp_roles_dir, use_cache=False)
+    
+    assert mock_pool.called
+    assert sorted(role_manager.roles) == ["Role 0", "Role 1", "Role 2"]
+
+
+def test_is_compatible_with_interaction_names(temp_roles_dir):
+    manager = RoleManager(temp_roles_dir)
+    listed = Role({"role": "listed", "interaction_with": ["mapped"]})
+    mapped = Role({"role": "mapped", "interaction_with": {"other": "Works with other"}})
+    other = Role({"role": "other", "interaction_with": []})
+    
+    assert listed._interaction_names == frozenset({"mapped"})
+    assert manager.is_compatible(listed, mapped)
+    assert manager.is_compatible(mapped, other)
+    assert not manager.is_compatible(listed, other)
+    
+    # Reassigning the interactions updates the names, and a plain string keeps
+    # the substring semantics of the generic membership test
+    other.interaction_with = "listed, mapped"
+    assert other._interaction_names is None
+    assert manager.is_compatible(listed, other)
+
+
+def test_lazy_role_manager_loads_named_roles_only(temp_roles_dir, sample_role_data):
+    for name in ("Backend Developer", "QA Engineer"):
+        with open(os.path.join(temp_roles_dir, name.lower().replace(" ", "_") + ".yaml"), "w") as f:
+            yaml.dump(dict(sample_role_data, role=name), f)
+    with open(os.path.join(temp_roles_dir, "pm.yaml"), "w") as f:
+        yaml.dump(dict(sample_role_data, role="Project Manager"), f)
+    
+    manager = RoleManager(temp_roles_dir, lazy=True)
+    backend = manager.get_role("Backend Developer")
+    
+    assert backend.role == "Backend Developer"
+    assert list(manager.roles) == ["Backend Developer"]
+    
+    # A role in a differently named file needs the whole directory
+    assert manager.get_role("Project Manager").role == "Project Manager"
+    assert len(manager.get_all_roles()) == 3
+    assert manager.get_role("Backend Developer") is backend
+    assert manager._is_managed([backend])
+
+
+def test_lazy_role_manager_requires_directory():
+    with pytest.raises(FileNotFoundError):
+        RoleManager("/nonexistent/roles", lazy=True)
+
+
+def test_compatibility_bits_match_is_compatible(temp_roles_dir, sample_role_data):
+    interactions = {
+        "alpha": {"beta": "Works with beta"},
+        "beta": [],
+        "gamma": ["alpha", {"delta": "not a name"}],
+        "delta": "gamma and alpha",
+        "epsilon": {},
+    }
+    for name, interaction_with in interactions.items():
+        with open(os.path.join(temp_roles_dir, f"{name}.yaml"), "w") as f:
+            yaml.dump(dict(sample_role_data, role=name, interaction_with=interaction_with), f)
+    manager = RoleManager(temp_roles_dir)
+    roles = manager.get_all_roles()
+    
+    expected = {
+        a.role: {b.role: manager.is_compatible(a, b) for b in roles if a is not b}
+        for a in roles
+    }
+    assert manager.create_compatibility_matrix() == expected
+    for role in roles:
+        assert manager.find_compatible_roles(role) == [
+            r for r in roles if r is not role and manager.is_compatible(role, r)
+        ]
+    
+    by_name = manager.roles
+    assert manager.validate_role_compatibility([by_name["alpha"], by_name["beta"], by_name["gamma"]])[0]
+    assert not manager.validate_role_compatibility([by_name["alpha"], by_name["epsilon"]])[0]
+    
+    # Roles the manager did not load are checked directly
+    outsider = Role(dict(sample_role_data, role="outsider", interaction_with=["alpha"]))
+    assert manager.find_compatible_roles(outsider) == [by_name["alpha"]]
+
+
+def test_topic_analysis_and_relevance_are_memoized(temp_roles_dir, sample_role_data):
+    manager = RoleManager(temp_roles_dir)
+    role = Role(sample_role_data)
+    
+    with patch.object(manager, "_analyze_topic_keywords", wraps=manager._analyze_topic_keywords) as mock_analyze:
+        analysis = manager._analyze_topic_with_llm("A complex security review")
+        analysis["key_aspects"].append("changed")
+        assert manager._analyze_topic_with_llm("A complex security review")["key_aspects"] == ["security"]
+        
+        first = manager._calculate_role_relevance(role, "A complex security review")
+        assert manager._calculate_role_relevance(role, "A complex security review") == first
+        assert mock_analyze.call_count == 1
+    
+    assert len(manager._relevance_cache) == 1
+
+
+def test_score_roles_keeps_order(temp_roles_dir, sample_role_data):
+    manager = RoleManager(temp_roles_dir)
+    roles = [
+        Role(dict(sample_role_data, role=f"Role {i}", expertise=[f"skill{i}", "security"]))
+        for i in range(100)
+    ]
+    topic = "security review of skill3"
+    
+    expected = [manager._calculate_role_relevance(role, topic) for role in roles]
+    manager._relevance_cache.clear()
+    
+    assert manager._score_roles(roles, topic) == expected
+
+
+def test_topic_keywords_are_not_prefixes_of_each_other():
+    # The single-scan topic analysis relies on this
+    keywords = list(role_manager_module._TOPIC_KEYWORD_CATEGORIES)
+    assert not [(a, b) for a in keywords for b in keywords if a != b and b.startswith(a)]
+
+
+def test_analyze_topic_keywords(temp_roles_dir):
+    manager = RoleManager(temp_roles_dir)
+    
+    analysis = manager._analyze_topic_keywords("A simple but CRITICAL cloud API for customer login (privacy first)")
+    
+    assert analysis == {
+        "key_aspects": ["security", "backend", "infrastructure", "business"],
+        "technical_complexity": "low",
+        "business_impact": "high"
+    }
+
+
+def test_role_manager_reads_utf8_files(temp_roles_dir):
+    with open(os.path.join(temp_roles_dir, "korean.yaml"), "w", encoding="utf-8") as f:
+        f.write('role: "개발자"\ndescription: "코드를 작성합니다"\n')
+    with open(os.path.join(temp_roles_dir, "bom.yaml"), "wb") as f:
+        f.write("﻿role: with_bom\n".encode("utf-8"))
+    
+    role_manager = RoleManager(temp_roles_dir)
+    
+    assert role_manager.get_role("개발자").description == "코드를 작성합니다"
+    assert role_manager.get_role("with_bom") is not None
+
+
+def test_role_optional_fields_are_lazy():
+    role_data = {"role": "Lazy", "tools_and_technologies": ["Git"], "characteristics": ["Calm"]}
+    role = Role(role_data)
+    
+    assert role.tools_and_technologies == ["Git"]
+    assert role.characteristics is role_data["characteristics"]
+    assert (role.hierarchy_level, role.superior, role.escalation_threshold) == (0, "", 0.7)
+    assert role.career_path == {}
+    assert role.key_performance_indicators is role.key_performance_indicators
+    
+    role.decision_authority = ["Budget"]
+    assert role.decision_authority == ["Budget"]
+    
+    with pytest.raises(AttributeError):
+        role.not_a_field
+
+
+@pytest.mark.parametrize("text", [
+    "Plan the API migration",
+    "Plan the API-migration, quickly!",
+    "snake_case and CamelCase",
+    "클라우드 migration plan",
+    "",
+])
+def test_tokenize_matches_word_regex(text):
+    expected = frozenset(role_manager_module._WORD_RE.findall(text.lower()))
+    assert role_manager_module._tokenize(text) == expected
@@ -1,49 +1,16 @@
 import os
-import tempfile
 import json
 import pytest
 from unittest.mock import patch, MagicMock
-from discussion_llama.role.role_manager import Role
+from discussion_llama.engine import discussion_engine
 from discussion_llama.engine.discussion_engine import (
     Message, 
     DiscussionState, 
-    DiskBasedDiscussionManager
+    DiskBasedDiscussionManager,
+    DiscussionEngine
 )
 
 
-@pytest.fixture
-def sample_roles():
-    """Create sample roles for testing."""
-    role1_data = {
-        "role": "role1",
-        "description": "Test role 1",
-        "responsibilities": ["Responsibility 1"],
-        "expertise": ["Expertise 1"],
-        "characteristics": ["Characteristic 1"],
-        "interaction_with": {},
-        "success_criteria": ["Success 1"]
-    }
-    
-    role2_data = {
-        "role": "role2",
-        "description": "Test role 2",
-        "responsibilities": ["Responsibility 2"],
-        "expertise": ["Expertise 2"],
-        "characteristics": ["Characteristic 2"],
-        "interaction_with": {},
-        "success_criteria": ["Success 2"]
-    }
-    
-    return [Role(role1_data), Role(role2_data)]
-
-
-@pytest.fixture
-def temp_state_dir():
-    """Create a temporary directory for state files."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
-
-
 def test_message_serialization():
     """Test message serialization and deserialization."""
     # Create a message with metadata
@@ -66,6 +33,18 @@ def test_message_serialization():
     assert reconstructed_message.timestamp == original_message.timestamp
 
 
+def test_message_dict_is_reused_until_changed():
+    """Test that the cached dictionary form of a message tracks field changes."""
+    message = Message("test_role", "Original content")
+    
+    message_dict = message._as_dict()
+    assert message._as_dict() is message_dict
+    assert message_dict == message.to_dict()
+    
+    message.content = "Edited content"
+    assert message._as_dict()["content"] == "Edited content"
+
+
 def test_discussion_state_serialization(sample_roles):
     """Test discussion state serialization and deserialization."""
     # Create a state with messages
@@ -260,4 +239,313 @@ def test_discussion_state_get_message_history(sample_roles):
     assert history[1]["role"] == "role2"
     assert history[1]["content"] == "Hi, I'm role2"
     assert history[2]["role"] == "role1"
-    assert history[2]["content"] == "Let's discuss the topic" 
\ No newline at end of file
+    assert history[2]["content"] == "Let's discuss the topic" 
+
+
+def test_disk_based_discussion_manager_writes_compact_messages(sample_roles, temp_state_dir):
+    """Test that messages are written with their roles dictionary-encoded."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir)
+    
+    state = DiscussionState("test topic", sample_roles)
+    state.add_message(Message("role1", "Message 1", {"key": "value"}))
+    state.add_message(Message("role2", "Message 2"))
+    state.add_message(Message("role1", "Message 3"))
+    manager.save_state(state)
+    
+    with open(manager.state_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    
+    assert data["role_index"] == ["role1", "role2"]
+    assert [(m["r"], m["c"]) for m in data["messages"]] == [(0, "Message 1"), (1, "Message 2"), (0, "Message 3")]
+    assert data["messages"][0]["m"] == {"key": "value"}
+    assert "m" not in data["messages"][1]
+    assert DiscussionState.from_dict(data, sample_roles).to_dict() == state.to_dict()
+
+
+def test_message_from_dict_compact_form():
+    """Test that messages are read from both the to_dict and the compact form."""
+    legacy = Message.from_dict({"role": "role1", "content": "Hello", "timestamp": 1.0})
+    compact = Message.from_dict({"r": 1, "c": "Hello", "t": 1.0}, ["role2", "role1"])
+    
+    assert compact.to_dict() == legacy.to_dict()
+    assert compact.metadata == {}
+
+
+def test_disk_based_discussion_manager_pretty_output(sample_roles, temp_state_dir):
+    """Test that indentation is only used when pretty output is requested."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir)
+    state = DiscussionState("test topic", sample_roles)
+    state.add_message(Message("role1", "Message 1"))
+    
+    manager.save_state(state)
+    with open(manager.state_file, "r", encoding="utf-8") as f:
+        assert "\n" not in f.read()
+    
+    manager.save_state(state, pretty=True)
+    with open(manager.state_file, "r", encoding="utf-8") as f:
+        assert "\n  " in f.read()
+    
+    assert manager.load_state().messages[0].content == "Message 1"
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_disk_based_discussion_manager_json_backends(monkeypatch, sample_roles, temp_state_dir, use_orjson):
+    """Test that states round-trip with and without orjson."""
+    if use_orjson and discussion_engine.orjson is None:
+        pytest.skip("orjson is not installed")
+    if not use_orjson:
+        monkeypatch.setattr(discussion_engine, "orjson", None)
+    
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir)
+    state = DiscussionState("test topic", sample_roles)
+    state.add_message(Message("role1", "메시지 1", {"confidence": 0.5}))
+    # orjson rejects non-string keys, so this state is written by the json module
+    state.add_message(Message("role2", "Message 2", {1: "one"}))
+    manager.save_state(state)
+    
+    with open(manager.state_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["messages"][0]["c"] == "메시지 1"
+    
+    loaded_state = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir).load_state()
+    assert [m.content for m in loaded_state.messages] == ["메시지 1", "Message 2"]
+    assert loaded_state.messages[1].metadata == {"1": "one"}
+
+
+def test_disk_based_discussion_manager_compressed(sample_roles, temp_state_dir):
+    """Test saving and loading a compressed discussion state."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir, compress=True)
+    assert manager.state_file.endswith(".json.gz")
+    
+    state = DiscussionState("test topic", sample_roles)
+    for i in range(20):
+        state.add_message(Message(f"role{i%2+1}", "I maintain my position on this issue."))
+    state.turn = 20
+    manager.save_state(state)
+    
+    with open(manager.state_file, "rb") as f:
+        compressed_size = len(f.read())
+    assert compressed_size < len(json.dumps(state.to_dict()))
+    
+    loaded_state = manager.load_state()
+    assert loaded_state.turn == 20
+    assert len(loaded_state.messages) == 20
+    assert loaded_state.messages[-1].content == "I maintain my position on this issue."
+
+
+def test_disk_based_discussion_manager_reuses_written_state(sample_roles, temp_state_dir):
+    """Test that loading right after a save does not read the file again."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir, compress=True)
+    state = DiscussionState("test topic", sample_roles)
+    state.add_message(Message("role1", "Message 1"))
+    manager.save_state(state)
+    
+    with patch("discussion_llama.engine.discussion_engine.open", side_effect=AssertionError, create=True):
+        loaded_state = manager.load_state()
+    assert loaded_state.messages[0].content == "Message 1"
+    assert loaded_state.messages[0] is not state.messages[0]
+    
+    # A state written by another manager is read from the file
+    other = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir, compress=True)
+    state.add_message(Message("role2", "Message 2"))
+    other.save_state(state)
+    
+    assert len(manager.load_state().messages) == 2
+
+
+def test_disk_based_discussion_manager_appends_to_changelog(sample_roles, temp_state_dir):
+    """Test that saves which only add messages append them to the changelog."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir)
+    state = DiscussionState("test topic", sample_roles)
+    state.add_message(Message("role1", "Message 1"))
+    manager.save_state(state)
+    
+    with open(manager.state_file, "rb") as f:
+        snapshot = f.read()
+    
+    state.add_message(Message("role2", "Message 2\nwith two lines"))
+    state.turn = 2
+    manager.save_state(state)
+    state.add_message(Message("role1", "Message 3"))
+    state.consensus_reached = True
+    manager.save_state(state)
+    
+    # The snapshot is left alone and each save added one line to the changelog
+    with open(manager.state_file, "rb") as f:
+        assert f.read() == snapshot
+    with open(manager.log_file, "rb") as f:
+        assert len(f.read().splitlines()) == 2
+    
+    other = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir)
+    loaded_state = other.load_state()
+    assert [m.content for m in loaded_state.messages] == ["Message 1", "Message 2\nwith two lines", "Message 3"]
+    assert loaded_state.turn == 2
+    assert loaded_state.consensus_reached
+
+
+def test_disk_based_discussion_manager_changelog_snapshot_interval(sample_roles, temp_state_dir):
+    """Test that the changelog is folded into a snapshot every snapshot_interval appends."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir, snapshot_interval=2)
+    state = DiscussionState("test topic", sample_roles)
+    for i in range(4):
+        state.add_message(Message("role1", f"Message {i}"))
+        manager.save_state(state)
+    
+    # Snapshot, two appends, then a new snapshot that removed the changelog
+    assert not os.path.exists(manager.log_file)
+    with open(manager.state_file, "r") as f:
+        assert len(json.load(f)["messages"]) == 4
+
+
+def test_disk_based_discussion_manager_changelog_replay(sample_roles, temp_state_dir):
+    """Test that replaying the changelog skips torn entries and messages already in the snapshot."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir)
+    state = DiscussionState("test topic", sample_roles)
+    state.add_message(Message("role1", "Message 1"))
+    manager.save_state(state)
+    state.add_message(Message("role2", "Message 2"))
+    manager.save_state(state)
+    
+    with open(manager.log_file, "ab") as f:
+        f.write(b'{"start": 2, "messages": [')
+    
+    loaded_state = manager.load_state()
+    assert [m.content for m in loaded_state.messages] == ["Message 1", "Message 2"]
+    
+    # A state that no longer extends the saved one is written as a snapshot
+    state.messages = [Message("role2", "Replacement")]
+    manager.save_state(state)
+    assert not os.path.exists(manager.log_file)
+    assert [m.content for m in manager.load_state().messages] == ["Replacement"]
+
+
+def test_disk_based_discussion_manager_compact(sample_roles, temp_state_dir):
+    """Test that compact folds the changelog into the state file."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir)
+    state = DiscussionState("test topic", sample_roles)
+    state.add_message(Message("role1", "Message 1"))
+    manager.save_state(state)
+    state.add_message(Message("role2", "Message 2"))
+    manager.save_state(state)
+    assert os.path.exists(manager.log_file)
+    
+    manager.compact()
+    
+    assert not os.path.exists(manager.log_file)
+    with open(manager.state_file, "r") as f:
+        assert [m["c"] for m in json.load(f)["messages"]] == ["Message 1", "Message 2"]
+
+
+def test_disk_based_discussion_manager_background_writes(sample_roles, temp_state_dir):
+    """Test that background saves are coalesced and visible after a flush."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir, background=True)
+    
+    state = DiscussionState("test topic", sample_roles)
+    for i in range(10):
+        state.add_message(Message(f"role{i%2+1}", f"Message {i}"))
+        state.turn = i + 1
+        manager.save_state(state)
+    
+    manager.flush()
+    assert os.path.exists(manager.state_file)
+    
+    # Loading waits for pending writes, so the latest snapshot is returned
+    state.add_message(Message("role1", "Message 10"))
+    state.turn = 11
+    manager.save_state(state)
+    loaded_state = manager.load_state()
+    
+    assert loaded_state.turn == 11
+    assert len(loaded_state.messages) == 11
+    assert loaded_state.messages[-1].content == "Message 10"
+
+
+def test_disk_based_discussion_manager_close_stops_writer(sample_roles, temp_state_dir):
+    """Test that closing a background manager writes the pending state and ends its thread."""
+    state = DiscussionState("test topic", sample_roles)
+    state.add_message(Message("role1", "Message 0"))
+    
+    with DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir, background=True) as manager:
+        manager.save_state(state)
+    
+    assert not manager._writer.is_alive()
+    assert len(manager.load_state().messages) == 1
+    
+    # Saves after closing are written directly
+    state.add_message(Message("role2", "Message 1"))
+    manager.save_state(state)
+    assert len(manager.load_state().messages) == 2
+
+
+def test_disk_based_discussion_manager_background_write_error(sample_roles, temp_state_dir, caplog):
+    """Test that a failed background write is raised by flush instead of being lost."""
+    manager = DiskBasedDiscussionManager("test topic", sample_roles, temp_state_dir, background=True)
+    state = DiscussionState("test topic", sample_roles)
+    
+    with patch.object(manager, "_write", side_effect=OSError("disk full")):
+        manager.save_state(state)
+        with pytest.raises(OSError, match="disk full"):
+            manager.flush()
+    assert "disk full" in caplog.text
+    
+    # The error is reported once, and later writes succeed
+    manager.save_state(state)
+    manager.close()
+    assert os.path.exists(manager.state_file)
+
+
+def test_run_discussion_saves_once_per_turn(sample_roles, temp_state_dir):
+    """Test that run_discussion writes the state once per turn and keeps interrupted turns."""
+    mock_client = MagicMock()
+    mock_client.generate_response.return_value = "Role response"
+    
+    engine = DiscussionEngine(
+        topic="Test topic",
+        roles=sample_roles,
+        state_dir=temp_state_dir,
+        max_turns=2,
+        llm_client=mock_client
+    )
+    
+    with patch.object(engine.state_manager, 'save_state', wraps=engine.state_manager.save_state) as save, \
+         patch.object(engine, 'check_consensus', return_value=False):
+        engine.run_discussion()
+    
+    # One write for the welcome message plus one per turn
+    assert save.call_count == 3
+    
+    # A turn interrupted after its message was added is still persisted
+    engine.max_turns = 3
+    with patch.object(engine, 'check_consensus', side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            engine.run_discussion()
+    
+    state = engine.state_manager.load_state()
+    assert state.turn == 3
+    assert state.messages[-1].content == "Role response"
+
+
+def test_run_discussion_closes_background_writer(sample_roles, temp_state_dir):
+    """Test that a finished discussion leaves its state on disk and no writer thread behind."""
+    engine = DiscussionEngine(
+        topic="Test topic",
+        roles=sample_roles,
+        state_dir=temp_state_dir,
+        max_turns=2,
+        background_saves=True
+    )
+    
+    with patch.object(engine, 'check_consensus', return_value=False):
+        result = engine.run_discussion()
+    
+    assert not engine.state_manager._writer.is_alive()
+    assert len(engine.state_manager.load_state().messages) == len(result["discussion"])
+
+
+def test_message_has_no_instance_dict():
+    """Test that messages use slots instead of a per-instance dictionary."""
+    message = Message("test_role", "Test message content")
+    
+    assert not hasattr(message, "__dict__")
+    with pytest.raises(AttributeError):
+        message.unknown_attribute = True